@@ -59,6 +59,10 @@ export interface AdminCounts {
   pages_total: number;
   pdf_files_total: number;
   overlay_images_total: number;
+  compare_cache_entries: number;
+  compare_cache_lookups: number;
+  compare_cache_hits: number;
+  compare_cache_hit_ratio: number | null;
 }
 
 export interface AdminSystemStats {
@@ -72,11 +76,22 @@ export interface AdminSystemStats {
   memory_used_percent: number | null;
 }
 
+export interface AdminDispatchStats {
+  capacity: number;
+  throughput_pages_per_second: number;
+  mean_page_seconds: number | null;
+  estimated_workers: number;
+  running: number;
+  queued: number;
+  target_queue_wait_seconds: number;
+}
+
 export interface AdminStats {
   generated_at: string;
   storage: AdminStorageStats;
   counts: AdminCounts;
   system: AdminSystemStats;
+  dispatch: AdminDispatchStats;
 }
 
 @Injectable({ providedIn: 'root' })
@@ -182,6 +182,27 @@ import { TopbarActionsService } from '../../core/topbar-actions.service';
               <div style="font-size: 12px; color:#64748b;">Overlay images</div>
               <div style="font-size: 20px; font-weight: 600;">{{ stats.counts.overlay_images_total }}</div>
             </div>
+            <div class="card" style="margin: 0;">
+              <div style="font-size: 12px; color:#64748b;">Compare cache hit ratio</div>
+              <div style="font-size: 20px; font-weight: 600;">
+                {{ stats.counts.compare_cache_hit_ratio === null ? '—' : (stats.counts.compare_cache_hit_ratio * 100 | number:'1.0-1') + '%' }}
+              </div>
+              <div style="font-size: 12px; color:#64748b;">
+                {{ stats.counts.compare_cache_hits }} / {{ stats.counts.compare_cache_lookups }} pages, {{ stats.counts.compare_cache_entries }} entries
+              </div>
+            </div>
+          </div>
+
+          <div class="card" style="margin: 0;">
+            <h3 style="margin-top: 0;">Page dispatch</h3>
+            <div style="display:grid; gap: 6px;">
+              <div><strong>In-flight window:</strong> {{ stats.dispatch.capacity }} pages</div>
+              <div><strong>Running / queued:</strong> {{ stats.dispatch.running }} / {{ stats.dispatch.queued }}</div>
+              <div><strong>Estimated workers:</strong> {{ stats.dispatch.estimated_workers }}</div>
+              <div><strong>Throughput:</strong> {{ stats.dispatch.throughput_pages_per_second | number:'1.0-2' }} pages/s</div>
+              <div><strong>Mean page time:</strong> {{ stats.dispatch.mean_page_seconds === null ? '—' : (stats.dispatch.mean_page_seconds | number:'1.0-2') + ' s' }}</div>
+              <div><strong>Target queue wait:</strong> {{ stats.dispatch.target_queue_wait_seconds }} s</div>
+            </div>
           </div>
 
           <div class="card" style="margin: 0;">
@@ -0,0 +1,97 @@
+"""partition job_page_results by created_at
+
+Revision ID: 0015_partition_page_results
+Revises: 0014_report_outputs
+Create Date: 2026-02-12 00:00:00.000000
+"""
+
+from datetime import datetime, timedelta
+
+from alembic import op
+
+revision = "0015_partition_page_results"
+down_revision = "0014_report_outputs"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, job_file_id, page_index, status, diff_score, task_id, incompatible_size, "
+    "missing_in_set_a, missing_in_set_b, overlay_svg_path, error_message, created_at"
+)
+DAYS_AHEAD = 7
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE job_page_results RENAME TO job_page_results_old")
+    op.execute("ALTER TABLE job_page_results_old RENAME CONSTRAINT job_page_results_pkey TO job_page_results_old_pkey")
+    op.execute("ALTER INDEX ix_job_page_results_job_file_id RENAME TO ix_job_page_results_old_job_file_id")
+
+    op.execute(
+        """
+        CREATE TABLE job_page_results (
+            id UUID NOT NULL,
+            job_file_id UUID NOT NULL REFERENCES job_files(id) ON DELETE CASCADE,
+            page_index INTEGER NOT NULL,
+            status pagestatus NOT NULL,
+            diff_score DOUBLE PRECISION NULL,
+            task_id VARCHAR(255) NULL,
+            incompatible_size BOOLEAN NOT NULL,
+            missing_in_set_a BOOLEAN NOT NULL,
+            missing_in_set_b BOOLEAN NOT NULL,
+            overlay_svg_path VARCHAR(2048) NULL,
+            error_message VARCHAR(1024) NULL,
+            created_at TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+        """
+    )
+    op.execute("CREATE INDEX ix_job_page_results_job_file_id ON job_page_results (job_file_id)")
+
+    # Existing rows land in a single legacy partition that retention drops once
+    # it has aged out; new rows go to daily partitions.
+    today = datetime.utcnow().date()
+    op.execute(
+        "CREATE TABLE job_page_results_legacy PARTITION OF job_page_results "
+        f"FOR VALUES FROM (MINVALUE) TO ('{today.isoformat()} 00:00:00+00')"
+    )
+    for offset in range(DAYS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        upper = day + timedelta(days=1)
+        op.execute(
+            f"CREATE TABLE job_page_results_p{day:%Y%m%d} PARTITION OF job_page_results "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+    op.execute("CREATE TABLE job_page_results_default PARTITION OF job_page_results DEFAULT")
+
+    op.execute(f"INSERT INTO job_page_results ({COLUMNS}) SELECT {COLUMNS} FROM job_page_results_old")
+    op.execute("DROP TABLE job_page_results_old")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE job_page_results RENAME TO job_page_results_partitioned")
+    op.execute(
+        "ALTER TABLE job_page_results_partitioned RENAME CONSTRAINT job_page_results_pkey "
+        "TO job_page_results_partitioned_pkey"
+    )
+    op.execute("ALTER INDEX ix_job_page_results_job_file_id RENAME TO ix_job_page_results_partitioned_job_file_id")
+    op.execute(
+        """
+        CREATE TABLE job_page_results (
+            id UUID PRIMARY KEY,
+            job_file_id UUID NOT NULL REFERENCES job_files(id) ON DELETE CASCADE,
+            page_index INTEGER NOT NULL,
+            status pagestatus NOT NULL,
+            diff_score DOUBLE PRECISION NULL,
+            task_id VARCHAR(255) NULL,
+            incompatible_size BOOLEAN NOT NULL,
+            missing_in_set_a BOOLEAN NOT NULL,
+            missing_in_set_b BOOLEAN NOT NULL,
+            overlay_svg_path VARCHAR(2048) NULL,
+            error_message VARCHAR(1024) NULL,
+            created_at TIMESTAMPTZ NOT NULL
+        );
+        """
+    )
+    op.execute("CREATE INDEX ix_job_page_results_job_file_id ON job_page_results (job_file_id)")
+    op.execute(f"INSERT INTO job_page_results ({COLUMNS}) SELECT {COLUMNS} FROM job_page_results_partitioned")
+    op.execute("DROP TABLE job_page_results_partitioned")
@@ -0,0 +1,24 @@
+"""job tombstones
+
+Revision ID: 0016_job_tombstones
+Revises: 0015_partition_page_results
+Create Date: 2026-02-13 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016_job_tombstones"
+down_revision = "0015_partition_page_results"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_jobs_deleted_at", "jobs", ["deleted_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_deleted_at", table_name="jobs")
+    op.drop_column("jobs", "deleted_at")
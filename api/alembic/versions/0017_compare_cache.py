@@ -0,0 +1,55 @@
+"""cross-job compare cache
+
+Revision ID: 0017_compare_cache
+Revises: 0016_job_tombstones
+Create Date: 2026-02-14 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0017_compare_cache"
+down_revision = "0016_job_tombstones"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_files", sa.Column("set_a_sha256", sa.String(length=64), nullable=True))
+    op.add_column("job_files", sa.Column("set_b_sha256", sa.String(length=64), nullable=True))
+    op.add_column(
+        "job_page_results",
+        sa.Column("cache_hit", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.alter_column("job_page_results", "cache_hit", server_default=None)
+
+    op.create_table(
+        "compare_cache",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("hash_a", sa.String(length=64), nullable=False),
+        sa.Column("hash_b", sa.String(length=64), nullable=False),
+        sa.Column("page_index", sa.Integer(), nullable=False),
+        sa.Column("render_dpi", sa.Integer(), nullable=False),
+        sa.Column("diff_threshold", sa.Integer(), nullable=False),
+        sa.Column("diff_score", sa.Float(), nullable=True),
+        sa.Column("incompatible_size", sa.Boolean(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("boxes", postgresql.JSONB(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "hash_a", "hash_b", "page_index", "render_dpi", "diff_threshold", name="uq_compare_cache_key"
+        ),
+    )
+    op.create_index("ix_compare_cache_last_used_at", "compare_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_compare_cache_last_used_at", table_name="compare_cache")
+    op.drop_table("compare_cache")
+    op.drop_column("job_page_results", "cache_hit")
+    op.drop_column("job_files", "set_b_sha256")
+    op.drop_column("job_files", "set_a_sha256")
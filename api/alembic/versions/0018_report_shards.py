@@ -0,0 +1,26 @@
+"""report shard counters
+
+Revision ID: 0018_report_shards
+Revises: 0017_compare_cache
+Create Date: 2026-02-15 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0018_report_shards"
+down_revision = "0017_compare_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("reports", sa.Column("shards_total", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("reports", sa.Column("shards_done", sa.Integer(), nullable=False, server_default="0"))
+    op.alter_column("reports", "shards_total", server_default=None)
+    op.alter_column("reports", "shards_done", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("reports", "shards_done")
+    op.drop_column("reports", "shards_total")
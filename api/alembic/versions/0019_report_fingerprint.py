@@ -0,0 +1,24 @@
+"""report fingerprint for dedup
+
+Revision ID: 0019_report_fingerprint
+Revises: 0018_report_shards
+Create Date: 2026-02-16 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0019_report_fingerprint"
+down_revision = "0018_report_shards"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("reports", sa.Column("fingerprint", sa.String(length=64), nullable=True))
+    op.create_index("ix_reports_source_job_id_fingerprint", "reports", ["source_job_id", "fingerprint"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reports_source_job_id_fingerprint", table_name="reports")
+    op.drop_column("reports", "fingerprint")
@@ -0,0 +1,23 @@
+"""opt-in incremental report fragments
+
+Revision ID: 0020_incremental_report
+Revises: 0019_report_fingerprint
+Create Date: 2026-02-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0020_incremental_report"
+down_revision = "0019_report_fingerprint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("incremental_report", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column("jobs", "incremental_report", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "incremental_report")
@@ -0,0 +1,25 @@
+"""overlay pack offsets on page results
+
+Revision ID: 0021_overlay_packs
+Revises: 0020_incremental_report
+Create Date: 2026-02-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0021_overlay_packs"
+down_revision = "0020_incremental_report"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL offsets and are read as loose SVG files.
+    op.add_column("job_page_results", sa.Column("overlay_offset", sa.BigInteger(), nullable=True))
+    op.add_column("job_page_results", sa.Column("overlay_length", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("job_page_results", "overlay_length")
+    op.drop_column("job_page_results", "overlay_offset")
@@ -0,0 +1,26 @@
+"""diff magnitude map references on page results
+
+Revision ID: 0022_diff_magnitudes
+Revises: 0021_overlay_packs
+Create Date: 2026-02-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0022_diff_magnitudes"
+down_revision = "0021_overlay_packs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("magnitude_path", sa.String(length=2048), nullable=True))
+    op.add_column("job_page_results", sa.Column("magnitude_offset", sa.BigInteger(), nullable=True))
+    op.add_column("job_page_results", sa.Column("magnitude_length", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("job_page_results", "magnitude_length")
+    op.drop_column("job_page_results", "magnitude_offset")
+    op.drop_column("job_page_results", "magnitude_path")
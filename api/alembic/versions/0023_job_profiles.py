@@ -0,0 +1,32 @@
+"""per-job render and diff settings
+
+Revision ID: 0023_job_profiles
+Revises: 0022_diff_magnitudes
+Create Date: 2026-02-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0023_job_profiles"
+down_revision = "0022_diff_magnitudes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE textstatus ADD VALUE IF NOT EXISTS 'skipped'")
+    op.add_column("jobs", sa.Column("profile", sa.String(length=32), nullable=False, server_default="standard"))
+    op.add_column("jobs", sa.Column("render_dpi", sa.Integer(), nullable=False, server_default="150"))
+    op.add_column("jobs", sa.Column("diff_threshold", sa.Integer(), nullable=False, server_default="5"))
+    op.add_column("jobs", sa.Column("generate_overlays", sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.add_column("jobs", sa.Column("extract_text", sa.Boolean(), nullable=False, server_default=sa.true()))
+    for column in ("profile", "render_dpi", "diff_threshold", "generate_overlays", "extract_text"):
+        op.alter_column("jobs", column, server_default=None)
+
+
+def downgrade() -> None:
+    for column in ("extract_text", "generate_overlays", "diff_threshold", "render_dpi", "profile"):
+        op.drop_column("jobs", column)
+    # Postgres cannot drop an enum value; 'skipped' stays in textstatus.
+    op.execute("UPDATE job_files SET text_status = 'pending' WHERE text_status = 'skipped'")
@@ -0,0 +1,24 @@
+"""aligned source page indexes on page results
+
+Revision ID: 0024_page_alignment
+Revises: 0023_job_profiles
+Create Date: 2026-02-21 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0024_page_alignment"
+down_revision = "0023_job_profiles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("page_index_a", sa.Integer(), nullable=True))
+    op.add_column("job_page_results", sa.Column("page_index_b", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("job_page_results", "page_index_b")
+    op.drop_column("job_page_results", "page_index_a")
@@ -0,0 +1,25 @@
+"""structural diff mode per job and diff method per page
+
+Revision ID: 0025_vector_diff_mode
+Revises: 0024_page_alignment
+Create Date: 2026-02-22 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0025_vector_diff_mode"
+down_revision = "0024_page_alignment"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("diff_mode", sa.String(length=16), nullable=False, server_default="raster"))
+    op.alter_column("jobs", "diff_mode", server_default=None)
+    op.add_column("job_page_results", sa.Column("diff_method", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("job_page_results", "diff_method")
+    op.drop_column("jobs", "diff_mode")
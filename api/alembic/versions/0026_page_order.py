@@ -0,0 +1,23 @@
+"""page dispatch order per job
+
+Revision ID: 0026_page_order
+Revises: 0025_vector_diff_mode
+Create Date: 2026-02-23 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0026_page_order"
+down_revision = "0025_vector_diff_mode"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("page_order", sa.String(length=16), nullable=False, server_default="preview"))
+    op.alter_column("jobs", "page_order", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "page_order")
@@ -0,0 +1,25 @@
+"""viewer-driven page priority and lazy compare
+
+Revision ID: 0027_view_priority
+Revises: 0026_page_order
+Create Date: 2026-02-24 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0027_view_priority"
+down_revision = "0026_page_order"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_files", sa.Column("viewed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("jobs", sa.Column("lazy_compare", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column("jobs", "lazy_compare", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "lazy_compare")
+    op.drop_column("job_files", "viewed_at")
@@ -0,0 +1,26 @@
+"""page compare start and finish times
+
+Revision ID: 0028_page_timings
+Revises: 0027_view_priority
+Create Date: 2026-02-25 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0028_page_timings"
+down_revision = "0027_view_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("job_page_results", sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_job_page_results_finished_at", "job_page_results", ["finished_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_page_results_finished_at", table_name="job_page_results")
+    op.drop_column("job_page_results", "finished_at")
+    op.drop_column("job_page_results", "started_at")
@@ -0,0 +1,24 @@
+"""page dimensions for size-class routing
+
+Revision ID: 0029_page_sizes
+Revises: 0028_page_timings
+Create Date: 2026-02-26 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0029_page_sizes"
+down_revision = "0028_page_timings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("width_pt", sa.Float(), nullable=True))
+    op.add_column("job_page_results", sa.Column("height_pt", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("job_page_results", "height_pt")
+    op.drop_column("job_page_results", "width_pt")
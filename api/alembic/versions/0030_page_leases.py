@@ -0,0 +1,37 @@
+"""lease expiry and attempt count on page results
+
+Revision ID: 0030_page_leases
+Revises: 0029_page_sizes
+Create Date: 2026-02-27 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0030_page_leases"
+down_revision = "0029_page_sizes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("job_page_results", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.alter_column("job_page_results", "attempts", server_default=None)
+    op.create_index("ix_job_page_results_lease_expires_at", "job_page_results", ["lease_expires_at"])
+    # Pages claimed or dispatched before leases existed get one, so the reaper
+    # can recover any that were orphaned by a dead worker.
+    op.execute(
+        "UPDATE job_page_results SET lease_expires_at = now() + interval '15 minutes', attempts = 1 "
+        "WHERE status = 'running'"
+    )
+    op.execute(
+        "UPDATE job_page_results SET lease_expires_at = now() + interval '6 hours' "
+        "WHERE status = 'pending' AND task_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_page_results_lease_expires_at", table_name="job_page_results")
+    op.drop_column("job_page_results", "attempts")
+    op.drop_column("job_page_results", "lease_expires_at")
@@ -0,0 +1,29 @@
+"""size-class queue per page and index for the database work queue
+
+Revision ID: 0031_db_work_queue
+Revises: 0030_page_leases
+Create Date: 2026-02-28 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0031_db_work_queue"
+down_revision = "0030_page_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("job_page_results", sa.Column("dispatch_queue", sa.String(length=32), nullable=True))
+    op.create_index(
+        "ix_job_page_results_db_queue",
+        "job_page_results",
+        ["dispatch_queue", "lease_expires_at"],
+        postgresql_where=sa.text("status = 'pending' AND task_id = 'db-queue'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_page_results_db_queue", table_name="job_page_results")
+    op.drop_column("job_page_results", "dispatch_queue")
@@ -0,0 +1,33 @@
+"""streaming job start: open upload sessions and per-file planning
+
+Revision ID: 0032_streaming_start
+Revises: 0031_db_work_queue
+Create Date: 2026-03-01 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0032_streaming_start"
+down_revision = "0031_db_work_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("upload_open", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("jobs", sa.Column("streamed_pages", sa.Integer(), nullable=False, server_default="0"))
+    op.alter_column("jobs", "upload_open", server_default=None)
+    op.alter_column("jobs", "streamed_pages", server_default=None)
+    op.add_column("job_files", sa.Column("planned_at", sa.DateTime(timezone=True), nullable=True))
+    # Files of jobs that have been started were planned by run_job.
+    op.execute(
+        "UPDATE job_files SET planned_at = job_files.created_at FROM jobs "
+        "WHERE jobs.id = job_files.job_id AND jobs.status <> 'created'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("job_files", "planned_at")
+    op.drop_column("jobs", "streamed_pages")
+    op.drop_column("jobs", "upload_open")
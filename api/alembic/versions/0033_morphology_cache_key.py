@@ -0,0 +1,46 @@
+"""key the compare cache by morphology iterations
+
+Revision ID: 0033_morphology_cache_key
+Revises: 0032_streaming_start
+Create Date: 2026-03-02 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0033_morphology_cache_key"
+down_revision = "0032_streaming_start"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("open_iterations", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("jobs", sa.Column("close_iterations", sa.Integer(), nullable=False, server_default="2"))
+    op.alter_column("jobs", "open_iterations", server_default=None)
+    op.alter_column("jobs", "close_iterations", server_default=None)
+
+    # Existing entries do not record the iterations they were scored with.
+    op.execute("DELETE FROM compare_cache")
+    op.drop_constraint("uq_compare_cache_key", "compare_cache", type_="unique")
+    op.add_column("compare_cache", sa.Column("open_iterations", sa.Integer(), nullable=False))
+    op.add_column("compare_cache", sa.Column("close_iterations", sa.Integer(), nullable=False))
+    op.create_unique_constraint(
+        "uq_compare_cache_key",
+        "compare_cache",
+        ["hash_a", "hash_b", "page_index", "render_dpi", "diff_threshold", "open_iterations", "close_iterations"],
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM compare_cache")
+    op.drop_constraint("uq_compare_cache_key", "compare_cache", type_="unique")
+    op.drop_column("compare_cache", "close_iterations")
+    op.drop_column("compare_cache", "open_iterations")
+    op.create_unique_constraint(
+        "uq_compare_cache_key",
+        "compare_cache",
+        ["hash_a", "hash_b", "page_index", "render_dpi", "diff_threshold"],
+    )
+    op.drop_column("jobs", "close_iterations")
+    op.drop_column("jobs", "open_iterations")
@@ -0,0 +1,24 @@
+"""user tombstones
+
+Revision ID: 0034_user_tombstones
+Revises: 0033_morphology_cache_key
+Create Date: 2026-03-03 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0034_user_tombstones"
+down_revision = "0033_morphology_cache_key"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_users_deleted_at", "users", ["deleted_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_deleted_at", table_name="users")
+    op.drop_column("users", "deleted_at")
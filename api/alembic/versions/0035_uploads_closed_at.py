@@ -0,0 +1,22 @@
+"""record when a streaming job's upload session closed
+
+Revision ID: 0035_uploads_closed_at
+Revises: 0034_user_tombstones
+Create Date: 2026-03-04 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0035_uploads_closed_at"
+down_revision = "0034_user_tombstones"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("uploads_closed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "uploads_closed_at")
@@ -0,0 +1,34 @@
+"""per-shard report completion
+
+Revision ID: 0036_report_shards
+Revises: 0035_uploads_closed_at
+Create Date: 2026-03-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0036_report_shards"
+down_revision = "0035_uploads_closed_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_shards",
+        sa.Column(
+            "report_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("reports.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("shard_index", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_shards")
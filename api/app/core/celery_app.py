@@ -13,11 +13,19 @@ celery_app.conf.task_send_sent_event = True
 celery_app.conf.task_default_queue = "pages"
 celery_app.conf.task_routes = {
 	"run_job": {"queue": "jobs"},
+	"plan_file": {"queue": "jobs"},
+	"finish_uploads": {"queue": "jobs"},
 	"enqueue_pages": {"queue": "jobs"},
 	"compare_page": {"queue": "pages"},
 	"extract_text": {"queue": "jobs"},
 	"generate_report": {"queue": "reports"},
+	"render_report_shard": {"queue": "reports"},
+	"merge_report": {"queue": "reports"},
 	"cleanup_retention": {"queue": "jobs"},
+	"reclaim_storage": {"queue": "jobs"},
+	"rescore_job": {"queue": "jobs"},
+	"reap_page_leases": {"queue": "jobs"},
+	"reap_stale_reports": {"queue": "jobs"},
 }
 celery_app.conf.include = ["app.worker.tasks"]
 celery_app.conf.timezone = "UTC"
@@ -25,5 +33,17 @@ celery_app.conf.beat_schedule = {
 	"cleanup-retention-daily": {
 		"task": "cleanup_retention",
 		"schedule": crontab(minute=0, hour=2),
-	}
+	},
+	"reclaim-storage": {
+		"task": "reclaim_storage",
+		"schedule": crontab(minute="*/15"),
+	},
+	"reap-page-leases": {
+		"task": "reap_page_leases",
+		"schedule": crontab(),
+	},
+	"reap-stale-reports": {
+		"task": "reap_stale_reports",
+		"schedule": crontab(minute="*/5"),
+	},
 }
@@ -13,7 +13,36 @@ class Settings(BaseSettings):
     refresh_token_exp_days: int = 3650
     render_dpi: int = 150
     diff_threshold: int = 5
+    diff_open_iterations: int = 1
+    diff_close_iterations: int = 2
+    keep_diff_magnitudes: bool = False
+    dispatch_target_wait_seconds: float = 5.0
+    dispatch_sample_seconds: int = 120
+    dispatch_refresh_seconds: int = 15
+    dispatch_min_capacity: int = 16
+    dispatch_max_capacity: int = 4096
+    file_view_refresh_seconds: int = 60
+    page_dispatch_backend: str = "celery"
+    db_queue_batch_size: int = 8
+    db_queue_poll_seconds: float = 1.0
+    result_buffer_pages: int = 32
+    result_buffer_ms: int = 500
+    page_lease_seconds: int = 120
+    page_heartbeat_seconds: int = 30
+    page_queue_lease_seconds: int = 21600
+    page_max_attempts: int = 3
+    size_class_large_megapixels: float = 20.0
+    size_class_huge_megapixels: float = 80.0
+    fair_share_role_weights: dict[str, float] = {"user": 1.0, "admin": 2.0}
     tika_url: str = "http://tika:9998/tika"
+    reclaim_batch_size: int = 50
+    reclaim_concurrency: int = 8
+    orphan_grace_hours: int = 1
+    report_shard_pages: int = 200
+    report_pool_workers: int = 2
+    report_stale_minutes: int = 120
+    event_flush_interval_ms: int = 250
+    event_buffer_size: int = 1000
     recaptcha_site_key: str = ""
     recaptcha_secret_key: str = ""
     recaptcha_min_score: float = 0.5
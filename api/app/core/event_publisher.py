@@ -0,0 +1,168 @@
+import atexit
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from kombu import Connection, Exchange, Producer
+
+from app.core.config import settings
+
+
+class EventPublisher:
+    """Per-process producer that publishes broker events from a background thread.
+
+    Callers never touch the network: ``publish`` drops the event into a bounded
+    buffer and returns. A flusher thread wakes at most once per
+    ``flush_interval`` seconds and publishes everything buffered over a single
+    long-lived connection, so bursts go out as one batch.
+
+    Events that share a ``coalesce_key`` replace each other while buffered, which
+    throttles rapid progress updates to one message per key per flush and keeps
+    only the latest state. When the buffer is full the oldest coalescable event
+    is evicted; if every buffered event is unique, ``publish`` waits for the next
+    flush rather than dropping it.
+    """
+
+    def __init__(self, broker_url: str, flush_interval: float, max_buffered: int):
+        self._broker_url = broker_url
+        self._flush_interval = flush_interval
+        self._max_buffered = max(1, max_buffered)
+        self._buffer: OrderedDict[object, tuple[Exchange, dict]] = OrderedDict()
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="event-publisher")
+        self._thread.start()
+
+    def publish(self, exchange: Exchange, payload: dict, coalesce_key: str | None = None) -> None:
+        key = ("coalesce", coalesce_key) if coalesce_key is not None else ("unique", next(self._sequence))
+        with self._cond:
+            if key in self._buffer:
+                del self._buffer[key]
+            while len(self._buffer) >= self._max_buffered and not self._stopping:
+                victim = next((k for k in self._buffer if k[0] == "coalesce"), None)
+                if victim is None:
+                    self._cond.notify_all()
+                    self._cond.wait(self._flush_interval)
+                    continue
+                del self._buffer[victim]
+            self._buffer[key] = (exchange, payload)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything buffered so far has been handed to the broker."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while (self._buffer or self._in_flight) and time.monotonic() < deadline:
+                self._cond.wait(min(self._flush_interval, max(0.0, deadline - time.monotonic())))
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _take_batch(self) -> list[tuple[Exchange, dict]]:
+        with self._cond:
+            while not self._buffer and not self._stopping:
+                self._cond.wait()
+            batch = list(self._buffer.values())
+            self._buffer.clear()
+            self._in_flight = len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def _batch_done(self) -> None:
+        with self._cond:
+            self._in_flight = 0
+            self._cond.notify_all()
+
+    def _requeue(self, batch: list[tuple[Exchange, dict]]) -> None:
+        with self._cond:
+            pending = list(self._buffer.items())
+            self._buffer.clear()
+            for item in batch[-self._max_buffered:]:
+                self._buffer[("unique", next(self._sequence))] = item
+            # Anything published while the batch was in flight is newer; keep it last.
+            for key, item in pending:
+                self._buffer.pop(key, None)
+                self._buffer[key] = item
+            while len(self._buffer) > self._max_buffered:
+                self._buffer.popitem(last=False)
+
+    def _run(self) -> None:
+        connection: Connection | None = None
+        producer: Producer | None = None
+        while True:
+            batch = self._take_batch()
+            if not batch and self._stopping:
+                break
+            try:
+                if connection is None:
+                    connection = Connection(self._broker_url)
+                    connection.ensure_connection(max_retries=3)
+                    producer = Producer(connection)
+                for exchange, payload in batch:
+                    producer.publish(
+                        payload,
+                        exchange=exchange,
+                        routing_key="",
+                        serializer="json",
+                        declare=[exchange],
+                        retry=True,
+                        retry_policy={"interval_start": 0, "interval_step": 1, "interval_max": 5, "max_retries": 3},
+                    )
+            except Exception:
+                if connection is not None:
+                    connection.release()
+                connection = producer = None
+                self._requeue(batch)
+                if self._stopping:
+                    break
+            finally:
+                self._batch_done()
+            if self._stopping:
+                continue
+            time.sleep(self._flush_interval)
+        if connection is not None:
+            connection.release()
+
+
+_lock = threading.Lock()
+_publisher: EventPublisher | None = None
+_publisher_pid: int | None = None
+
+
+def get_event_publisher() -> EventPublisher:
+    """Return this process's publisher, creating it on first use.
+
+    Keyed by pid so Celery prefork children never share a connection or flusher
+    thread inherited from the parent.
+    """
+    global _publisher, _publisher_pid
+    with _lock:
+        if _publisher is None or _publisher_pid != os.getpid():
+            _publisher = EventPublisher(
+                settings.celery_broker_url,
+                flush_interval=settings.event_flush_interval_ms / 1000,
+                max_buffered=settings.event_buffer_size,
+            )
+            _publisher_pid = os.getpid()
+        return _publisher
+
+
+@atexit.register
+def close_event_publisher() -> None:
+    """Flush and stop this process's publisher.
+
+    Runs at interpreter exit; Celery prefork children leave through
+    ``os._exit`` and skip atexit, so the worker also calls this from its
+    ``worker_process_shutdown`` handler.
+    """
+    if _publisher is not None and _publisher_pid == os.getpid():
+        _publisher.close()
@@ -3,7 +3,9 @@ import threading
 import time
 from typing import Callable
 
-from kombu import Connection, Consumer, Exchange, Queue, Producer
+from kombu import Connection, Consumer, Exchange, Queue
+
+from app.core.event_publisher import get_event_publisher
 
 
 EXCHANGE_NAME = "reports.events"
@@ -13,23 +15,13 @@ def _exchange() -> Exchange:
     return Exchange(EXCHANGE_NAME, type="fanout", durable=True)
 
 
-def publish_report_event(payload: dict, broker_url: str) -> None:
-    exchange = _exchange()
-    with Connection(broker_url) as connection:
-        producer = Producer(connection)
-        producer.publish(
-            payload,
-            exchange=exchange,
-            routing_key="",
-            serializer="json",
-            retry=True,
-            retry_policy={
-                "interval_start": 0,
-                "interval_step": 1,
-                "interval_max": 5,
-                "max_retries": 3,
-            },
-        )
+def publish_report_event(payload: dict) -> None:
+    """Queue a report event on this process's pooled publisher.
+
+    Events for the same report coalesce until the next flush, so only the latest
+    progress/status for each report is sent.
+    """
+    get_event_publisher().publish(_exchange(), payload, coalesce_key=f"report:{payload.get('report_id')}")
 
 
 def start_report_event_consumer(
@@ -0,0 +1,43 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from app.core.config import settings
+
+
+_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_report_pool() -> ProcessPoolExecutor:
+    """Return the per-process pool used for CPU-heavy report rendering.
+
+    Created on first use so processes that never render reports (and the Celery
+    workers, which import the same services) do not pay for it. Children are
+    spawned rather than forked so they do not inherit the event loop or open
+    database connections.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.report_pool_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+async def run_in_report_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_report_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_report_pool() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,41 @@
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Return a time-ordered UUID (RFC 9562 version 7).
+
+    The top 48 bits hold the unix timestamp in milliseconds, so values created
+    later sort later and new rows append to the right edge of a btree index
+    instead of landing on random leaf pages. The 12-bit ``rand_a`` field is used
+    as a per-process counter to keep ids monotonic within the same millisecond.
+    """
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted within one millisecond: borrow the next one.
+                _last_ms += 1
+                _counter = 0
+        timestamp = _last_ms
+        counter = _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (timestamp & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
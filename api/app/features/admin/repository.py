@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import select
@@ -13,28 +14,25 @@ class AdminRepository:
         self._session = session
 
     async def list_jobs(self) -> list[Job]:
-        result = await self._session.execute(select(Job))
+        result = await self._session.execute(select(Job).where(Job.deleted_at.is_(None)))
         return list(result.scalars().all())
 
     async def get_job(self, job_id: str) -> Optional[Job]:
-        result = await self._session.execute(select(Job).where(Job.id == job_id))
+        result = await self._session.execute(select(Job).where(Job.id == job_id, Job.deleted_at.is_(None)))
         return result.scalar_one_or_none()
 
     async def list_users(self) -> list[User]:
-        result = await self._session.execute(select(User))
+        result = await self._session.execute(select(User).where(User.deleted_at.is_(None)))
         return list(result.scalars().all())
 
     async def get_user(self, user_id: str) -> Optional[User]:
-        result = await self._session.execute(select(User).where(User.id == user_id))
+        result = await self._session.execute(select(User).where(User.id == user_id, User.deleted_at.is_(None)))
         return result.scalar_one_or_none()
 
-    async def list_job_ids_for_user(self, user_id: str) -> list[str]:
-        result = await self._session.execute(select(Job.id).where(Job.user_id == user_id))
-        return [str(job_id) for job_id in result.scalars().all()]
-
     async def list_report_ids_for_user(self, user_id: str) -> list[str]:
         result = await self._session.execute(select(Report.id).where(Report.user_id == user_id))
         return [str(report_id) for report_id in result.scalars().all()]
 
-    async def delete_user(self, user: User) -> None:
-        await self._session.delete(user)
+    async def tombstone_user(self, user: User) -> None:
+        user.is_active = False
+        user.deleted_at = datetime.utcnow()
@@ -61,6 +61,10 @@ class AdminCountsMessage(BaseModel):
     pages_total: int
     pdf_files_total: int
     overlay_images_total: int
+    compare_cache_entries: int = 0
+    compare_cache_lookups: int = 0
+    compare_cache_hits: int = 0
+    compare_cache_hit_ratio: float | None = None
 
 
 class AdminSystemStatsMessage(BaseModel):
@@ -74,8 +78,19 @@ class AdminSystemStatsMessage(BaseModel):
     memory_used_percent: float | None
 
 
+class AdminDispatchStatsMessage(BaseModel):
+    capacity: int
+    throughput_pages_per_second: float
+    mean_page_seconds: float | None
+    estimated_workers: int
+    running: int
+    queued: int
+    target_queue_wait_seconds: float
+
+
 class AdminStatsMessage(BaseModel):
     generated_at: datetime
     storage: AdminStorageStatsMessage
     counts: AdminCountsMessage
     system: AdminSystemStatsMessage
+    dispatch: AdminDispatchStatsMessage
@@ -18,11 +18,13 @@ from app.features.admin.schemas import (
     AdminStorageBucketMessage,
     AdminCountsMessage,
     AdminSystemStatsMessage,
+    AdminDispatchStatsMessage,
 )
 from app.features.auth.models import UserRole
 from app.core.celery_app import celery_app
-from app.features.jobs.service import JobService
-from app.features.jobs.models import Job, JobFile, JobPageResult
+from app.features.jobs.service import JobService, measure_dispatch_window
+from app.features.jobs.models import Job, JobFile, JobPageResult, PageStatus
+from app.features.jobs.repository import CompareCacheRepository, JobPageResultRepository, JobRepository
 from app.core.config import settings
 
 
@@ -114,24 +116,20 @@ class AdminService:
         if str(user.id) == actor_user_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Admins cannot delete themselves")
 
-        job_ids = await self._repo.list_job_ids_for_user(user_id)
         report_ids = await self._repo.list_report_ids_for_user(user_id)
 
-        await self._repo.delete_user(user)
+        # Like job deletion, only tombstones are written here; reclaim_storage
+        # deletes the job rows in batches and the user row after the last one.
+        deleted_jobs = await JobRepository(self._session).tombstone_for_user(user_id)
+        await self._repo.tombstone_user(user)
         await self._session.commit()
 
-        data_dir = Path(settings.data_dir)
-        jobs_dir = data_dir / "jobs"
-        reports_dir = data_dir / "reports"
-        for job_id in job_ids:
-            shutil.rmtree(jobs_dir / job_id, ignore_errors=True)
-        for report_id in report_ids:
-            shutil.rmtree(reports_dir / report_id, ignore_errors=True)
+        celery_app.send_task("reclaim_storage", kwargs={"report_ids": report_ids})
 
         return AdminUserDeleteMessage(
             status="ok",
             deleted_user_id=user_id,
-            deleted_jobs=len(job_ids),
+            deleted_jobs=deleted_jobs,
             deleted_reports=len(report_ids),
         )
 
@@ -143,11 +141,25 @@ class AdminService:
         counts = await self._get_counts()
         storage = self._get_storage_stats()
         system = self._get_system_stats()
+        dispatch = await self._get_dispatch_stats()
         return AdminStatsMessage(
             generated_at=datetime.utcnow(),
             storage=storage,
             counts=counts,
             system=system,
+            dispatch=dispatch,
+        )
+
+    async def _get_dispatch_stats(self) -> AdminDispatchStatsMessage:
+        window = await measure_dispatch_window(JobPageResultRepository(self._session))
+        return AdminDispatchStatsMessage(
+            capacity=window.capacity,
+            throughput_pages_per_second=window.throughput,
+            mean_page_seconds=window.mean_latency,
+            estimated_workers=window.workers,
+            running=window.running,
+            queued=window.queued,
+            target_queue_wait_seconds=window.target_wait,
         )
 
     async def _get_counts(self) -> AdminCountsMessage:
@@ -180,6 +192,17 @@ class AdminService:
         )
         overlay_images_total = int(overlays_result.scalar_one() or 0)
 
+        cache_result = await self._session.execute(
+            select(
+                func.count(),
+                func.count().filter(JobPageResult.cache_hit.is_(True)),
+            ).where(JobPageResult.status.in_([PageStatus.done, PageStatus.incompatible_size]))
+        )
+        cache_lookups, cache_hits = cache_result.one()
+        cache_lookups = int(cache_lookups or 0)
+        cache_hits = int(cache_hits or 0)
+        cache_entries = await CompareCacheRepository(self._session).count()
+
         return AdminCountsMessage(
             jobs_total=jobs_total,
             jobs_by_status=jobs_by_status,
@@ -187,6 +210,10 @@ class AdminService:
             pages_total=pages_total,
             pdf_files_total=pdf_files_total,
             overlay_images_total=overlay_images_total,
+            compare_cache_entries=cache_entries,
+            compare_cache_lookups=cache_lookups,
+            compare_cache_hits=cache_hits,
+            compare_cache_hit_ratio=(cache_hits / cache_lookups) if cache_lookups else None,
         )
 
     def _get_storage_stats(self) -> AdminStorageStatsMessage:
@@ -27,3 +27,5 @@ class User(Base):
     max_pages_per_job: Mapped[int] = mapped_column(Integer, default=10000, nullable=False)
     max_jobs_per_user_per_day: Mapped[int] = mapped_column(Integer, default=20, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    # Set when an admin deletes the user; reclaim_storage removes the row once their jobs are gone.
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
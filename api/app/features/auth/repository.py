@@ -2,11 +2,12 @@ import hashlib
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.features.auth.models import User
 from app.features.auth.refresh_token_model import RefreshToken
+from app.features.jobs.models import Job
 
 
 class UserRepository:
@@ -24,6 +25,16 @@ class UserRepository:
     def add(self, user: User) -> None:
         self._session.add(user)
 
+    async def delete_tombstoned(self) -> int:
+        """Delete tombstoned users that no longer own any job rows."""
+        result = await self._session.execute(
+            delete(User)
+            .where(User.deleted_at.is_not(None))
+            .where(~select(Job.id).where(Job.user_id == User.id).exists())
+            .execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
 
 class RefreshTokenRepository:
     def __init__(self, session: AsyncSession):
@@ -0,0 +1,172 @@
+"""Page alignment for documents whose page counts differ.
+
+Pairing pages strictly by index turns one inserted page into "every later page
+changed". Instead each page gets two cheap fingerprints:
+
+* ``key`` - what alignment matches on: a hash of the page's normalised text, or
+  for pages with little text, a 64-bit difference hash of a tiny grayscale
+  render.
+* ``identity`` - a hash of the page size, content stream and everything the
+  page's resources reach (images, fonts, form XObjects and the forms nested in
+  them), with object numbers replaced by the hash of the object they point to
+  so the same content hashes alike in both files. A pair is marked unchanged
+  without a full-resolution diff only when identities and keys both match.
+
+``align_pages`` runs a sequence alignment over the keys (difflib's
+SequenceMatcher), pairs replaced runs position by position, and finally pairs
+deleted and inserted pages that share a key as moves.
+"""
+from __future__ import annotations
+
+import difflib
+import hashlib
+import re
+from dataclasses import dataclass
+
+import fitz
+
+
+MIN_TEXT_CHARS = 20
+HASH_SIZE = 8
+_WHITESPACE = re.compile(r"\s+")
+_REFERENCE = re.compile(r"\b(\d+) \d+ R\b")
+_TREE_LINK = re.compile(r"/(?:Parent|P)\s*\d+ \d+ R")
+
+
+@dataclass(frozen=True)
+class PageFingerprint:
+    key: str
+    identity: str
+
+
+@dataclass(frozen=True)
+class AlignedPair:
+    index_a: int | None
+    index_b: int | None
+    identical: bool = False
+
+
+def fingerprint_document(doc: fitz.Document) -> list[PageFingerprint]:
+    digests: dict[int, str] = {}
+    return [fingerprint_page(doc, page, digests) for page in doc]
+
+
+def fingerprint_page(doc: fitz.Document, page: fitz.Page, digests: dict[int, str] | None = None) -> PageFingerprint:
+    text = _WHITESPACE.sub(" ", page.get_text("text")).strip()
+    if len(text) >= MIN_TEXT_CHARS:
+        key = "t:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+    else:
+        key = "p:" + _dhash(page)
+
+    identity = hashlib.sha256()
+    identity.update(repr(tuple(page.rect)).encode("ascii"))
+    identity.update(page.read_contents())
+    identity.update(_resources_digest(doc, page, {} if digests is None else digests).encode("ascii"))
+    return PageFingerprint(key=key, identity=identity.hexdigest())
+
+
+def _resources_digest(doc: fitz.Document, page: fitz.Page, digests: dict[int, str]) -> str:
+    """Digest of the page's /Resources, inherited from the page tree if the page has none."""
+    xref = page.xref
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind == "xref":
+            return _object_digest(doc, int(value.split()[0]), digests, set())
+        if kind == "dict":
+            return _canonical_digest(doc, value, digests, set())
+        kind, value = doc.xref_get_key(xref, "Parent")
+        xref = int(value.split()[0]) if kind == "xref" else 0
+    return ""
+
+
+def _object_digest(doc: fitz.Document, xref: int, digests: dict[int, str], active: set[int]) -> str:
+    if xref in digests:
+        return digests[xref]
+    if xref in active:
+        # Reference cycle; the objects on it are hashed by the outer call.
+        return "cycle"
+    active.add(xref)
+    source = doc.xref_object(xref, compressed=True)
+    digest = hashlib.sha256(_canonical_digest(doc, source, digests, active).encode("ascii"))
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    active.discard(xref)
+    digests[xref] = digest.hexdigest()
+    return digests[xref]
+
+
+def _canonical_digest(doc: fitz.Document, source: str, digests: dict[int, str], active: set[int]) -> str:
+    # Back-references into the page tree would pull in every page of the document.
+    source = _TREE_LINK.sub("", source)
+    canonical = _REFERENCE.sub(lambda match: _object_digest(doc, int(match.group(1)), digests, active), source)
+    return hashlib.sha256(canonical.encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def _dhash(page: fitz.Page) -> str:
+    """Difference hash of a (HASH_SIZE + 1) x HASH_SIZE grayscale thumbnail."""
+    rect = page.rect
+    matrix = fitz.Matrix((HASH_SIZE + 1) / max(rect.width, 1), HASH_SIZE / max(rect.height, 1))
+    pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+    samples = pix.samples
+    bits = 0
+    for y in range(min(pix.height, HASH_SIZE)):
+        row = y * pix.stride
+        for x in range(min(pix.width - 1, HASH_SIZE)):
+            bits = (bits << 1) | (samples[row + x] > samples[row + x + 1])
+    return f"{bits:016x}"
+
+
+def align_pages(pages_a: list[PageFingerprint], pages_b: list[PageFingerprint]) -> list[AlignedPair]:
+    """Return the aligned page sequence in B order, with unmatched A pages in place."""
+    matcher = difflib.SequenceMatcher(a=[p.key for p in pages_a], b=[p.key for p in pages_b], autojunk=False)
+    pairs: list[AlignedPair] = []
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        a_range = range(a_start, a_end)
+        b_range = range(b_start, b_end)
+        if tag in ("equal", "replace"):
+            for index_a, index_b in zip(a_range, b_range):
+                pairs.append(AlignedPair(index_a, index_b))
+            common = min(len(a_range), len(b_range))
+            pairs.extend(AlignedPair(index_a, None) for index_a in a_range[common:])
+            pairs.extend(AlignedPair(None, index_b) for index_b in b_range[common:])
+        elif tag == "delete":
+            pairs.extend(AlignedPair(index_a, None) for index_a in a_range)
+        elif tag == "insert":
+            pairs.extend(AlignedPair(None, index_b) for index_b in b_range)
+
+    pairs = _pair_moves(pairs, pages_a, pages_b)
+    return [
+        AlignedPair(
+            pair.index_a,
+            pair.index_b,
+            identical=(
+                pair.index_a is not None
+                and pair.index_b is not None
+                and pages_a[pair.index_a].key == pages_b[pair.index_b].key
+                and pages_a[pair.index_a].identity == pages_b[pair.index_b].identity
+            ),
+        )
+        for pair in pairs
+    ]
+
+
+def _pair_moves(
+    pairs: list[AlignedPair], pages_a: list[PageFingerprint], pages_b: list[PageFingerprint]
+) -> list[AlignedPair]:
+    deleted: dict[str, list[int]] = {}
+    for pair in pairs:
+        if pair.index_b is None:
+            deleted.setdefault(pages_a[pair.index_a].key, []).append(pair.index_a)
+
+    moved_a: set[int] = set()
+    result: list[AlignedPair] = []
+    for pair in pairs:
+        if pair.index_a is None:
+            candidates = deleted.get(pages_b[pair.index_b].key)
+            if candidates:
+                index_a = candidates.pop(0)
+                moved_a.add(index_a)
+                result.append(AlignedPair(index_a, pair.index_b))
+                continue
+        result.append(pair)
+    return [pair for pair in result if not (pair.index_b is None and pair.index_a in moved_a)]
@@ -2,11 +2,12 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Integer, String, Boolean, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.ids import uuid7
 
 
 class JobStatus(str, enum.Enum):
@@ -32,24 +33,44 @@ class TextStatus(str, enum.Enum):
     done = "done"
     missing = "missing"
     failed = "failed"
+    skipped = "skipped"
 
 
 class Job(Base):
     __tablename__ = "jobs"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.created, nullable=False)
     set_a_label: Mapped[str | None] = mapped_column(String(255), nullable=True)
     set_b_label: Mapped[str | None] = mapped_column(String(255), nullable=True)
     has_diffs: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    incremental_report: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    profile: Mapped[str] = mapped_column(String(32), default="standard", nullable=False)
+    render_dpi: Mapped[int] = mapped_column(Integer, default=150, nullable=False)
+    diff_threshold: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
+    # Morphology passes the current scores were computed with; part of the compare cache key.
+    open_iterations: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    close_iterations: Mapped[int] = mapped_column(Integer, default=2, nullable=False)
+    generate_overlays: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    extract_text: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    diff_mode: Mapped[str] = mapped_column(String(16), default="raster", nullable=False)
+    page_order: Mapped[str] = mapped_column(String(16), default="preview", nullable=False)
+    lazy_compare: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Streaming start: files are planned as their pairs land until the upload session closes.
+    upload_open: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Set when a streaming job's upload session ends; later uploads are rejected.
+    uploads_closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Pages of the pairs accepted so far in a streaming job, checked against max_pages_per_job.
+    streamed_pages: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
 
 class JobFile(Base):
     __tablename__ = "job_files"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), index=True)
     relative_path: Mapped[str] = mapped_column(String(1024), nullable=False)
     set_a_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
@@ -61,15 +82,28 @@ class JobFile(Base):
     text_set_a_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     text_set_b_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     text_error: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    set_a_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    set_b_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Last time the file was opened in the viewer; viewed files are dispatched first.
+    viewed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set once the file's page rows exist; a job cannot complete while any file is unplanned.
+    planned_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
 
 class JobPageResult(Base):
     __tablename__ = "job_page_results"
+    # Range-partitioned by day on created_at (see migration 0015) so retention can
+    # drop whole partitions; Postgres requires the partition key in the primary key.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     job_file_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("job_files.id", ondelete="CASCADE"), index=True)
     page_index: Mapped[int] = mapped_column(nullable=False)
+    # Source pages when alignment paired pages that are not at the same index;
+    # NULL means page_index on that side.
+    page_index_a: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    page_index_b: Mapped[int | None] = mapped_column(Integer, nullable=True)
     status: Mapped[PageStatus] = mapped_column(Enum(PageStatus), default=PageStatus.pending, nullable=False)
     diff_score: Mapped[float | None] = mapped_column(nullable=True)
     task_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -77,5 +111,70 @@ class JobPageResult(Base):
     missing_in_set_a: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     missing_in_set_b: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     overlay_svg_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    # Set when overlay_svg_path is a pack file (see app.features.jobs.packfile).
+    overlay_offset: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    overlay_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Optional zlib-compressed diff magnitude map in a pack file, used by rescore_job.
+    magnitude_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    magnitude_offset: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    magnitude_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    diff_method: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Larger extent of the two source pages in points, recorded at prescan for size-class routing.
+    width_pt: Mapped[float | None] = mapped_column(nullable=True)
+    height_pt: Mapped[float | None] = mapped_column(nullable=True)
     error_message: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    cache_hit: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    # Set when the page task is sent and renewed by the worker's heartbeat while it
+    # runs; the reaper requeues pages whose lease ran out (see reap_page_leases).
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Size-class queue the page was dispatched to; the DB work queue claims by it.
+    dispatch_queue: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=datetime.utcnow, nullable=False
+    )
+
+    @property
+    def source_index_a(self) -> int:
+        return self.page_index if self.page_index_a is None else self.page_index_a
+
+    @property
+    def source_index_b(self) -> int:
+        return self.page_index if self.page_index_b is None else self.page_index_b
+
+
+class CompareCacheEntry(Base):
+    """Page comparison result shared across jobs, keyed by the content hashes of both files."""
+
+    __tablename__ = "compare_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "hash_a",
+            "hash_b",
+            "page_index",
+            "render_dpi",
+            "diff_threshold",
+            "open_iterations",
+            "close_iterations",
+            name="uq_compare_cache_key",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    hash_a: Mapped[str] = mapped_column(String(64), nullable=False)
+    hash_b: Mapped[str] = mapped_column(String(64), nullable=False)
+    page_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    render_dpi: Mapped[int] = mapped_column(Integer, nullable=False)
+    diff_threshold: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_iterations: Mapped[int] = mapped_column(Integer, nullable=False)
+    close_iterations: Mapped[int] = mapped_column(Integer, nullable=False)
+    diff_score: Mapped[float | None] = mapped_column(nullable=True)
+    incompatible_size: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    boxes: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,53 @@
+"""Append-only pack files for small per-page artifacts.
+
+Overlays used to be one SVG file per page, which meant one inode per page on
+shared storage. Instead each writer process appends records to its own pack
+file under the job's ``artifacts`` directory; the page row stores the pack
+path plus the record's offset and length, so the database is the index and a
+read is a single seek. Rows without an offset still point at a loose file
+written before packs existed, and ``read_artifact`` handles both.
+"""
+from __future__ import annotations
+
+import fcntl
+import os
+import socket
+from pathlib import Path
+
+
+def pack_path_for(artifacts_dir: Path, kind: str) -> Path:
+    """Pack owned by this process, so concurrent workers never share an append stream."""
+    return artifacts_dir / f"{kind}-{socket.gethostname()}-{os.getpid()}.pack"
+
+
+def append_record(pack_path: Path, data: bytes) -> int:
+    """Append ``data`` to ``pack_path`` and return the offset it starts at."""
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(pack_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        # The pack is per process, but take the lock anyway in case two processes
+        # end up with the same name (pid reuse across container restarts).
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        offset = os.lseek(fd, 0, os.SEEK_END)
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        return offset
+    finally:
+        os.close(fd)
+
+
+def read_record(pack_path: Path, offset: int, length: int) -> bytes:
+    with pack_path.open("rb") as handle:
+        handle.seek(offset)
+        data = handle.read(length)
+    if len(data) != length:
+        raise ValueError(f"Truncated record in {pack_path} at {offset}")
+    return data
+
+
+def read_artifact(path: Path, offset: int | None, length: int | None) -> bytes:
+    if offset is None or length is None:
+        return path.read_bytes()
+    return read_record(path, offset, length)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class JobProfile:
+    name: str
+    render_dpi: int
+    diff_threshold: int
+    generate_overlays: bool
+    extract_text: bool
+    diff_mode: str = "raster"
+
+
+QUICK_SCAN_DPI = 50
+FORENSIC_DPI = 300
+
+
+def job_profiles() -> dict[str, JobProfile]:
+    """Named render/diff presets a job can be started with.
+
+    ``quick`` answers "does this page differ" only: low DPI, no overlay regions
+    and no text extraction. ``forensic`` renders at high DPI for small changes.
+    Every profile diffs rendered pixels unless the caller asks for ``vector``.
+    """
+    return {
+        "standard": JobProfile("standard", settings.render_dpi, settings.diff_threshold, True, True),
+        "quick": JobProfile("quick", QUICK_SCAN_DPI, settings.diff_threshold, False, False),
+        "forensic": JobProfile("forensic", FORENSIC_DPI, settings.diff_threshold, True, True),
+    }
+
+
+def resolve_profile(
+    name: str,
+    render_dpi: int | None = None,
+    diff_threshold: int | None = None,
+    diff_mode: str | None = None,
+) -> JobProfile:
+    profile = job_profiles().get(name)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown profile")
+    return JobProfile(
+        name=profile.name,
+        render_dpi=render_dpi or profile.render_dpi,
+        diff_threshold=profile.diff_threshold if diff_threshold is None else diff_threshold,
+        generate_overlays=profile.generate_overlays,
+        extract_text=profile.extract_text,
+        diff_mode=diff_mode or profile.diff_mode,
+    )
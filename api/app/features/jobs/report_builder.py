@@ -0,0 +1,465 @@
+"""Visual diff report built with PyMuPDF.
+
+Diff pages embed the original PDF pages (clipped to the changed area) as vector
+form XObjects via ``show_pdf_page`` and draw the highlight circles as vector
+shapes, so nothing is rasterised and each source document is opened once.
+
+The builders here take plain, picklable inputs (no ORM objects or sessions) so
+they can run in a worker process as well as inline.
+"""
+from __future__ import annotations
+
+import difflib
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+
+import fitz
+
+from app.features.jobs.packfile import read_artifact
+
+
+PAGE_WIDTH = 612.0
+PAGE_HEIGHT = 792.0
+INCH = 72.0
+HIGHLIGHT_COLOR = (1, 0, 0)
+CLIP_PADDING_PX = 100.0
+
+_FONT = "helv"
+_FONT_BOLD = "hebo"
+_SVG_NS = {"svg": "http://www.w3.org/2000/svg"}
+
+
+@dataclass
+class ReportPage:
+    page_index: int
+    diff_score: float
+    overlay_path: Path
+    fragment_path: Path | None = None
+    overlay_offset: int | None = None
+    overlay_length: int | None = None
+    # Source pages when alignment paired different indexes; None means page_index.
+    source_index_a: int | None = None
+    source_index_b: int | None = None
+
+
+@dataclass
+class ReportFileEntry:
+    relative_path: str
+    bookmark: str
+    missing_in_set_a: bool
+    missing_in_set_b: bool
+    total_pages: int
+    diff_pages_count: int
+    set_a_pdf: Path | None
+    set_b_pdf: Path | None
+    diff_pages: list[ReportPage] = field(default_factory=list)
+    continuation: bool = False
+
+    @property
+    def section_pages(self) -> int:
+        return (0 if self.continuation else 1) + len(self.diff_pages)
+
+
+@dataclass
+class ReportHeader:
+    display_id: str
+    set_a_label: str
+    set_b_label: str
+    created: str
+    status: str
+
+
+@dataclass
+class TextReportFile:
+    relative_path: str
+    text_a_path: Path | None
+    text_b_path: Path | None
+
+
+def build_text_report(output_path: Path, header: ReportHeader, files: list[TextReportFile]) -> None:
+    """Write a unified diff of the extracted text of every file pair."""
+    diffs_found = False
+    with output_path.open("w", encoding="utf-8") as handle:
+        handle.write("# PDF Diff Text Report\n")
+        handle.write(f"# Job ID: {header.display_id}\n")
+        handle.write(f"# Set A: {header.set_a_label}\n")
+        handle.write(f"# Set B: {header.set_b_label}\n")
+        handle.write("\n")
+
+        for item in files:
+            a_lines = _read_text(item.text_a_path).splitlines(keepends=True)
+            b_lines = _read_text(item.text_b_path).splitlines(keepends=True)
+
+            has_diff = False
+            for line in difflib.unified_diff(
+                a_lines,
+                b_lines,
+                fromfile=f"a/{item.relative_path}",
+                tofile=f"b/{item.relative_path}",
+                lineterm="",
+            ):
+                handle.write(line + "\n")
+                has_diff = True
+
+            if has_diff:
+                diffs_found = True
+                handle.write("\n")
+
+        if not diffs_found:
+            handle.write("# No text differences detected.\n")
+
+
+def _read_text(path: Path | None) -> str:
+    if not path or not path.exists():
+        return ""
+    try:
+        return path.read_text(encoding="utf-8")
+    except Exception:
+        return ""
+
+
+def build_visual_report(output_path: Path, header: ReportHeader, entries: list[ReportFileEntry]) -> None:
+    """Build the whole report in-process."""
+    doc = fitz.open()
+    try:
+        toc_links, outline = _front_matter(doc, header, entries)
+        for entry in entries:
+            _append_file_section(doc, header, entry)
+        _finalize(doc, output_path, toc_links, outline)
+    finally:
+        doc.close()
+
+
+def build_sections(output_path: Path, header: ReportHeader, entries: list[ReportFileEntry]) -> None:
+    """Render only the file sections of ``entries``; used for one shard of a sharded report."""
+    doc = fitz.open()
+    try:
+        for entry in entries:
+            _append_file_section(doc, header, entry)
+        doc.save(str(output_path), garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+
+def assemble_report(
+    output_path: Path,
+    header: ReportHeader,
+    entries: list[ReportFileEntry],
+    section_paths: list[Path],
+) -> None:
+    """Prepend title and TOC to rendered shard files; ``entries`` only needs TOC fields here."""
+    doc = fitz.open()
+    try:
+        toc_links, outline = _front_matter(doc, header, entries)
+        for section_path in section_paths:
+            with fitz.open(section_path) as part:
+                doc.insert_pdf(part)
+        _finalize(doc, output_path, toc_links, outline)
+    finally:
+        doc.close()
+
+
+def plan_shards(entries: list[ReportFileEntry], max_pages: int) -> list[list[ReportFileEntry]]:
+    """Split entries into shards of roughly ``max_pages`` report pages.
+
+    Files with more diff pages than fit in one shard are split into continuation
+    entries that render only diff pages; page numbering is unaffected.
+    """
+    max_pages = max(1, max_pages)
+    shards: list[list[ReportFileEntry]] = []
+    current: list[ReportFileEntry] = []
+    current_pages = 0
+    for entry in entries:
+        pieces = [entry]
+        if entry.section_pages > max_pages:
+            first = replace(entry, diff_pages=entry.diff_pages[: max_pages - 1])
+            pieces = [first]
+            for start in range(max_pages - 1, len(entry.diff_pages), max_pages):
+                pieces.append(
+                    replace(entry, diff_pages=entry.diff_pages[start:start + max_pages], continuation=True)
+                )
+        for piece in pieces:
+            if current and current_pages + piece.section_pages > max_pages:
+                shards.append(current)
+                current, current_pages = [], 0
+            current.append(piece)
+            current_pages += piece.section_pages
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _front_matter(
+    doc: fitz.Document, header: ReportHeader, entries: list[ReportFileEntry]
+) -> tuple[list[tuple[int, fitz.Rect, int]], list[list]]:
+    _title_page(doc, header)
+
+    toc_start_y = 1.6 * INCH
+    toc_bottom_y = PAGE_HEIGHT - 1 * INCH
+    toc_line_height = 0.28 * INCH
+    toc_lines_per_page = max(1, int((toc_bottom_y - toc_start_y) / toc_line_height))
+    toc_pages = (len(entries) + toc_lines_per_page - 1) // toc_lines_per_page if entries else 1
+
+    page_numbers: list[int] = []
+    current_page_number = 1 + toc_pages + 1
+    for entry in entries:
+        page_numbers.append(current_page_number)
+        current_page_number += entry.section_pages
+
+    toc_links: list[tuple[int, fitz.Rect, int]] = []
+    for toc_page_index in range(toc_pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((0.75 * INCH, 1 * INCH), "Table of Contents", fontname=_FONT_BOLD, fontsize=18)
+        y_pos = toc_start_y
+        start_idx = toc_page_index * toc_lines_per_page
+        for offset, entry in enumerate(entries[start_idx:start_idx + toc_lines_per_page]):
+            page_number = page_numbers[start_idx + offset]
+            status = ""
+            if entry.missing_in_set_a:
+                status = " (Missing in Set A)"
+            elif entry.missing_in_set_b:
+                status = " (Missing in Set B)"
+            page.insert_text((0.75 * INCH, y_pos), f"{entry.relative_path}{status}", fontname=_FONT, fontsize=11)
+            _right_text(page, PAGE_WIDTH - 0.75 * INCH, y_pos, str(page_number), _FONT, 11)
+            rect = fitz.Rect(0.75 * INCH, y_pos - 10, PAGE_WIDTH - 0.75 * INCH, y_pos + 2)
+            toc_links.append((page.number, rect, page_number - 1))
+            y_pos += toc_line_height
+
+    outline = [[1, entry.relative_path, page_number] for entry, page_number in zip(entries, page_numbers)]
+    return toc_links, outline
+
+
+def _finalize(
+    doc: fitz.Document,
+    output_path: Path,
+    toc_links: list[tuple[int, fitz.Rect, int]],
+    outline: list[list],
+) -> None:
+    for page_index, rect, target in toc_links:
+        doc[page_index].insert_link({"kind": fitz.LINK_GOTO, "from": rect, "page": target})
+    doc.set_toc(outline)
+    doc.save(str(output_path), garbage=3, deflate=True)
+
+
+def entry_to_dict(entry: ReportFileEntry) -> dict:
+    data = asdict(entry)
+    for key in ("set_a_pdf", "set_b_pdf"):
+        data[key] = str(data[key]) if data[key] else None
+    for page in data["diff_pages"]:
+        page["overlay_path"] = str(page["overlay_path"])
+        page["fragment_path"] = str(page["fragment_path"]) if page["fragment_path"] else None
+    return data
+
+
+def entry_from_dict(data: dict) -> ReportFileEntry:
+    return ReportFileEntry(
+        relative_path=data["relative_path"],
+        bookmark=data["bookmark"],
+        missing_in_set_a=data["missing_in_set_a"],
+        missing_in_set_b=data["missing_in_set_b"],
+        total_pages=data["total_pages"],
+        diff_pages_count=data["diff_pages_count"],
+        set_a_pdf=Path(data["set_a_pdf"]) if data["set_a_pdf"] else None,
+        set_b_pdf=Path(data["set_b_pdf"]) if data["set_b_pdf"] else None,
+        diff_pages=[
+            ReportPage(
+                page["page_index"],
+                page["diff_score"],
+                Path(page["overlay_path"]),
+                Path(page["fragment_path"]) if page.get("fragment_path") else None,
+                page.get("overlay_offset"),
+                page.get("overlay_length"),
+                page.get("source_index_a"),
+                page.get("source_index_b"),
+            )
+            for page in data["diff_pages"]
+        ],
+        continuation=data.get("continuation", False),
+    )
+
+
+def _append_file_section(doc: fitz.Document, header: ReportHeader, entry: ReportFileEntry) -> None:
+    if not entry.continuation:
+        _append_file_header(doc, entry)
+    if not entry.diff_pages:
+        return
+
+    # Pages pre-rendered by compare_page are copied in as-is; the sources are
+    # only opened when at least one page still has to be drawn here.
+    src_a = src_b = None
+    if any(page.fragment_path is None for page in entry.diff_pages):
+        src_a = _open_source(entry.set_a_pdf)
+        src_b = _open_source(entry.set_b_pdf)
+    try:
+        for diff_page in entry.diff_pages:
+            if diff_page.fragment_path is not None:
+                with fitz.open(str(diff_page.fragment_path)) as fragment:
+                    doc.insert_pdf(fragment)
+            else:
+                append_diff_page(doc, header, diff_page, src_a, src_b)
+    finally:
+        for src in (src_a, src_b):
+            if src is not None:
+                src.close()
+
+
+def _append_file_header(doc: fitz.Document, entry: ReportFileEntry) -> None:
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text((0.75 * INCH, 1 * INCH), f"File: {entry.relative_path}", fontname=_FONT_BOLD, fontsize=16)
+    y_pos = 1.5 * INCH
+    if entry.missing_in_set_a:
+        page.insert_text((0.75 * INCH, y_pos), "Status: Missing in Set A", fontname=_FONT, fontsize=11)
+    elif entry.missing_in_set_b:
+        page.insert_text((0.75 * INCH, y_pos), "Status: Missing in Set B", fontname=_FONT, fontsize=11)
+    else:
+        page.insert_text((0.75 * INCH, y_pos), f"Total Pages: {entry.total_pages}", fontname=_FONT, fontsize=11)
+        page.insert_text(
+            (0.75 * INCH, y_pos + 0.3 * INCH),
+            f"Pages with Diffs: {entry.diff_pages_count}",
+            fontname=_FONT,
+            fontsize=11,
+        )
+
+
+def build_page_fragment(
+    output_path: Path,
+    header: ReportHeader,
+    diff_page: ReportPage,
+    set_a_pdf: Path | None,
+    set_b_pdf: Path | None,
+) -> None:
+    """Render one diff page on its own so the final report can copy it in unchanged."""
+    doc = fitz.open()
+    src_a = _open_source(set_a_pdf)
+    src_b = _open_source(set_b_pdf)
+    try:
+        append_diff_page(doc, header, diff_page, src_a, src_b)
+        doc.save(str(output_path), garbage=3, deflate=True)
+    finally:
+        for src in (src_a, src_b):
+            if src is not None:
+                src.close()
+        doc.close()
+
+
+def fragment_path_for(artifacts_dir: Path, file_id: str, page_index: int) -> Path:
+    return artifacts_dir / file_id / f"page_{page_index}.report.pdf"
+
+
+def append_diff_page(
+    doc: fitz.Document,
+    header: ReportHeader,
+    diff_page: ReportPage,
+    src_a: fitz.Document | None,
+    src_b: fitz.Document | None,
+) -> None:
+    index_a = diff_page.page_index if diff_page.source_index_a is None else diff_page.source_index_a
+    index_b = diff_page.page_index if diff_page.source_index_b is None else diff_page.source_index_b
+    title = f"Page {index_a + 1}" if index_a == index_b else f"Page {index_a + 1} (A) / {index_b + 1} (B)"
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text(
+        (0.75 * INCH, 1 * INCH),
+        f"{title} - Diff Score: {diff_page.diff_score:.2f}",
+        fontname=_FONT_BOLD,
+        fontsize=14,
+    )
+    try:
+        svg_width, svg_height, circles = read_overlay_circles(
+            read_artifact(diff_page.overlay_path, diff_page.overlay_offset, diff_page.overlay_length)
+        )
+        has_a = src_a is not None and index_a < src_a.page_count
+        has_b = src_b is not None and index_b < src_b.page_count
+        top = 1.5 * INCH
+        if has_a and has_b:
+            page.insert_text((0.75 * INCH, 1.3 * INCH), f"Set A: {header.set_a_label}", fontname=_FONT, fontsize=14)
+            page.insert_text((4.25 * INCH, 1.3 * INCH), f"Set B: {header.set_b_label}", fontname=_FONT, fontsize=14)
+            for src, index, left in ((src_a, index_a, 0.75 * INCH), (src_b, index_b, 4.25 * INCH)):
+                _place_clip(page, src, index, svg_width, svg_height, circles, left, top, 3 * INCH, 7 * INCH)
+        elif has_a or has_b:
+            src, index = (src_a, index_a) if has_a else (src_b, index_b)
+            label = f"Set A: {header.set_a_label}" if has_a else f"Set B: {header.set_b_label}"
+            page.insert_text((0.75 * INCH, 1.3 * INCH), label, fontname=_FONT, fontsize=14)
+            _place_clip(page, src, index, svg_width, svg_height, circles, 0.75 * INCH, top, 6.5 * INCH, 8 * INCH)
+        else:
+            page.insert_text((0.75 * INCH, 2 * INCH), "No PDF files found", fontname=_FONT, fontsize=10)
+    except Exception as exc:
+        page.insert_text((0.75 * INCH, 2 * INCH), f"Error: {exc}", fontname=_FONT, fontsize=10)
+
+
+def read_overlay_circles(svg: bytes) -> tuple[float, float, list[tuple[float, float, float]]]:
+    root = ET.fromstring(svg)
+    view_box = root.get("viewBox", "0 0 1275 1650").split()
+    svg_width = float(view_box[2])
+    svg_height = float(view_box[3])
+    circles = [
+        (float(circle.get("cx", 0)), float(circle.get("cy", 0)), float(circle.get("r", 30)))
+        for circle in (root.findall(".//svg:circle", _SVG_NS) or root.findall(".//circle"))
+    ]
+    return svg_width, svg_height, circles
+
+
+def _place_clip(
+    page: fitz.Page,
+    src: fitz.Document,
+    page_index: int,
+    svg_width: float,
+    svg_height: float,
+    circles: list[tuple[float, float, float]],
+    left: float,
+    top: float,
+    max_width: float,
+    max_height: float,
+) -> None:
+    src_rect = src[page_index].rect
+    pt_per_px_x = src_rect.width / svg_width
+    pt_per_px_y = src_rect.height / svg_height
+
+    clip = fitz.Rect(src_rect)
+    if circles:
+        min_x = max(0.0, min(cx - r for cx, _, r in circles) - CLIP_PADDING_PX)
+        min_y = max(0.0, min(cy - r for _, cy, r in circles) - CLIP_PADDING_PX)
+        max_x = min(svg_width, max(cx + r for cx, _, r in circles) + CLIP_PADDING_PX)
+        max_y = min(svg_height, max(cy + r for _, cy, r in circles) + CLIP_PADDING_PX)
+        clip = fitz.Rect(
+            src_rect.x0 + min_x * pt_per_px_x,
+            src_rect.y0 + min_y * pt_per_px_y,
+            src_rect.x0 + max(max_x, min_x + 1) * pt_per_px_x,
+            src_rect.y0 + max(max_y, min_y + 1) * pt_per_px_y,
+        )
+
+    scale = min(max_width / clip.width, max_height / clip.height)
+    target = fitz.Rect(left, top, left + clip.width * scale, top + clip.height * scale)
+    page.show_pdf_page(target, src, page_index, clip=clip)
+
+    for cx, cy, r in circles:
+        center = fitz.Point(
+            target.x0 + (src_rect.x0 + cx * pt_per_px_x - clip.x0) * scale,
+            target.y0 + (src_rect.y0 + cy * pt_per_px_y - clip.y0) * scale,
+        )
+        page.draw_circle(center, r * pt_per_px_x * scale, color=HIGHLIGHT_COLOR, width=1.5)
+
+
+def _title_page(doc: fitz.Document, header: ReportHeader) -> None:
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text((1 * INCH, 1.5 * INCH), "PDF Diff Report", fontname=_FONT_BOLD, fontsize=24)
+    lines = [
+        f"Job ID: {header.display_id}",
+        f"Set A: {header.set_a_label}",
+        f"Set B: {header.set_b_label}",
+        f"Created: {header.created}",
+        f"Status: {header.status}",
+    ]
+    for offset, line in enumerate(lines):
+        page.insert_text((1 * INCH, (2 + 0.3 * offset) * INCH), line, fontname=_FONT, fontsize=12)
+
+
+def _right_text(page: fitz.Page, right: float, y: float, text: str, fontname: str, fontsize: float) -> None:
+    width = fitz.get_text_length(text, fontname=fontname, fontsize=fontsize)
+    page.insert_text((right - width, y), text, fontname=fontname, fontsize=fontsize)
+
+
+def _open_source(path: Path | None) -> fitz.Document | None:
+    if not path or not path.exists():
+        return None
+    return fitz.open(path)
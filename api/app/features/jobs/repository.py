@@ -1,10 +1,45 @@
-from typing import Iterable, Optional
+import uuid
+from typing import Iterable, NamedTuple, Optional
 
-from sqlalchemy import delete, func, select, update
-from datetime import datetime, timedelta
+from sqlalchemy import case, cast, column, delete, func, literal_column, select, text, update, values
+from datetime import date, datetime, timedelta
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.features.jobs.models import Job, JobFile, JobPageResult
+from app.db.ids import uuid7
+from app.features.jobs.models import CompareCacheEntry, Job, JobFile, JobPageResult, JobStatus, PageStatus
+
+
+PAGE_RESULT_PARTITION_PREFIX = "job_page_results_p"
+PAGE_RESULT_DEFAULT_PARTITION = "job_page_results_default"
+
+
+class PageOutcome(NamedTuple):
+    """Result of one compare attempt, written back only while that attempt still holds the page."""
+
+    page_id: uuid.UUID
+    created_at: datetime
+    attempt: int
+    job_id: uuid.UUID
+    job_file_id: uuid.UUID
+    status: PageStatus
+    finished_at: datetime
+    diff_score: float | None = None
+    incompatible_size: bool = False
+    diff_method: str | None = None
+    cache_hit: bool = False
+    overlay_svg_path: str | None = None
+    overlay_offset: int | None = None
+    overlay_length: int | None = None
+    magnitude_path: str | None = None
+    magnitude_offset: int | None = None
+    magnitude_length: int | None = None
+    error_message: str | None = None
+
+
+# Columns an outcome writes; everything in PageOutcome after the routing fields.
+_OUTCOME_COLUMNS = PageOutcome._fields[5:]
 
 
 class JobRepository:
@@ -12,11 +47,15 @@ class JobRepository:
         self._session = session
 
     async def get_by_id_and_user(self, job_id: str, user_id: str) -> Optional[Job]:
-        result = await self._session.execute(select(Job).where(Job.id == job_id, Job.user_id == user_id))
+        result = await self._session.execute(
+            select(Job).where(Job.id == job_id, Job.user_id == user_id, Job.deleted_at.is_(None))
+        )
         return result.scalar_one_or_none()
 
     async def list_for_user(self, user_id: str) -> list[Job]:
-        result = await self._session.execute(select(Job).where(Job.user_id == user_id))
+        result = await self._session.execute(
+            select(Job).where(Job.user_id == user_id, Job.deleted_at.is_(None))
+        )
         return list(result.scalars().all())
 
     async def count_for_user_on_day(self, user_id: str, day: datetime) -> int:
@@ -26,6 +65,7 @@ class JobRepository:
             select(func.count())
             .select_from(Job)
             .where(Job.user_id == user_id)
+            .where(Job.deleted_at.is_(None))
             .where(Job.created_at >= start)
             .where(Job.created_at < end)
         )
@@ -37,10 +77,42 @@ class JobRepository:
     async def delete_for_job(self, job_id: str, user_id: str) -> None:
         await self._session.execute(delete(Job).where(Job.id == job_id, Job.user_id == user_id))
 
+    async def lock_for_update(self, job_id: str) -> Optional[Job]:
+        result = await self._session.execute(select(Job).where(Job.id == job_id).with_for_update())
+        return result.scalar_one_or_none()
+
     async def get_by_id(self, job_id: str) -> Optional[Job]:
         result = await self._session.execute(select(Job).where(Job.id == job_id))
         return result.scalar_one_or_none()
 
+    async def tombstone_for_job(self, job_id: str) -> int:
+        return await self._tombstone(Job.id == job_id)
+
+    async def tombstone_for_user(self, user_id: str) -> int:
+        return await self._tombstone(Job.user_id == user_id)
+
+    async def _tombstone(self, criterion) -> int:
+        # Running jobs are flipped to cancelled in the same statement so workers stop picking up pages.
+        result = await self._session.execute(
+            update(Job)
+            .where(criterion, Job.deleted_at.is_(None))
+            .values(
+                deleted_at=datetime.utcnow(),
+                status=case((Job.status == JobStatus.running, JobStatus.cancelled), else_=Job.status),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
+    async def list_tombstoned_ids(self, limit: int) -> list[str]:
+        result = await self._session.execute(
+            select(Job.id).where(Job.deleted_at.is_not(None)).order_by(Job.deleted_at).limit(limit)
+        )
+        return [str(job_id) for job_id in result.scalars().all()]
+
+    async def delete_many(self, job_ids: list[str]) -> None:
+        await self._session.execute(delete(Job).where(Job.id.in_(job_ids)))
+
     def add(self, job: Job) -> None:
         self._session.add(job)
 
@@ -52,6 +124,9 @@ class JobFileRepository:
     async def delete_for_job(self, job_id: str) -> None:
         await self._session.execute(delete(JobFile).where(JobFile.job_id == job_id))
 
+    async def delete_for_jobs(self, job_ids: list[str]) -> None:
+        await self._session.execute(delete(JobFile).where(JobFile.job_id.in_(job_ids)))
+
     def add_many(self, files: Iterable[JobFile]) -> None:
         for item in files:
             self._session.add(item)
@@ -60,6 +135,31 @@ class JobFileRepository:
         result = await self._session.execute(select(JobFile).where(JobFile.job_id == job_id))
         return list(result.scalars().all())
 
+    async def state_digest(self, job_id: str) -> str:
+        """md5 over every file's pairing and text-extraction state, in a stable order."""
+        result = await self._session.execute(
+            select(
+                func.md5(
+                    func.coalesce(
+                        func.string_agg(
+                            func.concat_ws(
+                                ":",
+                                JobFile.id,
+                                JobFile.missing_in_set_a,
+                                JobFile.missing_in_set_b,
+                                JobFile.text_status,
+                                JobFile.text_set_a_path,
+                                JobFile.text_set_b_path,
+                            ),
+                            aggregate_order_by(literal_column("','"), JobFile.id),
+                        ),
+                        "",
+                    )
+                )
+            ).where(JobFile.job_id == job_id)
+        )
+        return result.scalar_one()
+
     async def update_has_diffs_for_job(self, job_id: str) -> None:
         result = await self._session.execute(
             select(JobPageResult.job_file_id)
@@ -95,6 +195,26 @@ class JobFileRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_by_relative_paths(self, job_id: str, paths: Iterable[str]) -> dict[str, JobFile]:
+        result = await self._session.execute(
+            select(JobFile).where(JobFile.job_id == job_id, JobFile.relative_path.in_(list(paths)))
+        )
+        return {item.relative_path: item for item in result.scalars().all()}
+
+    async def count_sides_for_job(self, job_id: str) -> tuple[int, int]:
+        """Files present in set A and in set B."""
+        result = await self._session.execute(
+            select(func.count(JobFile.set_a_path), func.count(JobFile.set_b_path)).where(JobFile.job_id == job_id)
+        )
+        count_a, count_b = result.one()
+        return int(count_a or 0), int(count_b or 0)
+
+    async def list_unplanned_for_job(self, job_id: str) -> list[JobFile]:
+        result = await self._session.execute(
+            select(JobFile).where(JobFile.job_id == job_id, JobFile.planned_at.is_(None))
+        )
+        return list(result.scalars().all())
+
 
 class JobPageResultRepository:
     def __init__(self, session: AsyncSession):
@@ -104,6 +224,12 @@ class JobPageResultRepository:
         pages_result = await self._session.execute(select(JobPageResult).where(JobPageResult.job_file_id == file_id))
         return list(pages_result.scalars().all())
 
+    async def get_for_file_page(self, file_id: str, page_index: int) -> Optional[JobPageResult]:
+        result = await self._session.execute(
+            select(JobPageResult).where(JobPageResult.job_file_id == file_id, JobPageResult.page_index == page_index)
+        )
+        return result.scalars().first()
+
     async def list_for_job(self, job_id: str) -> list[JobPageResult]:
         result = await self._session.execute(
             select(JobPageResult)
@@ -112,6 +238,91 @@ class JobPageResultRepository:
         )
         return list(result.scalars().all())
 
+    async def state_digest(self, job_id: str) -> str:
+        """md5 over every page's status and result columns, in a stable order."""
+        result = await self._session.execute(
+            select(
+                func.md5(
+                    func.coalesce(
+                        func.string_agg(
+                            func.concat_ws(
+                                ":",
+                                JobPageResult.id,
+                                JobPageResult.status,
+                                JobPageResult.diff_score,
+                                JobPageResult.overlay_svg_path,
+                                JobPageResult.overlay_offset,
+                                JobPageResult.overlay_length,
+                            ),
+                            aggregate_order_by(literal_column("','"), JobPageResult.id),
+                        ),
+                        "",
+                    )
+                )
+            )
+            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+            .where(JobFile.job_id == job_id)
+        )
+        return result.scalar_one()
+
+    async def list_rescorable_for_job(self, job_id: str) -> list[tuple[JobPageResult, JobFile]]:
+        result = await self._session.execute(
+            select(JobPageResult, JobFile)
+            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+            .where(JobFile.job_id == job_id)
+            .where(JobPageResult.status == PageStatus.done)
+            .where(JobPageResult.magnitude_offset.is_not(None))
+        )
+        return [(page, job_file) for page, job_file in result.all()]
+
+    async def count_unrescorable_for_job(self, job_id: str) -> int:
+        """Compared pages without a stored magnitude map, whose score a rescore cannot change."""
+        result = await self._session.execute(
+            select(func.count())
+            .select_from(JobPageResult)
+            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+            .where(JobFile.job_id == job_id)
+            .where(JobPageResult.status == PageStatus.done)
+            .where(JobPageResult.magnitude_offset.is_(None))
+        )
+        return int(result.scalar_one())
+
+    async def overlay_packs_in_use(self, job_id: str, paths: Iterable[str]) -> set[str]:
+        result = await self._session.execute(
+            select(JobPageResult.overlay_svg_path)
+            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+            .where(JobFile.job_id == job_id)
+            .where(JobPageResult.overlay_svg_path.in_(list(paths)))
+            .distinct()
+        )
+        return set(result.scalars().all())
+
+    async def compare_sample_since(self, since: datetime) -> tuple[int, float | None]:
+        """Pages compared since ``since`` and their mean wall time in seconds."""
+        result = await self._session.execute(
+            select(
+                func.count(),
+                func.avg(func.extract("epoch", JobPageResult.finished_at - JobPageResult.started_at)),
+            )
+            .where(JobPageResult.finished_at >= since)
+            .where(JobPageResult.started_at.is_not(None))
+            .where(JobPageResult.status.in_([PageStatus.done, PageStatus.incompatible_size]))
+        )
+        completed, mean_seconds = result.one()
+        return int(completed or 0), float(mean_seconds) if mean_seconds is not None else None
+
+    async def count_in_flight(self) -> tuple[int, int]:
+        """Dispatched page tasks across all jobs: (running, dispatched but not started)."""
+        result = await self._session.execute(
+            select(
+                func.count().filter(JobPageResult.status == PageStatus.running),
+                func.count().filter(JobPageResult.status == PageStatus.pending),
+            ).where(JobPageResult.task_id.is_not(None))
+            .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.running]))
+        )
+        running, queued = result.one()
+        return int(running or 0), int(queued or 0)
+
     async def count_status_for_job(self, job_id: str) -> list[tuple[str, int]]:
         result = await self._session.execute(
             select(JobPageResult.status, func.count())
@@ -129,6 +340,404 @@ class JobPageResultRepository:
         )
         return [(status.value if hasattr(status, "value") else str(status), count) for status, count in result.all()]
 
-    async def delete_for_job(self, job_id: str) -> None:
-        file_ids = select(JobFile.id).where(JobFile.job_id == job_id)
+    async def has_undispatched_for_file(self, file_id) -> bool:
+        result = await self._session.execute(
+            select(JobPageResult.id)
+            .where(JobPageResult.job_file_id == file_id)
+            .where(JobPageResult.status == PageStatus.pending)
+            .where(JobPageResult.task_id.is_(None))
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def delete_for_jobs(self, job_ids: list[str]) -> None:
+        file_ids = select(JobFile.id).where(JobFile.job_id.in_(job_ids))
         await self._session.execute(delete(JobPageResult).where(JobPageResult.job_file_id.in_(file_ids)))
+
+    async def cancel_open_for_job(self, job_id: str) -> int:
+        file_ids = select(JobFile.id).where(JobFile.job_id == job_id)
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.job_file_id.in_(file_ids))
+            .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.running]))
+            .values(status=PageStatus.failed, error_message="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
+    async def claim(self, page_id, lease_seconds: int) -> int | None:
+        """Move a pending page to running under a fresh lease; returns the attempt number.
+
+        None means another delivery of the task already claimed the page, or it
+        was failed by cancellation or the reaper.
+        """
+        now = datetime.utcnow()
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.id == page_id)
+            .where(JobPageResult.status == PageStatus.pending)
+            .values(
+                status=PageStatus.running,
+                started_at=now,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=JobPageResult.attempts + 1,
+            )
+            .returning(JobPageResult.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_batch(
+        self, task_id: str, queues: list[str], limit: int, lease_seconds: int
+    ) -> list[tuple[uuid.UUID, int]]:
+        """Claim up to ``limit`` dispatched pages from the given queues for this worker.
+
+        SKIP LOCKED lets any number of workers run this concurrently without
+        waiting on each other or claiming the same row. Returns (page id, attempt).
+        """
+        now = datetime.utcnow()
+        picked = (
+            select(JobPageResult.id, JobPageResult.created_at)
+            .where(JobPageResult.status == PageStatus.pending)
+            .where(JobPageResult.task_id == task_id)
+            .where(JobPageResult.dispatch_queue.in_(queues))
+            .order_by(JobPageResult.lease_expires_at, JobPageResult.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("picked")
+        )
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.id == picked.c.id)
+            .where(JobPageResult.created_at == picked.c.created_at)
+            .values(
+                status=PageStatus.running,
+                started_at=now,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=JobPageResult.attempts + 1,
+            )
+            .returning(JobPageResult.id, JobPageResult.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        return [(page_id, attempts) for page_id, attempts in result.all()]
+
+    async def record_outcomes(self, outcomes: list[PageOutcome]) -> set[uuid.UUID]:
+        """Write finished compare attempts in one statement; returns the page ids written.
+
+        A row is only updated while it is still ``running`` under the attempt
+        that produced the outcome. Once the reaper has requeued or failed the
+        page, a late result matches nothing and is dropped, so only the attempt
+        holding the lease decides the page.
+        """
+        if not outcomes:
+            return set()
+        table = JobPageResult.__table__
+        types = {
+            "id": table.c.id.type,
+            "created_at": table.c.created_at.type,
+            "attempt": table.c.attempts.type,
+            **{name: table.c[name].type for name in _OUTCOME_COLUMNS},
+        }
+        # Postgres types bind parameters in a VALUES list as text unless told
+        # otherwise, which breaks NULLs and non-text columns; every cell is cast.
+        rows = values(*(column(name, type_) for name, type_ in types.items()), name="outcome").data(
+            [
+                tuple(
+                    cast(value, type_)
+                    for value, type_ in zip(
+                        (outcome.page_id, outcome.created_at, outcome.attempt)
+                        + tuple(getattr(outcome, name) for name in _OUTCOME_COLUMNS),
+                        types.values(),
+                    )
+                )
+                for outcome in outcomes
+            ]
+        )
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.id == rows.c.id)
+            .where(JobPageResult.created_at == rows.c.created_at)
+            .where(JobPageResult.attempts == rows.c.attempt)
+            .where(JobPageResult.status == PageStatus.running)
+            .values({**{name: rows.c[name] for name in _OUTCOME_COLUMNS}, "lease_expires_at": None})
+            .returning(JobPageResult.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars().all())
+
+    async def renew_lease(self, page_id, attempt: int, lease_seconds: int) -> bool:
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.id == page_id)
+            .where(JobPageResult.status == PageStatus.running)
+            .where(JobPageResult.attempts == attempt)
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    async def reap_expired_leases(self, now: datetime, max_attempts: int) -> tuple[int, int, set[uuid.UUID]]:
+        """Release pages whose worker stopped renewing its lease.
+
+        Running pages go back to pending for another attempt, or fail once they
+        have used ``max_attempts``. Pending pages whose task message was sent but
+        never picked up in time lose their task id so dispatch sends a new one.
+        Returns (requeued, failed, affected job ids).
+        """
+        expired = (JobPageResult.lease_expires_at.is_not(None)) & (JobPageResult.lease_expires_at < now)
+        failed = await self._session.execute(
+            update(JobPageResult)
+            .where(expired)
+            .where(JobPageResult.status == PageStatus.running)
+            .where(JobPageResult.attempts >= max_attempts)
+            .values(
+                status=PageStatus.failed,
+                error_message=f"Worker lost the page {max_attempts} times",
+                finished_at=now,
+                lease_expires_at=None,
+            )
+            .returning(JobPageResult.job_file_id)
+            .execution_options(synchronize_session=False)
+        )
+        failed_files = list(failed.scalars().all())
+        requeued = await self._session.execute(
+            update(JobPageResult)
+            .where(expired)
+            .where(
+                (JobPageResult.status == PageStatus.running)
+                | ((JobPageResult.status == PageStatus.pending) & JobPageResult.task_id.is_not(None))
+            )
+            .values(status=PageStatus.pending, task_id=None, lease_expires_at=None)
+            .returning(JobPageResult.job_file_id)
+            .execution_options(synchronize_session=False)
+        )
+        requeued_files = list(requeued.scalars().all())
+        file_ids = set(failed_files) | set(requeued_files)
+        job_ids: set[uuid.UUID] = set()
+        if file_ids:
+            jobs = await self._session.execute(select(JobFile.job_id).where(JobFile.id.in_(file_ids)).distinct())
+            job_ids = set(jobs.scalars().all())
+        return len(requeued_files), len(failed_files), job_ids
+
+    async def reset_for_continue(self, job_id: str) -> int:
+        """Return failed pages to pending and clear task ids so they can be re-dispatched."""
+        file_ids = select(JobFile.id).where(JobFile.job_id == job_id)
+        result = await self._session.execute(
+            update(JobPageResult)
+            .where(JobPageResult.job_file_id.in_(file_ids))
+            .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.failed]))
+            .values(
+                status=PageStatus.pending,
+                diff_score=None,
+                incompatible_size=False,
+                overlay_svg_path=None,
+                overlay_offset=None,
+                overlay_length=None,
+                magnitude_path=None,
+                magnitude_offset=None,
+                magnitude_length=None,
+                diff_method=None,
+                started_at=None,
+                finished_at=None,
+                lease_expires_at=None,
+                attempts=0,
+                error_message=None,
+                task_id=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
+    async def ensure_partition(self, day: date) -> None:
+        """Create and attach the ``job_page_results`` partition for ``day``.
+
+        Only the retention beat task calls this, never an insert path: rows for
+        ``day`` that already landed in the default partition are moved into the
+        new table before it is attached, so the attach never conflicts with them.
+        """
+        name = f"{PAGE_RESULT_PARTITION_PREFIX}{day:%Y%m%d}"
+        exists = await self._session.scalar(text("SELECT to_regclass(:name)"), {"name": name})
+        if exists is not None:
+            return
+        lower = f"{day.isoformat()} 00:00:00+00"
+        upper = f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00"
+        try:
+            async with self._session.begin_nested():
+                await self._session.execute(
+                    text(f"CREATE TABLE {name} (LIKE job_page_results INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                )
+                await self._session.execute(
+                    text(
+                        f"""
+                        WITH moved AS (
+                            DELETE FROM {PAGE_RESULT_DEFAULT_PARTITION}
+                            WHERE created_at >= '{lower}' AND created_at < '{upper}'
+                            RETURNING *
+                        )
+                        INSERT INTO {name} SELECT * FROM moved
+                        """
+                    )
+                )
+                await self._session.execute(
+                    text(
+                        f"ALTER TABLE job_page_results ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                    )
+                )
+        except DBAPIError:
+            # Created concurrently by an overlapping retention run.
+            return
+
+    async def list_partitions_before(self, cutoff: datetime) -> list[str]:
+        """Return partitions whose upper bound is at or before ``cutoff``."""
+        result = await self._session.execute(
+            text(
+                """
+                SELECT name FROM (
+                    SELECT c.relname AS name,
+                           (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'))[1]::timestamptz AS upper_bound
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = 'job_page_results'::regclass
+                ) AS parts
+                WHERE upper_bound IS NOT NULL AND upper_bound <= :cutoff
+                ORDER BY upper_bound
+                """
+            ),
+            {"cutoff": cutoff},
+        )
+        return [row[0] for row in result.all()]
+
+    async def partition_has_live_rows(self, partition: str, cutoff: datetime) -> bool:
+        """True if the partition still holds pages of running or non-expired jobs."""
+        result = await self._session.execute(
+            text(
+                f"""
+                SELECT 1 FROM {partition} p
+                JOIN job_files f ON f.id = p.job_file_id
+                JOIN jobs j ON j.id = f.job_id
+                WHERE j.status = :running OR j.created_at >= :cutoff
+                LIMIT 1
+                """
+            ),
+            {"running": JobStatus.running.name, "cutoff": cutoff},
+        )
+        return result.first() is not None
+
+    async def drop_partition(self, partition: str) -> None:
+        await self._session.execute(text(f"ALTER TABLE job_page_results DETACH PARTITION {partition}"))
+        await self._session.execute(text(f"DROP TABLE {partition}"))
+
+    async def delete_expired_since(self, since: datetime, cutoff: datetime) -> None:
+        """Row-delete pages of expired jobs that partition drops cannot reach.
+
+        Covers partitions from ``since`` on (pruning skips the older, already
+        handled ones) and anything left in the default partition.
+        """
+        await self._session.execute(
+            text(
+                """
+                DELETE FROM job_page_results p
+                USING job_files f, jobs j
+                WHERE f.id = p.job_file_id
+                  AND j.id = f.job_id
+                  AND j.status <> :running
+                  AND j.created_at < :cutoff
+                  AND p.created_at >= :since
+                """
+            ),
+            {"running": JobStatus.running.name, "cutoff": cutoff, "since": since},
+        )
+        await self.delete_expired_in_partition(PAGE_RESULT_DEFAULT_PARTITION, cutoff)
+
+    async def delete_expired_in_partition(self, partition: str, cutoff: datetime) -> None:
+        await self._session.execute(
+            text(
+                f"""
+                DELETE FROM {partition} p
+                USING job_files f, jobs j
+                WHERE f.id = p.job_file_id
+                  AND j.id = f.job_id
+                  AND j.status <> :running
+                  AND j.created_at < :cutoff
+                """
+            ),
+            {"running": JobStatus.running.name, "cutoff": cutoff},
+        )
+
+
+class CompareCacheKey(NamedTuple):
+    hash_a: str
+    hash_b: str
+    page_index: int
+    render_dpi: int
+    diff_threshold: int
+    open_iterations: int
+    close_iterations: int
+
+
+class CompareCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, key: CompareCacheKey) -> Optional[CompareCacheEntry]:
+        result = await self._session.execute(
+            select(CompareCacheEntry).where(
+                CompareCacheEntry.hash_a == key.hash_a,
+                CompareCacheEntry.hash_b == key.hash_b,
+                CompareCacheEntry.page_index == key.page_index,
+                CompareCacheEntry.render_dpi == key.render_dpi,
+                CompareCacheEntry.diff_threshold == key.diff_threshold,
+                CompareCacheEntry.open_iterations == key.open_iterations,
+                CompareCacheEntry.close_iterations == key.close_iterations,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def mark_hit(self, entry: CompareCacheEntry) -> None:
+        await self._session.execute(
+            update(CompareCacheEntry)
+            .where(CompareCacheEntry.id == entry.id)
+            .values(hit_count=CompareCacheEntry.hit_count + 1, last_used_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def store(
+        self,
+        key: CompareCacheKey,
+        diff_score: float | None,
+        incompatible_size: bool,
+        width: int,
+        height: int,
+        boxes: list[tuple[int, int, int, int]],
+    ) -> None:
+        now = datetime.utcnow()
+        statement = insert(CompareCacheEntry)
+        await self._session.execute(
+            statement
+            .values(
+                id=uuid7(),
+                **key._asdict(),
+                diff_score=diff_score,
+                incompatible_size=incompatible_size,
+                width=width,
+                height=height,
+                boxes=[list(box) for box in boxes],
+                hit_count=0,
+                created_at=now,
+                last_used_at=now,
+            )
+            # Quick scans store scores without regions; let a later full compare fill them in.
+            .on_conflict_do_update(
+                constraint="uq_compare_cache_key",
+                set_={"boxes": statement.excluded.boxes},
+                where=func.jsonb_array_length(CompareCacheEntry.boxes) == 0,
+            )
+        )
+
+    async def delete_unused_since(self, cutoff: datetime) -> None:
+        await self._session.execute(delete(CompareCacheEntry).where(CompareCacheEntry.last_used_at < cutoff))
+
+    async def count(self) -> int:
+        result = await self._session.execute(select(func.count()).select_from(CompareCacheEntry))
+        return int(result.scalar_one() or 0)
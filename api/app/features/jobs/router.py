@@ -1,5 +1,5 @@
-import io
-import zipfile
+import shutil
+import uuid
 from pathlib import Path
 from datetime import datetime
 
@@ -8,8 +8,9 @@ from typing import Iterable
 import asyncio
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile, WebSocket, WebSocketDisconnect, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from jose import JWTError
+from starlette.background import BackgroundTask
 
 from app.core.config import settings
 from app.features.auth.deps import get_current_user, get_user_repository
@@ -29,15 +30,24 @@ from app.features.jobs.schemas import (
     JobSummaryMessage,
 )
 from app.features.jobs.service import JobService
+from app.features.jobs.packfile import read_record
+from app.features.jobs.profiles import resolve_profile
+from app.features.jobs.storage import iter_zip
 from app.features.jobs.repository import JobRepository, JobPageResultRepository, JobFileRepository
 from app.features.jobs.models import PageStatus
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-def _status_from_counts(counts: dict[str, int], missing_a: bool, missing_b: bool) -> str:
+def _status_from_counts(counts: dict[str, int], missing_a: bool, missing_b: bool, paired: bool = True) -> str:
     if missing_a or missing_b:
         return "missing"
+    if not paired:
+        # One side of a streaming job's pair has landed; it becomes missing at close-uploads.
+        return "unmatched"
+    if not counts:
+        # Streaming jobs list files before their pages are planned.
+        return "pending"
     running = counts.get(PageStatus.running.value, 0)
     pending = counts.get(PageStatus.pending.value, 0)
     failed = counts.get(PageStatus.failed.value, 0)
@@ -179,7 +189,12 @@ async def job_files_ws(
                             "missing_in_set_b": file.missing_in_set_b,
                             "has_diffs": diff_flags.get(str(file.id), file.has_diffs),
                             "text_status": file.text_status.value if file.text_status else None,
-                            "status": _status_from_counts(counts, file.missing_in_set_a, file.missing_in_set_b),
+                            "status": _status_from_counts(
+                                counts,
+                                file.missing_in_set_a,
+                                file.missing_in_set_b,
+                                bool(file.set_a_path and file.set_b_path),
+                            ),
                             "created_at": file.created_at.isoformat(),
                         }
                     )
@@ -281,7 +296,9 @@ async def upload_job_files(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail="Upload size limit exceeded",
             )
-        await service.upload_zip(job, "setA" if set_name == "A" else "setB", zip_bytes)
+        target = "setA" if set_name == "A" else "setB"
+        written = await service.upload_zip(job, target, zip_bytes)
+        await service.land_uploads(job, {target: written}, user.max_files_per_set, user.max_pages_per_job)
         return {"status": "ok", "mode": "zip"}
 
     if files:
@@ -298,7 +315,9 @@ async def upload_job_files(
                     detail="Upload size limit exceeded",
                 )
             payload.append((rel, data))
-        await service.upload_multipart(job, "setA" if set_name == "A" else "setB", payload)
+        target = "setA" if set_name == "A" else "setB"
+        written = await service.upload_multipart(job, target, payload)
+        await service.land_uploads(job, {target: written}, user.max_files_per_set, user.max_pages_per_job)
         return {"status": "ok", "mode": "multipart"}
 
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files provided")
@@ -326,7 +345,8 @@ async def upload_job_zip_sets(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail="Upload size limit exceeded",
         )
-    await service.upload_zip_sets(job, zip_bytes)
+    written = await service.upload_zip_sets(job, zip_bytes)
+    await service.land_uploads(job, written, user.max_files_per_set, user.max_pages_per_job)
     return {"status": "ok", "mode": "zip_sets"}
 
 @router.post("/{job_id}/use-sample")
@@ -350,6 +370,14 @@ async def start_job(
     job_id: str,
     set_a_label: str | None = Query(default=None, alias="setA"),
     set_b_label: str | None = Query(default=None, alias="setB"),
+    incremental_report: bool = Query(default=False, alias="incrementalReport"),
+    profile: str = Query(default="standard", pattern="^(standard|quick|forensic)$"),
+    render_dpi: int | None = Query(default=None, ge=36, le=600, alias="dpi"),
+    diff_threshold: int | None = Query(default=None, ge=0, le=255, alias="threshold"),
+    diff_mode: str | None = Query(default=None, pattern="^(raster|vector)$", alias="mode"),
+    page_order: str = Query(default="preview", pattern="^(preview|sequential)$", alias="order"),
+    lazy_compare: bool = Query(default=False, alias="lazy"),
+    stream: bool = Query(default=False),
     service: JobService = Depends(get_job_service),
     repo=Depends(get_job_repository),
     user: User = Depends(get_current_user),
@@ -361,13 +389,31 @@ async def start_job(
         job.set_a_label = set_a_label
     if set_b_label:
         job.set_b_label = set_b_label
+    job.incremental_report = incremental_report
+    job.page_order = page_order
+    job.lazy_compare = lazy_compare
+    service.apply_profile(job, resolve_profile(profile, render_dpi, diff_threshold, diff_mode))
     return await service.start_job(
         job,
         max_files_per_set=user.max_files_per_set,
         max_pages_per_job=user.max_pages_per_job,
+        stream=stream,
     )
 
 
+@router.post("/{job_id}/close-uploads", response_model=JobStatusMessage)
+async def close_job_uploads(
+    job_id: str,
+    service: JobService = Depends(get_job_service),
+    repo=Depends(get_job_repository),
+    user: User = Depends(get_current_user),
+) -> JobStatusMessage:
+    job = await repo.get_by_id_and_user(job_id, str(user.id))
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return await service.close_uploads(job, user.max_files_per_set, user.max_pages_per_job)
+
+
 @router.post("/{job_id}/continue", response_model=JobStartedMessage)
 async def continue_job(
     job_id: str,
@@ -381,6 +427,27 @@ async def continue_job(
     return await service.continue_job(job)
 
 
+@router.post("/{job_id}/rescore", response_model=JobStartedMessage)
+async def rescore_job(
+    job_id: str,
+    threshold: int | None = Query(default=None, ge=0, le=255),
+    open_iterations: int | None = Query(default=None, ge=0, le=10, alias="openIterations"),
+    close_iterations: int | None = Query(default=None, ge=0, le=10, alias="closeIterations"),
+    service: JobService = Depends(get_job_service),
+    repo=Depends(get_job_repository),
+    user: User = Depends(get_current_user),
+) -> JobStartedMessage:
+    job = await repo.get_by_id_and_user(job_id, str(user.id))
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return await service.rescore_job(
+        job,
+        job.diff_threshold if threshold is None else threshold,
+        job.open_iterations if open_iterations is None else open_iterations,
+        job.close_iterations if close_iterations is None else close_iterations,
+    )
+
+
 @router.get("/{job_id}", response_model=JobStatusMessage)
 async def get_job_status(
     job_id: str,
@@ -437,7 +504,9 @@ async def list_job_files(
     for item in items:
         item.has_diffs = diff_flags.get(item.id, item.has_diffs)
         counts = dict(await page_repo.count_status_for_file(item.id))
-        item.status = _status_from_counts(counts, item.missing_in_set_a, item.missing_in_set_b)
+        item.status = _status_from_counts(
+            counts, item.missing_in_set_a, item.missing_in_set_b, bool(item.set_a_path and item.set_b_path)
+        )
     return items
 
 
@@ -459,6 +528,25 @@ async def list_file_pages(
     return await service.list_pages(file_id)
 
 
+@router.post("/{job_id}/files/{file_id}/view")
+async def mark_file_viewed(
+    job_id: str,
+    file_id: str,
+    service: JobService = Depends(get_job_service),
+    repo=Depends(get_job_repository),
+    file_repo=Depends(get_job_file_repository),
+    user: User = Depends(get_current_user),
+) -> dict:
+    job = await repo.get_by_id_and_user(job_id, str(user.id))
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    job_file = await file_repo.get_by_id_and_job(file_id, job.id)
+    if not job_file:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    await service.mark_file_viewed(job, job_file)
+    return {"status": "ok"}
+
+
 @router.get("/{job_id}/files/{file_id}/pages/{page_index}/overlay")
 async def get_page_overlay(
     job_id: str,
@@ -466,13 +554,24 @@ async def get_page_overlay(
     page_index: int,
     repo=Depends(get_job_repository),
     file_repo=Depends(get_job_file_repository),
+    page_repo=Depends(get_job_page_result_repository),
     user: User = Depends(get_current_user),
-) -> FileResponse:
+) -> Response:
     job = await repo.get_by_id_and_user(job_id, str(user.id))
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     if not await file_repo.get_by_id_and_job(file_id, job.id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    page = await page_repo.get_for_file_page(file_id, page_index)
+    if page and page.overlay_svg_path and page.overlay_offset is not None:
+        try:
+            data = await asyncio.to_thread(
+                read_record, Path(page.overlay_svg_path), page.overlay_offset, page.overlay_length
+            )
+        except (OSError, ValueError):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Overlay not found")
+        return Response(content=data, media_type="image/svg+xml")
+    # Overlays written before pack files existed are loose files.
     overlay_path = Path(settings.data_dir) / "jobs" / job_id / "artifacts" / file_id / f"page_{page_index}.svg"
     if not overlay_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Overlay not found")
@@ -538,39 +637,37 @@ async def get_job_report(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
     report_type = report_type.lower()
+    output_dir = Path(settings.data_dir) / "jobs" / job_id / "temp_report" / uuid.uuid4().hex
+    cleanup = BackgroundTask(shutil.rmtree, output_dir, ignore_errors=True)
+    try:
+        outputs = await service.render_report_outputs(job, output_dir, report_type)
+    except Exception:
+        await asyncio.to_thread(shutil.rmtree, output_dir, True)
+        raise
+    headers = {"X-Report-Type": report_type}
+
     if report_type == "visual":
-        report_bytes = await service.generate_report(job)
-        return Response(
-            content=report_bytes,
+        return FileResponse(
+            path=str(outputs["visual"]),
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=diff-report-{job_id}.pdf",
-                "X-Report-Type": report_type,
-            },
+            filename=f"diff-report-{job_id}.pdf",
+            headers=headers,
+            background=cleanup,
         )
 
     if report_type == "text":
-        report_bytes = await service.generate_text_report(job)
-        return Response(
-            content=report_bytes,
+        return FileResponse(
+            path=str(outputs["text"]),
             media_type="text/plain; charset=utf-8",
-            headers={
-                "Content-Disposition": f"attachment; filename=text-diff-{job_id}.patch",
-                "X-Report-Type": report_type,
-            },
+            filename=f"text-diff-{job_id}.patch",
+            headers=headers,
+            background=cleanup,
         )
 
-    visual_bytes = await service.generate_report(job)
-    text_bytes = await service.generate_text_report(job)
-    archive = io.BytesIO()
-    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr(f"diff-report-{job_id}.pdf", visual_bytes)
-        zf.writestr(f"text-diff-{job_id}.patch", text_bytes)
-    return Response(
-        content=archive.getvalue(),
+    members = [(path.name, path) for path in (outputs["visual"], outputs["text"])]
+    return StreamingResponse(
+        iter_zip(members),
         media_type="application/zip",
-        headers={
-            "Content-Disposition": f"attachment; filename=pdfdiff-reports-{job_id}.zip",
-            "X-Report-Type": report_type,
-        },
+        headers={**headers, "Content-Disposition": f"attachment; filename=pdfdiff-reports-{job_id}.zip"},
+        background=cleanup,
     )
@@ -0,0 +1,184 @@
+"""Fair-share page dispatch across users and jobs.
+
+Page tasks share one ``pages`` queue, so whatever sits in the queue is served
+first-come first-served. Rather than letting each job fill the queue on its
+own, a single dispatcher keeps at most ``capacity`` page tasks in flight in
+total and splits them:
+
+* across users by weight (per role), with weighted max-min fairness: a user
+  who needs less than their share gives the rest to the others;
+* within a user, evenly across that user's running jobs.
+
+Lazy jobs only claim a share for pages somebody asked to see; the rest of
+their pages (``idle_pending``) run on whatever capacity is left over.
+
+The total itself is adaptive (``adaptive_window``): sized from measured page
+throughput and latency so queued work waits about a target time, which makes
+it follow the number of worker replicas without configuration.
+
+The functions here are pure so the worker and the simulation in
+``scripts/simulate-fair-share.py`` run the same policy.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Hashable, Mapping, Sequence
+
+
+# compare_page queue per size class, so big-memory workers can take the large pages.
+PAGE_QUEUES = {"standard": "pages", "large": "pages_large", "huge": "pages_huge"}
+
+
+@dataclass(frozen=True)
+class ActiveJob:
+    job_id: Hashable
+    user_id: Hashable
+    role: str
+    in_flight: int
+    pending: int
+    idle_pending: int = 0
+
+
+@dataclass(frozen=True)
+class DispatchWindow:
+    capacity: int
+    throughput: float
+    mean_latency: float | None
+    workers: int
+    running: int
+    queued: int
+    target_wait: float
+
+
+def adaptive_window(
+    completed: int,
+    sample_seconds: float,
+    mean_latency: float | None,
+    running: int,
+    queued: int,
+    target_wait: float,
+    min_capacity: int,
+    max_capacity: int,
+) -> DispatchWindow:
+    """Total in-flight cap from Little's law.
+
+    Busy compare slots are estimated as throughput x latency (at least the pages
+    running right now), and the cap is those slots plus throughput x
+    ``target_wait`` pages waiting in the queue. While the cap is below what the
+    workers could take, every slot is busy and the next estimate grows by a
+    factor of ``1 + target_wait / latency``, so added replicas are found quickly.
+    """
+    throughput = completed / sample_seconds if sample_seconds > 0 else 0.0
+    workers = running
+    if mean_latency:
+        workers = max(running, round(throughput * mean_latency))
+    capacity = workers + math.ceil(throughput * target_wait)
+    return DispatchWindow(
+        capacity=min(max_capacity, max(min_capacity, capacity)),
+        throughput=throughput,
+        mean_latency=mean_latency,
+        workers=workers,
+        running=running,
+        queued=queued,
+        target_wait=target_wait,
+    )
+
+
+def size_class_for(
+    width_pt: float | None, height_pt: float | None, dpi: int, large_megapixels: float, huge_megapixels: float
+) -> str:
+    """Size class of a page from its rendered pixel count; unknown sizes are standard."""
+    if not width_pt or not height_pt:
+        return "standard"
+    megapixels = width_pt * height_pt * (dpi / 72.0) ** 2 / 1_000_000
+    if megapixels >= huge_megapixels:
+        return "huge"
+    if megapixels >= large_megapixels:
+        return "large"
+    return "standard"
+
+
+def fair_share_targets(
+    capacity: int, jobs: Sequence[ActiveJob], role_weights: Mapping[str, float]
+) -> dict[Hashable, int]:
+    """In-flight slots each job is entitled to. ``jobs`` order breaks ties (oldest first)."""
+    user_demand: dict[Hashable, int] = {}
+    user_weight: dict[Hashable, float] = {}
+    user_jobs: dict[Hashable, list[ActiveJob]] = {}
+    for job in jobs:
+        user_demand[job.user_id] = user_demand.get(job.user_id, 0) + job.in_flight + job.pending
+        user_weight[job.user_id] = max(role_weights.get(job.role, 1.0), 0.0)
+        user_jobs.setdefault(job.user_id, []).append(job)
+
+    user_share = water_fill(capacity, user_demand, user_weight)
+    targets: dict[Hashable, int] = {}
+    for user_id, owned in user_jobs.items():
+        demand = {job.job_id: job.in_flight + job.pending for job in owned}
+        targets.update(water_fill(user_share[user_id], demand, {job.job_id: 1.0 for job in owned}))
+    return targets
+
+
+def fair_share_grants(
+    capacity: int, jobs: Sequence[ActiveJob], role_weights: Mapping[str, float]
+) -> dict[Hashable, int]:
+    """How many new page tasks to send per job right now.
+
+    Nothing already in flight is taken back; jobs over their target simply get
+    no new tasks until they drain. Free slots go to jobs furthest below target.
+    """
+    free = capacity - sum(job.in_flight for job in jobs)
+    if free <= 0:
+        return {}
+    targets = fair_share_targets(capacity, jobs, role_weights)
+    jobs_per_user: dict[Hashable, int] = {}
+    for job in jobs:
+        jobs_per_user[job.user_id] = jobs_per_user.get(job.user_id, 0) + 1
+
+    deficit = {}
+    weight = {}
+    for job in jobs:
+        missing = min(targets.get(job.job_id, 0) - job.in_flight, job.pending)
+        if missing > 0:
+            deficit[job.job_id] = missing
+            weight[job.job_id] = role_weights.get(job.role, 1.0) / jobs_per_user[job.user_id]
+    grants = water_fill(free, deficit, weight)
+    leftover = free - sum(grants.values())
+    if leftover > 0:
+        idle = {job.job_id: job.idle_pending for job in jobs if job.idle_pending > 0}
+        idle_weight = {job.job_id: role_weights.get(job.role, 1.0) / jobs_per_user[job.user_id] for job in jobs}
+        for job_id, slots in water_fill(leftover, idle, idle_weight).items():
+            grants[job_id] = grants.get(job_id, 0) + slots
+    return {job_id: slots for job_id, slots in grants.items() if slots > 0}
+
+
+def water_fill(
+    capacity: int, demand: Mapping[Hashable, int], weight: Mapping[Hashable, float]
+) -> dict[Hashable, int]:
+    """Integer weighted max-min allocation of ``capacity`` slots.
+
+    Each round splits what is left in proportion to weight among keys that still
+    want more, capped at their demand. When proportional shares round down to
+    zero, single slots go out in key order so the result is deterministic.
+    """
+    allocation = {key: 0 for key in demand}
+    remaining = max(0, capacity)
+    while remaining > 0:
+        hungry = [key for key in demand if allocation[key] < demand[key] and weight.get(key, 0.0) > 0]
+        if not hungry:
+            break
+        total_weight = sum(weight[key] for key in hungry)
+        granted = 0
+        for key in hungry:
+            share = int(remaining * weight[key] / total_weight)
+            take = min(share, demand[key] - allocation[key])
+            allocation[key] += take
+            granted += take
+        if granted == 0:
+            for key in sorted(hungry, key=lambda k: -weight[k]):
+                if granted == remaining:
+                    break
+                allocation[key] += 1
+                granted += 1
+        remaining -= granted
+    return allocation
@@ -25,6 +25,13 @@ class JobStatusMessage(BaseModel):
     set_b_label: str | None = None
     has_diffs: bool = False
     files_available: bool = True
+    profile: str = "standard"
+    render_dpi: int | None = None
+    diff_threshold: int | None = None
+    diff_mode: str = "raster"
+    page_order: str = "preview"
+    lazy_compare: bool = False
+    upload_open: bool = False
     created_at: datetime
 
 
@@ -55,11 +62,14 @@ class JobFileMessage(BaseModel):
 class JobPageMessage(BaseModel):
     id: str
     page_index: int
+    page_index_a: int | None = None
+    page_index_b: int | None = None
     status: str
     diff_score: float | None
     incompatible_size: bool
     missing_in_set_a: bool
     missing_in_set_b: bool
     overlay_svg_path: str | None
+    diff_method: str | None = None
     error_message: str | None
     created_at: datetime
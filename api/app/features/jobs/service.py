@@ -1,24 +1,33 @@
-import gc
 import io
 import re
 import shutil
 import zipfile
 import json
-import difflib
 from pathlib import Path, PurePosixPath
 from typing import Iterable
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import fitz
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.config import settings
 from app.core.celery_app import celery_app
 from app.features.jobs.models import Job, JobFile, JobPageResult, JobStatus, PageStatus
+from app.core.report_pool import run_in_report_pool
+from app.features.jobs.report_builder import (
+    ReportFileEntry,
+    ReportHeader,
+    ReportPage,
+    TextReportFile,
+    build_text_report,
+    build_visual_report,
+    fragment_path_for,
+)
+from app.features.jobs.profiles import JobProfile
 from app.features.jobs.repository import JobFileRepository, JobPageResultRepository, JobRepository
+from app.features.jobs.scheduler import DispatchWindow, adaptive_window
 from app.features.jobs.schemas import (
     JobCreatedMessage,
     JobFileMessage,
@@ -58,9 +67,11 @@ class JobService:
             created_at=job.created_at,
         )
 
-    async def upload_zip(self, job: Job, set_name: str, zip_bytes: bytes) -> None:
+    async def upload_zip(self, job: Job, set_name: str, zip_bytes: bytes) -> list[str]:
+        self._check_upload_session(job)
         target_dir = self._job_dir(str(job.id), set_name)
         target_dir.mkdir(parents=True, exist_ok=True)
+        written = []
         with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
             for info in zf.infolist():
                 if info.is_dir():
@@ -68,8 +79,11 @@ class JobService:
                 rel = ensure_relative_path(info.filename)
                 data = zf.read(info)
                 write_bytes(target_dir, rel, data)
+                written.append(rel.as_posix())
+        return written
 
-    async def upload_zip_sets(self, job: Job, zip_bytes: bytes) -> None:
+    async def upload_zip_sets(self, job: Job, zip_bytes: bytes) -> dict[str, list[str]]:
+        self._check_upload_session(job)
         target_a = self._job_dir(str(job.id), "setA")
         target_b = self._job_dir(str(job.id), "setB")
         target_a.mkdir(parents=True, exist_ok=True)
@@ -92,8 +106,7 @@ class JobService:
             folder_a, folder_b = top_folders[0], top_folders[1]
             job.set_a_label = folder_a
             job.set_b_label = folder_b
-            count_a = 0
-            count_b = 0
+            written: dict[str, list[str]] = {"setA": [], "setB": []}
 
             for info in zf.infolist():
                 if info.is_dir():
@@ -110,31 +123,55 @@ class JobService:
 
                 if top == folder_a:
                     write_bytes(target_a, rel, data)
-                    count_a += 1
+                    written["setA"].append(rel.as_posix())
                 elif top == folder_b:
                     write_bytes(target_b, rel, data)
-                    count_b += 1
+                    written["setB"].append(rel.as_posix())
 
-            if count_a == 0 or count_b == 0:
+            if not written["setA"] or not written["setB"]:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Zip must include files in two top-level folders",
                 )
         await self._session.commit()
+        return written
 
-    async def upload_multipart(self, job: Job, set_name: str, files: Iterable[tuple[str, bytes]]) -> None:
+    async def upload_multipart(self, job: Job, set_name: str, files: Iterable[tuple[str, bytes]]) -> list[str]:
+        self._check_upload_session(job)
         target_dir = self._job_dir(str(job.id), set_name)
         target_dir.mkdir(parents=True, exist_ok=True)
+        written = []
         for rel, data in files:
             rel_path = ensure_relative_path(rel)
             write_bytes(target_dir, rel_path, data)
+            written.append(rel_path.as_posix())
+        return written
+
+    @staticmethod
+    def _check_upload_session(job: Job) -> None:
+        if job.uploads_closed_at is not None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload session is closed")
+
+    @staticmethod
+    def apply_profile(job: Job, profile: JobProfile) -> None:
+        job.profile = profile.name
+        job.render_dpi = profile.render_dpi
+        job.diff_threshold = profile.diff_threshold
+        job.open_iterations = settings.diff_open_iterations
+        job.close_iterations = settings.diff_close_iterations
+        job.generate_overlays = profile.generate_overlays
+        job.extract_text = profile.extract_text
+        job.diff_mode = profile.diff_mode
 
     async def start_job(
         self,
         job: Job,
         max_files_per_set: int | None = None,
         max_pages_per_job: int | None = None,
+        stream: bool = False,
     ) -> JobStartedMessage:
+        if stream:
+            return await self._start_streaming(job, max_files_per_set, max_pages_per_job)
         set_a_dir = self._job_dir(str(job.id), "setA")
         set_b_dir = self._job_dir(str(job.id), "setB")
         set_a = list_relative_files(set_a_dir)
@@ -174,38 +211,194 @@ class JobService:
         self._file_repo.add_many(files)
 
         job.status = JobStatus.running
+        job.upload_open = False
+        job.uploads_closed_at = None
         await self._session.commit()
         celery_app.send_task("run_job", args=[str(job.id)])
         return JobStartedMessage(id=str(job.id), status=job.status.value)
 
+    async def _start_streaming(
+        self, job: Job, max_files_per_set: int | None, max_pages_per_job: int | None
+    ) -> JobStartedMessage:
+        """Start a job before its uploads are complete.
+
+        The job runs with an open upload session: every file pair is planned and
+        compared as soon as both sides have landed (see ``land_uploads``), and
+        the job cannot complete until ``close_uploads`` finalizes the rest.
+        """
+        await self._file_repo.delete_for_job(job.id)
+        job.has_diffs = False
+        job.status = JobStatus.running
+        job.upload_open = True
+        job.uploads_closed_at = None
+        job.streamed_pages = 0
+        await self._session.commit()
+        # Pick up whatever was uploaded before the start. A rejected start keeps
+        # the files, as a rejected regular start does.
+        try:
+            await self.land_uploads(
+                job, self._uploaded_files(str(job.id)), max_files_per_set, max_pages_per_job, discard_rejected=False
+            )
+        except HTTPException:
+            await self._session.refresh(job)
+            job.status = JobStatus.created
+            job.upload_open = False
+            await self._session.commit()
+            raise
+        return JobStartedMessage(id=str(job.id), status=job.status.value)
+
+    async def land_uploads(
+        self,
+        job: Job,
+        landed: dict[str, Iterable[str]],
+        max_files_per_set: int | None = None,
+        max_pages_per_job: int | None = None,
+        discard_rejected: bool = True,
+    ) -> None:
+        """Register files written into a streaming job and plan the pairs they complete.
+
+        ``landed`` maps ``setA``/``setB`` to relative paths. The job row lock
+        serializes concurrent set A and set B uploads, so each pair is handed to
+        ``plan_file`` exactly once. No-op unless the job's upload session is open;
+        files that land before it opens are picked up from disk by ``_start_streaming``
+        or ``close_uploads``, and files that raced the close are rejected.
+
+        Files that would exceed a limit are deleted again before the 400 unless
+        ``discard_rejected`` is off, so ``close_uploads`` does not find them on
+        disk and hit the same limit.
+        """
+        if not job.upload_open:
+            self._check_upload_session(job)
+            return
+        await self._session.refresh(job, with_for_update=True)
+        sides = {set_name: set(paths) for set_name, paths in landed.items()}
+        paths = set().union(*sides.values())
+        if job.uploads_closed_at is not None and paths:
+            await self._session.commit()
+            self._check_upload_session(job)
+        if not job.upload_open or job.status != JobStatus.running or not paths:
+            await self._session.commit()
+            return
+        job_id = str(job.id)
+        existing = await self._file_repo.get_by_relative_paths(job.id, paths)
+        paired: list[JobFile] = []
+        added: list[tuple[str, str]] = []
+        for rel in sorted(paths):
+            job_file = existing.get(rel)
+            if job_file is None:
+                job_file = JobFile(job_id=job.id, relative_path=rel, has_diffs=False)
+                self._file_repo.add_many([job_file])
+            was_paired = bool(job_file.set_a_path and job_file.set_b_path)
+            if rel in sides.get("setA", ()):
+                if job_file.set_a_path is None:
+                    added.append(("setA", rel))
+                job_file.set_a_path = rel
+            if rel in sides.get("setB", ()):
+                if job_file.set_b_path is None:
+                    added.append(("setB", rel))
+                job_file.set_b_path = rel
+            if not was_paired and job_file.set_a_path and job_file.set_b_path:
+                paired.append(job_file)
+        await self._session.flush()
+
+        rejected = None
+        if max_files_per_set is not None:
+            count_a, count_b = await self._file_repo.count_sides_for_job(job.id)
+            if count_a > max_files_per_set or count_b > max_files_per_set:
+                rejected = "Max files per set exceeded"
+        if rejected is None and max_pages_per_job is not None and paired:
+            job.streamed_pages += self._count_pages_for_pairs(
+                job_id,
+                [
+                    {"relative_path": item.relative_path, "set_a_path": item.set_a_path, "set_b_path": item.set_b_path}
+                    for item in paired
+                ],
+            )
+            if job.streamed_pages > max_pages_per_job:
+                rejected = "Max pages per job exceeded"
+        if rejected is not None:
+            await self._session.rollback()
+            if discard_rejected:
+                for set_name, rel in added:
+                    (self._job_dir(job_id, set_name) / rel).unlink(missing_ok=True)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=rejected)
+        await self._session.commit()
+        for job_file in paired:
+            celery_app.send_task("plan_file", args=[str(job_file.id)])
+
+    async def close_uploads(
+        self, job: Job, max_files_per_set: int | None = None, max_pages_per_job: int | None = None
+    ) -> JobStatusMessage:
+        """End a streaming job's upload session; unmatched files are finalized as missing."""
+        if job.upload_open:
+            # Files whose upload raced the start are still on disk; land them first.
+            # Any over the limits are discarded and the session closes regardless.
+            try:
+                await self.land_uploads(job, self._uploaded_files(str(job.id)), max_files_per_set, max_pages_per_job)
+            except HTTPException as exc:
+                if exc.status_code != status.HTTP_400_BAD_REQUEST:
+                    raise
+            await self._session.refresh(job, with_for_update=True)
+            if job.upload_open:
+                job.upload_open = False
+                job.uploads_closed_at = datetime.utcnow()
+                await self._session.commit()
+                celery_app.send_task("finish_uploads", args=[str(job.id)])
+            else:
+                await self._session.commit()
+        return await self.get_status(job)
+
     async def continue_job(self, job: Job) -> JobStartedMessage:
         if job.status == JobStatus.cancelled:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job is cancelled")
 
-        result = await self._session.execute(
-            select(JobPageResult)
-            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
-            .where(JobFile.job_id == job.id)
-            .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.failed]))
-        )
-        pages = list(result.scalars().all())
-        if not pages:
+        reset = await self._page_repo.reset_for_continue(str(job.id))
+        if not reset:
+            await self._session.rollback()
             return JobStartedMessage(id=str(job.id), status=job.status.value)
 
-        for page in pages:
-            if page.status == PageStatus.failed:
-                page.status = PageStatus.pending
-                page.diff_score = None
-                page.incompatible_size = False
-                page.overlay_svg_path = None
-                page.error_message = None
-            page.task_id = None
-
+        job.status = JobStatus.running
         await self._session.commit()
+        celery_app.send_task("enqueue_pages", args=[str(job.id)])
+        return JobStartedMessage(id=str(job.id), status=job.status.value)
 
-        job.status = JobStatus.running
+    async def mark_file_viewed(self, job: Job, job_file: JobFile) -> None:
+        """Move a file's pending pages to the front of the job's dispatch order.
+
+        Each call that changes the order costs a global dispatch, so repeat calls
+        within FILE_VIEW_REFRESH_SECONDS, and calls for files with nothing left
+        to send, do nothing.
+        """
+        if job.status != JobStatus.running:
+            return
+        now = datetime.utcnow()
+        if job_file.viewed_at is not None and now - job_file.viewed_at.replace(tzinfo=None) < timedelta(
+            seconds=settings.file_view_refresh_seconds
+        ):
+            return
+        if not await self._page_repo.has_undispatched_for_file(job_file.id):
+            return
+        job_file.viewed_at = now
         await self._session.commit()
+        # Lazy jobs may have nothing in flight that would trigger the next dispatch.
         celery_app.send_task("enqueue_pages", args=[str(job.id)])
+
+    async def rescore_job(
+        self, job: Job, threshold: int, open_iterations: int, close_iterations: int
+    ) -> JobStartedMessage:
+        if job.status == JobStatus.running:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job is still running")
+        # The job's settings must describe every score, so a partial rescore is refused.
+        unrescorable = await self._page_repo.count_unrescorable_for_job(str(job.id))
+        if unrescorable:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"{unrescorable} pages have no stored diff magnitudes (cache hits, vector diffs "
+                    "or KEEP_DIFF_MAGNITUDES off); compare the job again to change its settings"
+                ),
+            )
+        celery_app.send_task("rescore_job", args=[str(job.id), threshold, open_iterations, close_iterations])
         return JobStartedMessage(id=str(job.id), status=job.status.value)
 
     async def list_files(self, job: Job) -> list[JobFileMessage]:
@@ -220,7 +413,11 @@ class JobService:
                 missing_in_set_b=item.missing_in_set_b,
                 has_diffs=item.has_diffs,
                 text_status=item.text_status.value if item.text_status else None,
-                status="missing" if (item.missing_in_set_a or item.missing_in_set_b) else "ready",
+                status=(
+                    "missing"
+                    if (item.missing_in_set_a or item.missing_in_set_b)
+                    else "ready" if (item.set_a_path and item.set_b_path) else "unmatched"
+                ),
                 created_at=item.created_at,
             )
             for item in items
@@ -232,12 +429,15 @@ class JobService:
             JobPageMessage(
                 id=str(page.id),
                 page_index=page.page_index,
+                page_index_a=page.page_index_a,
+                page_index_b=page.page_index_b,
                 status=page.status.value,
                 diff_score=page.diff_score,
                 incompatible_size=page.incompatible_size,
                 missing_in_set_a=page.missing_in_set_a,
                 missing_in_set_b=page.missing_in_set_b,
                 overlay_svg_path=page.overlay_svg_path,
+                diff_method=page.diff_method,
                 error_message=page.error_message,
                 created_at=page.created_at,
             )
@@ -253,6 +453,13 @@ class JobService:
             set_b_label=job.set_b_label,
             has_diffs=job.has_diffs,
             files_available=self._files_available(str(job.id)),
+            profile=job.profile,
+            render_dpi=job.render_dpi,
+            diff_threshold=job.diff_threshold,
+            diff_mode=job.diff_mode,
+            page_order=job.page_order,
+            lazy_compare=job.lazy_compare,
+            upload_open=job.upload_open,
             created_at=job.created_at,
         )
 
@@ -273,23 +480,15 @@ class JobService:
         ]
 
     async def clear_jobs(self, user_id: str) -> dict:
-        jobs = await self._job_repo.list_for_user(user_id)
-        for job in jobs:
-            await self._page_repo.delete_for_job(job.id)
-            await self._file_repo.delete_for_job(job.id)
-            job_dir = Path(settings.data_dir) / "jobs" / str(job.id)
-            shutil.rmtree(job_dir, ignore_errors=True)
-        await self._job_repo.delete_for_user(user_id)
+        deleted = await self._job_repo.tombstone_for_user(user_id)
         await self._session.commit()
-        return {"status": "ok", "deleted": len(jobs)}
+        celery_app.send_task("reclaim_storage")
+        return {"status": "ok", "deleted": deleted}
 
     async def delete_job(self, job: Job) -> dict:
-        await self._page_repo.delete_for_job(job.id)
-        await self._file_repo.delete_for_job(job.id)
-        job_dir = Path(settings.data_dir) / "jobs" / str(job.id)
-        shutil.rmtree(job_dir, ignore_errors=True)
-        await self._job_repo.delete_for_job(str(job.id), str(job.user_id))
+        await self._job_repo.tombstone_for_job(str(job.id))
         await self._session.commit()
+        celery_app.send_task("reclaim_storage")
         return {"status": "ok"}
 
     def list_samples(self) -> list[dict]:
@@ -360,14 +559,13 @@ class JobService:
         return f"{ts}-{set_a}_{set_b}"
 
     async def cancel_job(self, job: Job) -> JobStatusMessage:
+        # The cancelled job status is the marker compare tasks check before rendering,
+        # so queued tasks drain as no-ops instead of being revoked one by one.
         job.status = JobStatus.cancelled
-        pages = await self._page_repo.list_for_job(job.id)
-        for page in pages:
-            if page.task_id:
-                celery_app.control.revoke(page.task_id, terminate=False)
-            if page.status in {PageStatus.pending, PageStatus.running}:
-                page.status = PageStatus.failed
-                page.error_message = "cancelled"
+        if job.upload_open:
+            job.upload_open = False
+            job.uploads_closed_at = datetime.utcnow()
+        await self._page_repo.cancel_open_for_job(str(job.id))
         await self._session.commit()
         return JobStatusMessage(
             id=str(job.id),
@@ -377,6 +575,13 @@ class JobService:
             set_b_label=job.set_b_label,
             has_diffs=job.has_diffs,
             files_available=self._files_available(str(job.id)),
+            profile=job.profile,
+            render_dpi=job.render_dpi,
+            diff_threshold=job.diff_threshold,
+            diff_mode=job.diff_mode,
+            page_order=job.page_order,
+            lazy_compare=job.lazy_compare,
+            upload_open=job.upload_open,
             created_at=job.created_at,
         )
 
@@ -430,6 +635,13 @@ class JobService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid set")
         return Path(settings.data_dir) / "jobs" / job_id / set_name
 
+    @classmethod
+    def _uploaded_files(cls, job_id: str) -> dict[str, list[str]]:
+        return {
+            set_name: list(list_relative_files(cls._job_dir(job_id, set_name)))
+            for set_name in ("setA", "setB")
+        }
+
     @staticmethod
     def _files_available(job_id: str) -> bool:
         job_dir = Path(settings.data_dir) / "jobs" / job_id
@@ -478,376 +690,112 @@ class JobService:
             total += max(count_a, count_b)
         return total
 
-    async def generate_report(self, job: Job) -> bytes:
-        report_dir = Path(settings.data_dir) / "jobs" / str(job.id) / "temp_report"
-        report_dir.mkdir(parents=True, exist_ok=True)
-        pdf_path = report_dir / "diff_report.pdf"
-        try:
-            await self.generate_report_file(job, pdf_path)
-            return pdf_path.read_bytes()
-        finally:
-            if report_dir.exists():
-                shutil.rmtree(report_dir)
+    async def render_report_outputs(self, job: Job, output_dir: Path, report_type: str) -> dict[str, Path]:
+        """Render the requested report outputs into ``output_dir`` off the event loop.
+
+        Database reads happen here; the CPU-heavy builders run in the bounded
+        report process pool. Returns the written files keyed by output kind.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        header = self._report_header(job)
+        outputs: dict[str, Path] = {}
+        if report_type in ("visual", "both"):
+            outputs["visual"] = output_dir / f"diff-report-{job.id}.pdf"
+            _, entries = await self.collect_report_entries(job)
+            await run_in_report_pool(build_visual_report, outputs["visual"], header, entries)
+        if report_type in ("text", "both"):
+            outputs["text"] = output_dir / f"text-diff-{job.id}.patch"
+            text_files = await self.collect_text_report_files(job)
+            await run_in_report_pool(build_text_report, outputs["text"], header, text_files)
+        return outputs
 
     async def generate_report_file(self, job: Job, pdf_path: Path) -> None:
         """Generate a comprehensive PDF comparison report to a file"""
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        from reportlab.pdfgen import canvas
-        from PIL import Image as pil_image
-        from PIL.Image import Image as PILImage
+        header, entries = await self.collect_report_entries(job)
+        build_visual_report(pdf_path, header, entries)
 
+    def _report_header(self, job: Job) -> ReportHeader:
+        return ReportHeader(
+            display_id=self._display_id(job),
+            set_a_label=job.set_a_label or "setA",
+            set_b_label=job.set_b_label or "setB",
+            created=job.created_at.strftime("%Y-%m-%d %H:%M:%S") if job.created_at else "N/A",
+            status=job.status.value,
+        )
+
+    async def collect_report_entries(self, job: Job) -> tuple[ReportHeader, list[ReportFileEntry]]:
         job_dir = Path(settings.data_dir) / "jobs" / str(job.id)
+        header = self._report_header(job)
+
+        entries: list[ReportFileEntry] = []
+        for file_item in await self._file_repo.list_for_job(job.id):
+            pages = sorted(await self._page_repo.list_for_file(str(file_item.id)), key=lambda p: p.page_index)
+            if not pages:
+                continue
+            diff_pages = []
+            for page in pages:
+                if not (page.diff_score and page.diff_score > 0 and page.overlay_svg_path):
+                    continue
+                overlay_path = Path(page.overlay_svg_path)
+                if overlay_path.exists():
+                    fragment = fragment_path_for(job_dir / "artifacts", str(file_item.id), page.page_index)
+                    diff_pages.append(
+                        ReportPage(
+                            page.page_index,
+                            page.diff_score,
+                            overlay_path,
+                            self._fresh_fragment(fragment, page),
+                            page.overlay_offset,
+                            page.overlay_length,
+                            page.page_index_a,
+                            page.page_index_b,
+                        )
+                    )
+            entries.append(
+                ReportFileEntry(
+                    relative_path=file_item.relative_path,
+                    bookmark=f"file_{file_item.id}",
+                    missing_in_set_a=file_item.missing_in_set_a,
+                    missing_in_set_b=file_item.missing_in_set_b,
+                    total_pages=len(pages),
+                    diff_pages_count=sum(1 for p in pages if p.diff_score and p.diff_score > 0),
+                    set_a_pdf=job_dir / "setA" / file_item.set_a_path if file_item.set_a_path else None,
+                    set_b_pdf=job_dir / "setB" / file_item.set_b_path if file_item.set_b_path else None,
+                    diff_pages=diff_pages,
+                )
+            )
+        return header, entries
 
-        # Collect all files and their diffs
-        files = await self._file_repo.list_for_job(job.id)
+    async def generate_text_report_file(self, job: Job, output_path: Path) -> None:
+        build_text_report(output_path, self._report_header(job), await self.collect_text_report_files(job))
 
-        # Temporary directory for image artifacts
-        temp_dir = job_dir / "temp_report"
-        temp_dir.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _fresh_fragment(fragment: Path, page: JobPageResult) -> Path | None:
+        """Return the page's pre-rendered report fragment if it matches the current overlay.
 
+        Packed overlays are rewritten only together with their fragment; a loose
+        overlay from before packs counts as stale if it is newer than the fragment.
+        """
         try:
-            c = canvas.Canvas(str(pdf_path), pagesize=letter)
-            width, height = letter
-
-            # Title page
-            c.setFont("Helvetica-Bold", 24)
-            c.drawString(1 * inch, height - 1.5 * inch, "PDF Diff Report")
-            c.setFont("Helvetica", 12)
-            c.drawString(1 * inch, height - 2 * inch, f"Job ID: {self._display_id(job)}")
-            c.drawString(1 * inch, height - 2.3 * inch, f"Set A: {job.set_a_label or 'setA'}")
-            c.drawString(1 * inch, height - 2.6 * inch, f"Set B: {job.set_b_label or 'setB'}")
-            c.drawString(
-                1 * inch,
-                height - 2.9 * inch,
-                f"Created: {job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else 'N/A'}",
+            if page.overlay_offset is not None:
+                return fragment if fragment.exists() else None
+            if fragment.stat().st_mtime >= Path(page.overlay_svg_path).stat().st_mtime:
+                return fragment
+        except FileNotFoundError:
+            pass
+        return None
+
+    async def collect_text_report_files(self, job: Job) -> list[TextReportFile]:
+        return [
+            TextReportFile(
+                relative_path=file_item.relative_path,
+                text_a_path=self._text_path_for_report(job, file_item, "A"),
+                text_b_path=self._text_path_for_report(job, file_item, "B"),
             )
-            c.drawString(1 * inch, height - 3.2 * inch, f"Status: {job.status.value}")
-            c.showPage()
-
-            # Preload pages for TOC and reporting
-            file_pages: list[tuple[JobFile, list]] = []
-            for file_item in files:
-                pages = await self._page_repo.list_for_file(str(file_item.id))
-                pages = sorted(pages, key=lambda p: p.page_index)
-                if pages:
-                    file_pages.append((file_item, pages))
-
-            # Table of contents
-            toc_entries = []
-            for file_item, pages in file_pages:
-                pages_with_diffs = [p for p in pages if p.diff_score and p.diff_score > 0 and p.overlay_svg_path]
-                toc_entries.append({
-                    "file_item": file_item,
-                    "pages": pages,
-                    "pages_with_diffs": pages_with_diffs,
-                    "bookmark": f"file_{file_item.id}",
-                    "section_pages": 1 + len(pages_with_diffs),
-                })
-
-            toc_start_y = height - 1.6 * inch
-            toc_bottom_y = 1 * inch
-            toc_line_height = 0.28 * inch
-            toc_lines_per_page = max(1, int((toc_start_y - toc_bottom_y) / toc_line_height))
-            toc_pages = (len(toc_entries) + toc_lines_per_page - 1) // toc_lines_per_page if toc_entries else 1
-
-            current_page_number = 1 + toc_pages + 1
-            for entry in toc_entries:
-                entry["page_number"] = current_page_number
-                current_page_number += entry["section_pages"]
-
-            for toc_page_index in range(toc_pages):
-                c.setFont("Helvetica-Bold", 18)
-                c.drawString(0.75 * inch, height - 1 * inch, "Table of Contents")
-                c.setFont("Helvetica", 11)
-                y_pos = toc_start_y
-
-                start_idx = toc_page_index * toc_lines_per_page
-                end_idx = start_idx + toc_lines_per_page
-                page_entries = toc_entries[start_idx:end_idx]
-
-                for entry in page_entries:
-                    file_item = entry["file_item"]
-                    label = file_item.relative_path
-                    page_number = entry["page_number"]
-                    status = ""
-                    if file_item.missing_in_set_a:
-                        status = " (Missing in Set A)"
-                    elif file_item.missing_in_set_b:
-                        status = " (Missing in Set B)"
-
-                    text = f"{label}{status}"
-                    c.drawString(0.75 * inch, y_pos, text)
-                    c.drawRightString(width - 0.75 * inch, y_pos, str(page_number))
-                    c.linkRect(
-                        "",
-                        entry["bookmark"],
-                        (0.75 * inch, y_pos - 2, width - 0.75 * inch, y_pos + 10),
-                        relative=1,
-                        thickness=0,
-                    )
-                    y_pos -= toc_line_height
-
-                c.showPage()
-
-            for entry in toc_entries:
-                file_item = entry["file_item"]
-                pages = entry["pages"]
-
-                if pages:
-                    c.bookmarkPage(entry["bookmark"])
-                    c.setFont("Helvetica-Bold", 16)
-                    c.drawString(0.75 * inch, height - 1 * inch, f"File: {file_item.relative_path}")
-                    c.setFont("Helvetica", 11)
-                    y_pos = height - 1.5 * inch
-
-                    if file_item.missing_in_set_a:
-                        c.drawString(0.75 * inch, y_pos, "Status: Missing in Set A")
-                        y_pos -= 0.3 * inch
-                    elif file_item.missing_in_set_b:
-                        c.drawString(0.75 * inch, y_pos, "Status: Missing in Set B")
-                        y_pos -= 0.3 * inch
-                    else:
-                        c.drawString(0.75 * inch, y_pos, f"Total Pages: {len(pages)}")
-                        y_pos -= 0.3 * inch
-                        diffs_count = sum(1 for p in pages if p.diff_score and p.diff_score > 0)
-                        c.drawString(0.75 * inch, y_pos, f"Pages with Diffs: {diffs_count}")
-                        y_pos -= 0.3 * inch
-
-                    c.showPage()
-
-                    for page in pages:
-                        if page.diff_score and page.diff_score > 0 and page.overlay_svg_path:
-                            overlay_path = job_dir / "artifacts" / str(file_item.id) / f"page_{page.page_index}.svg"
-                            if overlay_path.exists():
-                                c.setFont("Helvetica-Bold", 14)
-                                c.drawString(
-                                    0.75 * inch,
-                                    height - 1 * inch,
-                                    f"Page {page.page_index + 1} - Diff Score: {page.diff_score:.2f}",
-                                )
-
-                                img_a = None
-                                img_b = None
-                                try:
-                                    import fitz
-                                    from PIL import ImageDraw
-                                    import xml.etree.ElementTree as ET
-
-                                    pdf_path_a = job_dir / "setA" / file_item.set_a_path if file_item.set_a_path else None
-                                    pdf_path_b = job_dir / "setB" / file_item.set_b_path if file_item.set_b_path else None
-
-                                    circles = []
-                                    tree = ET.parse(str(overlay_path))
-                                    root = tree.getroot()
-                                    ns = {"svg": "http://www.w3.org/2000/svg"}
-
-                                    view_box = root.get("viewBox", "0 0 1275 1650").split()
-                                    svg_width = float(view_box[2])
-                                    svg_height = float(view_box[3])
-
-                                    for circle in root.findall(".//svg:circle", ns) or root.findall(".//circle"):
-                                        circles.append(
-                                            {
-                                                "cx": float(circle.get("cx", 0)),
-                                                "cy": float(circle.get("cy", 0)),
-                                                "r": float(circle.get("r", 30)),
-                                            }
-                                        )
-
-                                    clip_box = None
-                                    clip_width = svg_width
-                                    clip_height = svg_height
-                                    offset_x = 0.0
-                                    offset_y = 0.0
-
-                                    if circles:
-                                        padding = 100
-                                        min_x = max(0.0, min(c["cx"] - c["r"] for c in circles) - padding)
-                                        min_y = max(0.0, min(c["cy"] - c["r"] for c in circles) - padding)
-                                        max_x = min(svg_width, max(c["cx"] + c["r"] for c in circles) + padding)
-                                        max_y = min(svg_height, max(c["cy"] + c["r"] for c in circles) + padding)
-                                        clip_box = (min_x, min_y, max_x, max_y)
-                                        clip_width = max(1.0, max_x - min_x)
-                                        clip_height = max(1.0, max_y - min_y)
-                                        offset_x = min_x
-                                        offset_y = min_y
-
-                                    def render_page_crop(pdf_path: Path | None) -> PILImage | None:
-                                        if not pdf_path or not pdf_path.exists():
-                                            return None
-                                        with fitz.open(pdf_path) as doc:
-                                            if page.page_index >= doc.page_count:
-                                                return None
-                                            pdf_page = doc.load_page(page.page_index)
-                                            scale = settings.render_dpi / 72.0
-                                            matrix = fitz.Matrix(scale, scale)
-                                            clip_rect = None
-                                            if clip_box:
-                                                points_per_px_x = pdf_page.rect.width / svg_width
-                                                points_per_px_y = pdf_page.rect.height / svg_height
-                                                clip_rect = fitz.Rect(
-                                                    clip_box[0] * points_per_px_x,
-                                                    clip_box[1] * points_per_px_y,
-                                                    clip_box[2] * points_per_px_x,
-                                                    clip_box[3] * points_per_px_y,
-                                                )
-                                            pix = pdf_page.get_pixmap(matrix=matrix, alpha=False, clip=clip_rect)
-                                            try:
-                                                return pil_image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                                            finally:
-                                                del pix
-
-                                    img_a = render_page_crop(pdf_path_a)
-                                    img_b = render_page_crop(pdf_path_b)
-
-                                    def draw_circles(target: PILImage | None) -> None:
-                                        if not target or not circles:
-                                            return
-                                        scale_x = target.size[0] / clip_width
-                                        scale_y = target.size[1] / clip_height
-                                        draw = ImageDraw.Draw(target)
-                                        for circ in circles:
-                                            cx = (circ["cx"] - offset_x) * scale_x
-                                            cy = (circ["cy"] - offset_y) * scale_y
-                                            r = circ["r"] * scale_x
-                                            draw.ellipse(
-                                                [
-                                                    cx - r,
-                                                    cy - r,
-                                                    cx + r,
-                                                    cy + r,
-                                                ],
-                                                outline="red",
-                                                width=8,
-                                            )
-
-                                    draw_circles(img_a)
-                                    draw_circles(img_b)
-
-                                    if img_a and img_b:
-                                        img_a_file = temp_dir / f"page_a_{file_item.id}_{page.page_index}.jpg"
-                                        img_b_file = temp_dir / f"page_b_{file_item.id}_{page.page_index}.jpg"
-                                        img_a.save(img_a_file, "JPEG", quality=85, optimize=True)
-                                        img_b.save(img_b_file, "JPEG", quality=85, optimize=True)
-
-                                        img_width, img_height = img_a.size
-                                        max_width = 3 * inch
-                                        max_height = 7 * inch
-                                        scale = min(max_width / img_width, max_height / img_height)
-
-                                        final_width = img_width * scale
-                                        final_height = img_height * scale
-
-                                        y_pos = height - 1.5 * inch - final_height
-
-                                        c.drawString(0.75 * inch, height - 1.3 * inch, f"Set A: {job.set_a_label or 'setA'}")
-                                        c.drawImage(
-                                            str(img_a_file),
-                                            0.75 * inch,
-                                            y_pos,
-                                            width=final_width,
-                                            height=final_height,
-                                        )
-
-                                        c.drawString(4.25 * inch, height - 1.3 * inch, f"Set B: {job.set_b_label or 'setB'}")
-                                        c.drawImage(
-                                            str(img_b_file),
-                                            4.25 * inch,
-                                            y_pos,
-                                            width=final_width,
-                                            height=final_height,
-                                        )
-                                    elif img_a or img_b:
-                                        img = img_a or img_b
-                                        label = f"Set A: {job.set_a_label or 'setA'}" if img_a else f"Set B: {job.set_b_label or 'setB'}"
-                                        img_file = temp_dir / f"page_{file_item.id}_{page.page_index}.jpg"
-                                        img.save(img_file, "JPEG", quality=85, optimize=True)
-
-                                        img_width, img_height = img.size
-                                        max_width = 6.5 * inch
-                                        max_height = 8 * inch
-                                        scale = min(max_width / img_width, max_height / img_height)
-
-                                        final_width = img_width * scale
-                                        final_height = img_height * scale
-
-                                        c.drawString(0.75 * inch, height - 1.3 * inch, label)
-                                        c.drawImage(
-                                            str(img_file),
-                                            0.75 * inch,
-                                            height - 1.5 * inch - final_height,
-                                            width=final_width,
-                                            height=final_height,
-                                        )
-                                    else:
-                                        c.setFont("Helvetica", 10)
-                                        c.drawString(0.75 * inch, height - 2 * inch, "No PDF files found")
-
-                                except Exception as exc:
-                                    c.setFont("Helvetica", 10)
-                                    c.drawString(0.75 * inch, height - 2 * inch, f"Error: {str(exc)}")
-                                finally:
-                                    img_a = None
-                                    img_b = None
-                                    gc.collect()
-
-                                c.showPage()
-
-            c.save()
-        finally:
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
-
-    async def generate_text_report(self, job: Job) -> bytes:
-        report_dir = Path(settings.data_dir) / "jobs" / str(job.id) / "temp_report"
-        report_dir.mkdir(parents=True, exist_ok=True)
-        text_path = report_dir / "text_report.patch"
-        try:
-            await self.generate_text_report_file(job, text_path)
-            return text_path.read_bytes()
-        finally:
-            if report_dir.exists():
-                shutil.rmtree(report_dir)
+            for file_item in await self._file_repo.list_for_job(job.id)
+        ]
 
-    async def generate_text_report_file(self, job: Job, output_path: Path) -> None:
-        files = await self._file_repo.list_for_job(job.id)
-        diffs_found = False
-
-        with output_path.open("w", encoding="utf-8") as handle:
-            handle.write("# PDF Diff Text Report\n")
-            handle.write(f"# Job ID: {self._display_id(job)}\n")
-            handle.write(f"# Set A: {job.set_a_label or 'setA'}\n")
-            handle.write(f"# Set B: {job.set_b_label or 'setB'}\n")
-            handle.write("\n")
-
-            for file_item in files:
-                rel_path = file_item.relative_path
-                text_a = self._read_text_for_report(job, file_item, "A")
-                text_b = self._read_text_for_report(job, file_item, "B")
-
-                a_lines = text_a.splitlines(keepends=True)
-                b_lines = text_b.splitlines(keepends=True)
-
-                has_diff = False
-                for line in difflib.unified_diff(
-                    a_lines,
-                    b_lines,
-                    fromfile=f"a/{rel_path}",
-                    tofile=f"b/{rel_path}",
-                    lineterm="",
-                ):
-                    handle.write(line + "\n")
-                    has_diff = True
-
-                if has_diff:
-                    diffs_found = True
-                    handle.write("\n")
-
-            if not diffs_found:
-                handle.write("# No text differences detected.\n")
-
-    def _read_text_for_report(self, job: Job, file_item: JobFile, set_name: str) -> str:
+    def _text_path_for_report(self, job: Job, file_item: JobFile, set_name: str) -> Path:
         if set_name == "A":
             explicit = file_item.text_set_a_path
             default_name = "setA.txt"
@@ -856,13 +804,22 @@ class JobService:
             default_name = "setB.txt"
 
         if explicit:
-            path = Path(explicit)
-        else:
-            path = Path(settings.data_dir) / "jobs" / str(job.id) / "text" / str(file_item.id) / default_name
-
-        if not path.exists():
-            return ""
-        try:
-            return path.read_text(encoding="utf-8")
-        except Exception:
-            return ""
+            return Path(explicit)
+        return Path(settings.data_dir) / "jobs" / str(job.id) / "text" / str(file_item.id) / default_name
+
+
+async def measure_dispatch_window(page_repo: JobPageResultRepository) -> DispatchWindow:
+    """Current adaptive in-flight cap for page dispatch, from the last DISPATCH_SAMPLE_SECONDS."""
+    since = datetime.utcnow() - timedelta(seconds=settings.dispatch_sample_seconds)
+    completed, mean_latency = await page_repo.compare_sample_since(since)
+    running, queued = await page_repo.count_in_flight()
+    return adaptive_window(
+        completed,
+        settings.dispatch_sample_seconds,
+        mean_latency,
+        running,
+        queued,
+        settings.dispatch_target_wait_seconds,
+        settings.dispatch_min_capacity,
+        settings.dispatch_max_capacity,
+    )
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import shutil
+import zipfile
 from pathlib import Path, PurePosixPath
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from fastapi import HTTPException, status
 
@@ -27,3 +30,60 @@ def list_relative_files(base_dir: Path) -> Iterable[str]:
     if not base_dir.exists():
         return []
     return [str(path.relative_to(base_dir)).replace(os.sep, "/") for path in base_dir.rglob("*") if path.is_file()]
+
+
+async def remove_trees(paths: Iterable[Path], concurrency: int) -> int:
+    """Delete directory trees off the event loop with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    targets = list(paths)
+
+    async def _remove(path: Path) -> None:
+        async with semaphore:
+            await asyncio.to_thread(shutil.rmtree, path, True)
+
+    await asyncio.gather(*(_remove(path) for path in targets))
+    return len(targets)
+
+
+class _ZipSink:
+    """Write-only file object that hands compressed bytes to a generator.
+
+    It has no ``seek``/``tell``, so ``zipfile`` writes data descriptors after each
+    entry instead of seeking back to patch local headers.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        return None
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(members: Iterable[tuple[str, Path]], chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Yield a deflated zip archive of ``members`` (arcname, path) chunk by chunk.
+
+    Only one ``chunk_size`` read plus its compressed output is held in memory at a
+    time. It is a plain generator, so Starlette iterates it in the threadpool.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for arcname, path in members:
+            with path.open("rb") as source, zf.open(arcname, "w", force_zip64=True) as entry:
+                while chunk := source.read(chunk_size):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
@@ -0,0 +1,197 @@
+"""Structural page diff for born-digital PDFs.
+
+Instead of rendering both pages and diffing pixels, compare what PyMuPDF can
+extract directly: words with their bounding boxes and span styles (font,
+size, colour), vector drawings and embedded images (by content digest). Changed elements become regions in the
+same ``(x, y, w, h)`` pixel space the raster diff uses at the job's DPI, so
+overlays, reports and scores stay interchangeable.
+
+``diff_page_structure`` returns ``None`` when the page is not a good fit (no
+text layer but images, i.e. scans, or text the fonts cannot map to Unicode);
+callers then fall back to the raster diff.
+"""
+from __future__ import annotations
+
+import difflib
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+
+import fitz
+
+
+MOVE_TOLERANCE_PT = 1.0
+REGION_PADDING_PT = 2.0
+SCORE_GRID_PT = 2.0
+MAX_UNMAPPED_RATIO = 0.1
+
+
+@dataclass(frozen=True)
+class StructuralDiff:
+    incompatible: bool
+    diff_score: float | None
+    width: int
+    height: int
+    boxes: list[tuple[int, int, int, int]]
+
+
+def diff_page_structure(page_a: fitz.Page, page_b: fitz.Page, dpi: int) -> StructuralDiff | None:
+    scale = dpi / 72.0
+    width = int(round(page_a.rect.width * scale))
+    height = int(round(page_a.rect.height * scale))
+    if _rounded(page_a.rect) != _rounded(page_b.rect):
+        return StructuralDiff(True, None, 0, 0, [])
+
+    words_a = page_a.get_text("words", sort=True)
+    words_b = page_b.get_text("words", sort=True)
+    if not _has_usable_text(page_a, words_a) or not _has_usable_text(page_b, words_b):
+        return None
+
+    rects: list[fitz.Rect] = []
+    rects.extend(_word_changes(_word_keys(page_a, words_a), words_a, _word_keys(page_b, words_b), words_b))
+    rects.extend(_multiset_changes(_drawing_items(page_a), _drawing_items(page_b)))
+    rects.extend(_multiset_changes(_image_items(page_a), _image_items(page_b)))
+
+    page_rect = page_a.rect
+    regions = [(rect + (-REGION_PADDING_PT, -REGION_PADDING_PT, REGION_PADDING_PT, REGION_PADDING_PT)) & page_rect for rect in rects]
+    regions = [rect for rect in regions if not rect.is_empty]
+    boxes = [
+        (int(rect.x0 * scale), int(rect.y0 * scale), max(1, int(rect.width * scale)), max(1, int(rect.height * scale)))
+        for rect in _merge_overlapping(regions)
+    ]
+    return StructuralDiff(False, _coverage_percent(regions, page_rect), width, height, boxes)
+
+
+def _rounded(rect: fitz.Rect) -> tuple[int, int]:
+    return round(rect.width), round(rect.height)
+
+
+def _has_usable_text(page: fitz.Page, words: list[tuple]) -> bool:
+    if not words:
+        # Blank pages and pure vector pages are fine; image-only pages are scans.
+        return not page.get_images()
+    unmapped = sum(1 for word in words if "�" in word[4])
+    return unmapped / len(words) <= MAX_UNMAPPED_RATIO
+
+
+def _word_keys(page: fitz.Page, words: list[tuple]) -> list[tuple]:
+    """Each word's text plus the font, size and colour of the spans it overlaps.
+
+    ``words`` only carries text, so a restyled word would otherwise compare
+    equal; its block and line numbers index into the ``dict`` extraction.
+    """
+    lines: dict[tuple[int, int], list[dict]] = {}
+    for block in page.get_text("dict")["blocks"]:
+        for line_no, line in enumerate(block.get("lines", [])):
+            lines[(block["number"], line_no)] = line["spans"]
+    keys = []
+    for word in words:
+        x0, x1 = word[0], word[2]
+        styles = tuple(
+            (span["font"], round(span["size"], 1), span["color"])
+            for span in lines.get((word[5], word[6]), [])
+            if span["bbox"][0] < x1 and span["bbox"][2] > x0
+        )
+        keys.append((word[4], styles))
+    return keys
+
+
+def _word_changes(keys_a: list[tuple], words_a: list[tuple], keys_b: list[tuple], words_b: list[tuple]) -> list[fitz.Rect]:
+    matcher = difflib.SequenceMatcher(a=keys_a, b=keys_b, autojunk=False)
+    changed: list[fitz.Rect] = []
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == "equal":
+            for word_a, word_b in zip(words_a[a_start:a_end], words_b[b_start:b_end]):
+                if _moved(word_a, word_b):
+                    changed.append(fitz.Rect(word_a[:4]))
+                    changed.append(fitz.Rect(word_b[:4]))
+            continue
+        changed.extend(fitz.Rect(word[:4]) for word in words_a[a_start:a_end])
+        changed.extend(fitz.Rect(word[:4]) for word in words_b[b_start:b_end])
+    return changed
+
+
+def _moved(word_a: tuple, word_b: tuple) -> bool:
+    return any(abs(word_a[i] - word_b[i]) > MOVE_TOLERANCE_PT for i in range(4))
+
+
+def _drawing_items(page: fitz.Page) -> list[tuple[str, fitz.Rect]]:
+    items = []
+    for drawing in page.get_drawings():
+        signature = repr(
+            (
+                drawing.get("type"),
+                drawing.get("color"),
+                drawing.get("fill"),
+                round(drawing.get("width") or 0, 2),
+                [_round_item(item) for item in drawing.get("items", [])],
+            )
+        )
+        items.append((hashlib.sha1(signature.encode("utf-8")).hexdigest(), fitz.Rect(drawing["rect"])))
+    return items
+
+
+def _round_item(item: tuple) -> tuple:
+    parts = []
+    for part in item:
+        if isinstance(part, (fitz.Point, fitz.Rect, fitz.Quad)):
+            parts.append(tuple(round(value, 1) for value in tuple(part)))
+        else:
+            parts.append(part)
+    return tuple(parts)
+
+
+def _image_items(page: fitz.Page) -> list[tuple[str, fitz.Rect]]:
+    items = []
+    for info in page.get_image_info(hashes=True):
+        bbox = fitz.Rect(info["bbox"])
+        digest = info.get("digest") or b""
+        key = hashlib.sha1(bytes(digest) + repr(tuple(round(v, 1) for v in bbox)).encode("ascii")).hexdigest()
+        items.append((key, bbox))
+    return items
+
+
+def _multiset_changes(items_a: list[tuple[str, fitz.Rect]], items_b: list[tuple[str, fitz.Rect]]) -> list[fitz.Rect]:
+    """Rects of elements present on one side more often than on the other."""
+    remaining = Counter(key for key, _ in items_b)
+    changed = []
+    for key, rect in items_a:
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            changed.append(rect)
+    unmatched_a = Counter(key for key, _ in items_a)
+    for key, rect in items_b:
+        if unmatched_a[key]:
+            unmatched_a[key] -= 1
+        else:
+            changed.append(rect)
+    return changed
+
+
+def _merge_overlapping(rects: list[fitz.Rect]) -> list[fitz.Rect]:
+    merged: list[fitz.Rect] = []
+    for rect in sorted(rects, key=lambda r: (r.y0, r.x0)):
+        for index, existing in enumerate(merged):
+            if existing.intersects(rect):
+                merged[index] = existing | rect
+                break
+        else:
+            merged.append(fitz.Rect(rect))
+    return merged
+
+
+def _coverage_percent(rects: list[fitz.Rect], page_rect: fitz.Rect) -> float:
+    """Share of the page covered by changed regions, on a coarse grid."""
+    if not rects or page_rect.is_empty:
+        return 0.0
+    cols = max(1, int(page_rect.width / SCORE_GRID_PT))
+    rows = max(1, int(page_rect.height / SCORE_GRID_PT))
+    cells: set[tuple[int, int]] = set()
+    for rect in rects:
+        x0 = max(0, int((rect.x0 - page_rect.x0) / SCORE_GRID_PT))
+        x1 = min(cols, int((rect.x1 - page_rect.x0) / SCORE_GRID_PT) + 1)
+        y0 = max(0, int((rect.y0 - page_rect.y0) / SCORE_GRID_PT))
+        y1 = min(rows, int((rect.y1 - page_rect.y0) / SCORE_GRID_PT) + 1)
+        cells.update((x, y) for x in range(x0, x1) for y in range(y0, y1))
+    return len(cells) / (cols * rows) * 100.0
@@ -2,8 +2,8 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.features.jobs.deps import get_job_repository
-from app.features.jobs.repository import JobRepository
+from app.features.jobs.deps import get_job_file_repository, get_job_page_result_repository, get_job_repository
+from app.features.jobs.repository import JobFileRepository, JobPageResultRepository, JobRepository
 from app.features.reports.repository import ReportRepository
 from app.features.reports.service import ReportService
 
@@ -16,5 +16,7 @@ def get_report_service(
     session: AsyncSession = Depends(get_session),
     report_repo: ReportRepository = Depends(get_report_repository),
     job_repo: JobRepository = Depends(get_job_repository),
+    file_repo: JobFileRepository = Depends(get_job_file_repository),
+    page_repo: JobPageResultRepository = Depends(get_job_page_result_repository),
 ) -> ReportService:
-    return ReportService(session, report_repo, job_repo)
+    return ReportService(session, report_repo, job_repo, file_repo, page_repo)
@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -24,6 +24,7 @@ class ReportType(str, enum.Enum):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (Index("ix_reports_source_job_id_fingerprint", "source_job_id", "fingerprint"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
@@ -31,6 +32,9 @@ class Report(Base):
     report_type: Mapped[ReportType] = mapped_column(Enum(ReportType), nullable=False)
     status: Mapped[ReportStatus] = mapped_column(Enum(ReportStatus), nullable=False, default=ReportStatus.queued)
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    shards_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    shards_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
     output_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     output_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
     visual_path: Mapped[str | None] = mapped_column(String(2048), nullable=True)
@@ -44,3 +48,15 @@ class Report(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+
+
+class ReportShard(Base):
+    """One rendered shard of a fanned-out report; a redelivered shard finds its row already there."""
+
+    __tablename__ = "report_shards"
+
+    report_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("reports.id", ondelete="CASCADE"), primary_key=True
+    )
+    shard_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
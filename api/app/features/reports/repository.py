@@ -1,9 +1,19 @@
-from typing import Optional
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.features.reports.models import Report
+from app.features.reports.models import Report, ReportShard, ReportStatus
+
+
+class ShardProgress(NamedTuple):
+    recorded: bool
+    done: int
+    total: int
+    progress: int
 
 
 class ReportRepository:
@@ -29,6 +39,55 @@ class ReportRepository:
         )
         return list(result.scalars().all())
 
+    async def reset_shards(self, report_id: uuid.UUID) -> None:
+        await self._session.execute(delete(ReportShard).where(ReportShard.report_id == report_id))
+
+    async def record_shard_done(self, report_id: uuid.UUID, shard_index: int) -> ShardProgress:
+        """Mark one shard rendered and recount the distinct shards done.
+
+        Recording a shard twice is a no-op (``recorded`` is False). The report
+        row lock orders concurrent shards, so the count each one reads includes
+        every shard committed before it and exactly one sees the last.
+        """
+        await self._session.execute(select(Report.id).where(Report.id == report_id).with_for_update())
+        inserted = await self._session.execute(
+            insert(ReportShard)
+            .values(report_id=report_id, shard_index=shard_index)
+            .on_conflict_do_nothing()
+            .returning(ReportShard.shard_index)
+        )
+        recorded = inserted.first() is not None
+        done = (
+            select(func.count()).select_from(ReportShard).where(ReportShard.report_id == report_id).scalar_subquery()
+        )
+        result = await self._session.execute(
+            update(Report)
+            .where(Report.id == report_id)
+            .values(shards_done=done, progress=done * 95 // Report.shards_total)
+            .returning(Report.shards_done, Report.shards_total, Report.progress)
+            .execution_options(synchronize_session=False)
+        )
+        return ShardProgress(recorded, *result.one())
+
+    async def list_stale_running(self, cutoff: datetime) -> list[Report]:
+        result = await self._session.execute(
+            select(Report).where(Report.status == ReportStatus.running, Report.updated_at < cutoff)
+        )
+        return list(result.scalars().all())
+
     async def get_by_id(self, report_id: str) -> Optional[Report]:
         result = await self._session.execute(select(Report).where(Report.id == report_id))
         return result.scalar_one_or_none()
+
+    async def list_reusable(self, user_id: str, job_id: str, fingerprint: str) -> list[Report]:
+        result = await self._session.execute(
+            select(Report)
+            .where(
+                Report.user_id == user_id,
+                Report.source_job_id == job_id,
+                Report.fingerprint == fingerprint,
+                Report.status.in_([ReportStatus.queued, ReportStatus.running, ReportStatus.done]),
+            )
+            .order_by(Report.created_at.desc())
+        )
+        return list(result.scalars().all())
@@ -1,14 +1,21 @@
+import hashlib
+from pathlib import Path
+
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.celery_app import celery_app
 from app.features.auth.models import User
-from app.features.jobs.repository import JobRepository
+from app.features.jobs.models import Job
+from app.features.jobs.repository import JobFileRepository, JobPageResultRepository, JobRepository
 from app.features.jobs.service import JobService
 from app.features.reports.models import Report, ReportStatus, ReportType
 from app.features.reports.repository import ReportRepository
 from app.features.reports.schemas import ReportCreateCommand, ReportMessage
 
+# Bump when the report layout changes so older outputs are not reused.
+REPORT_FORMAT_VERSION = 1
+
 
 class ReportService:
     def __init__(
@@ -16,10 +23,14 @@ class ReportService:
         session: AsyncSession,
         report_repo: ReportRepository,
         job_repo: JobRepository,
+        file_repo: JobFileRepository,
+        page_repo: JobPageResultRepository,
     ):
         self._session = session
         self._report_repo = report_repo
         self._job_repo = job_repo
+        self._file_repo = file_repo
+        self._page_repo = page_repo
 
     async def create_report(self, user: User, command: ReportCreateCommand) -> ReportMessage:
         job = await self._job_repo.get_by_id_and_user(command.source_job_id, str(user.id))
@@ -32,12 +43,22 @@ class ReportService:
                 detail="Files are no longer available for this job",
             )
 
+        # Serialise report creation per job so concurrent identical requests
+        # see each other's row instead of both queuing a generate_report task.
+        await self._job_repo.lock_for_update(str(job.id))
+        fingerprint = await self._fingerprint(job, ReportType.both)
+        for existing in await self._report_repo.list_reusable(str(user.id), str(job.id), fingerprint):
+            if existing.status != ReportStatus.done or self._outputs_exist(existing):
+                await self._session.commit()
+                return self._to_message(existing)
+
         report = Report(
             user_id=user.id,
             source_job_id=job.id,
             report_type=ReportType.both,
             status=ReportStatus.queued,
             progress=0,
+            fingerprint=fingerprint,
         )
         self._report_repo.add(report)
         await self._session.commit()
@@ -60,6 +81,24 @@ class ReportService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
         return self._to_message(report)
 
+    async def _fingerprint(self, job: Job, report_type: ReportType) -> str:
+        """Identify the report a request would produce from the job's current results."""
+        parts = [
+            str(REPORT_FORMAT_VERSION),
+            report_type.value,
+            job.status.value,
+            job.set_a_label or "",
+            job.set_b_label or "",
+            await self._file_repo.state_digest(str(job.id)),
+            await self._page_repo.state_digest(str(job.id)),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _outputs_exist(report: Report) -> bool:
+        paths = (report.visual_path, report.text_path, report.bundle_path)
+        return all(path and Path(path).exists() for path in paths)
+
     @staticmethod
     def _to_message(report: Report) -> ReportMessage:
         return ReportMessage(
@@ -7,6 +7,7 @@ from sqlalchemy import text
 
 from app.core.config import settings
 from app.core.report_events import start_report_event_consumer
+from app.core.report_pool import shutdown_report_pool
 from app.core.report_ws import report_ws_manager
 from app.db.session import engine
 from app.features.admin.router import router as admin_router
@@ -77,6 +78,11 @@ async def stop_report_event_consumer() -> None:
         stop_event.set()
 
 
+@app.on_event("shutdown")
+async def stop_report_pool() -> None:
+    shutdown_report_pool()
+
+
 @app.get("/version")
 async def version() -> dict:
     return {"version": API_VERSION}
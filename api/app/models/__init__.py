@@ -1,5 +1,5 @@
 from app.features.auth.models import User, UserRole  # noqa: F401
 from app.features.auth.refresh_token_model import RefreshToken  # noqa: F401
 from app.features.config.models import AppConfig  # noqa: F401
-from app.features.jobs.models import Job, JobFile, JobPageResult, JobStatus, PageStatus  # noqa: F401
-from app.features.reports.models import Report, ReportStatus, ReportType  # noqa: F401
+from app.features.jobs.models import CompareCacheEntry, Job, JobFile, JobPageResult, JobStatus, PageStatus  # noqa: F401
+from app.features.reports.models import Report, ReportShard, ReportStatus, ReportType  # noqa: F401
@@ -0,0 +1,56 @@
+"""Pull-based page worker used when PAGE_DISPATCH_BACKEND=db.
+
+With the default ``celery`` backend every page is one broker message (plus
+result-backend traffic). With ``db`` the dispatcher only marks the pages it
+grants as queued in ``job_page_results``, and processes started here claim
+them in batches with ``FOR UPDATE SKIP LOCKED``. Results are committed in
+batches too (see ``ResultBuffer``). Fair share, page order, size classes,
+leases and the reaper work the same for both backends.
+
+Usage:
+    python -m app.worker.db_queue --queues pages,pages_large --processes 2
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import signal
+
+from app.features.jobs.scheduler import PAGE_QUEUES
+from app.worker.tasks import pull_pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Claim and compare pages from the database work queue.")
+    parser.add_argument(
+        "--queues",
+        default=",".join(PAGE_QUEUES.values()),
+        help="Comma-separated size-class queues to take pages from (default: all).",
+    )
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes, like celery --concurrency.")
+    args = parser.parse_args()
+    queues = [queue.strip() for queue in args.queues.split(",") if queue.strip()]
+
+    if args.processes <= 1:
+        pull_pages(queues)
+        return
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=pull_pages, args=(queues,), daemon=False) for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+
+    def stop(signum, frame) -> None:
+        # Each child finishes the page it is on and exits.
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import asyncio
-import shutil
+import hashlib
+import json
+import logging
+import os
+import signal
+import struct
+import time
 import uuid
 import zipfile
+import zlib
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Iterable
@@ -10,22 +18,62 @@ import cv2
 import fitz
 import httpx
 import numpy as np
-from sqlalchemy import delete, func, select
+from celery.signals import worker_process_shutdown
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.core.event_publisher import close_event_publisher
 from app.core.report_events import publish_report_event
 import app.models  # noqa: F401
+from app.features.auth.models import User
+from app.features.auth.repository import UserRepository
 from app.features.config.models import AppConfig
+from app.features.jobs.report_builder import (
+    ReportHeader,
+    ReportPage,
+    assemble_report,
+    build_page_fragment,
+    build_sections,
+    build_visual_report,
+    entry_from_dict,
+    entry_to_dict,
+    fragment_path_for,
+    plan_shards,
+)
 from app.features.jobs.models import Job, JobFile, JobPageResult, JobStatus, PageStatus, TextStatus
-from app.features.jobs.repository import JobFileRepository, JobPageResultRepository, JobRepository
-from app.features.jobs.service import JobService
+from app.features.jobs.repository import (
+    CompareCacheKey,
+    CompareCacheRepository,
+    JobFileRepository,
+    JobPageResultRepository,
+    JobRepository,
+    PageOutcome,
+)
+from app.features.jobs.service import JobService, measure_dispatch_window
+from app.features.jobs.alignment import AlignedPair, align_pages, fingerprint_document
+from app.features.jobs.scheduler import PAGE_QUEUES, ActiveJob, DispatchWindow, fair_share_grants, size_class_for
+from app.features.jobs.packfile import append_record, pack_path_for, read_record
+from app.features.jobs.storage import remove_trees
+from app.features.jobs.vector_diff import StructuralDiff, diff_page_structure
 from app.features.reports.models import Report, ReportStatus, ReportType
+from app.features.reports.repository import ReportRepository
 
+logger = logging.getLogger(__name__)
 
-PAGE_BATCH_SIZE = 50
+DISPATCH_LOCK_KEY = 0x70646664  # pg advisory lock id for page dispatch
+DB_QUEUE_TASK_ID = "db-queue"
+PARTITION_DAYS_AHEAD = 7
+RESCORE_COMMIT_EVERY = 500
+
+
+@worker_process_shutdown.connect
+def _close_event_publisher_on_shutdown(**_kwargs) -> None:
+    # Pool processes exit via os._exit on recycle and warm shutdown, skipping
+    # atexit; flush buffered report events (e.g. "done") before that.
+    close_event_publisher()
 
 
 @celery_app.task(name="run_job")
@@ -33,6 +81,16 @@ def run_job(job_id: str) -> None:
     asyncio.run(_run_job_async(job_id))
 
 
+@celery_app.task(name="plan_file")
+def plan_file(job_file_id: str) -> None:
+    asyncio.run(_plan_file_async(job_file_id))
+
+
+@celery_app.task(name="finish_uploads")
+def finish_uploads(job_id: str) -> None:
+    asyncio.run(_finish_uploads_async(job_id))
+
+
 @celery_app.task(name="compare_page")
 def compare_page(page_result_id: str) -> None:
     asyncio.run(_compare_page_async(page_result_id))
@@ -53,11 +111,41 @@ def cleanup_retention() -> None:
     asyncio.run(_cleanup_retention_async())
 
 
+@celery_app.task(name="reclaim_storage")
+def reclaim_storage(job_ids: list[str] | None = None, report_ids: list[str] | None = None) -> None:
+    asyncio.run(_reclaim_storage_async(job_ids or [], report_ids or []))
+
+
+@celery_app.task(name="reap_page_leases")
+def reap_page_leases() -> None:
+    asyncio.run(_reap_page_leases_async())
+
+
+@celery_app.task(name="reap_stale_reports")
+def reap_stale_reports() -> None:
+    asyncio.run(_reap_stale_reports_async())
+
+
+@celery_app.task(name="rescore_job")
+def rescore_job(job_id: str, threshold: int, open_iterations: int, close_iterations: int) -> None:
+    asyncio.run(_rescore_job_async(job_id, threshold, open_iterations, close_iterations))
+
+
 @celery_app.task(name="generate_report")
 def generate_report(report_id: str) -> None:
     asyncio.run(_generate_report_async(report_id))
 
 
+@celery_app.task(name="render_report_shard")
+def render_report_shard(report_id: str, shard_index: int) -> None:
+    asyncio.run(_render_report_shard_async(report_id, shard_index))
+
+
+@celery_app.task(name="merge_report")
+def merge_report(report_id: str) -> None:
+    asyncio.run(_merge_report_async(report_id))
+
+
 async def _run_job_async(job_id: str) -> None:
     try:
         job_uuid = uuid.UUID(job_id)
@@ -76,62 +164,209 @@ async def _run_job_async(job_id: str) -> None:
 
         files = await _get_job_files(session, job.id)
         page_results: list[JobPageResult] = []
-
+        planned_at = datetime.utcnow()
         for job_file in files:
-            if job_file.missing_in_set_a or job_file.missing_in_set_b:
-                page_result = JobPageResult(
-                    job_file_id=job_file.id,
-                    page_index=0,
-                    status=PageStatus.missing,
-                    missing_in_set_a=job_file.missing_in_set_a,
-                    missing_in_set_b=job_file.missing_in_set_b,
-                )
-                page_results.append(page_result)
-                continue
+            page_results.extend(_plan_file_pages(job, job_file))
+            job_file.planned_at = planned_at
+
+        session.add_all(page_results)
+        await session.commit()
+
+        job.status = JobStatus.running
+        await session.commit()
+        await _enqueue_text_tasks(session, job)
+        await _dispatch_pages(session)
+    await engine.dispose()
+
 
-            path_a = _resolve_file_path(job.id, "setA", job_file.set_a_path)
-            path_b = _resolve_file_path(job.id, "setB", job_file.set_b_path)
-            if not path_a.exists() or not path_b.exists():
-                page_result = JobPageResult(
+async def _plan_file_async(job_file_id: str) -> None:
+    """Plan one file pair of a streaming job as soon as both sides have landed."""
+    try:
+        job_file_uuid = uuid.UUID(job_file_id)
+    except ValueError:
+        return
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        # The row lock and planned_at make a redelivered task a no-op.
+        result = await session.execute(
+            select(JobFile, Job)
+            .join(Job, JobFile.job_id == Job.id)
+            .where(JobFile.id == job_file_uuid)
+            .with_for_update(of=JobFile)
+        )
+        row = result.first()
+        if not row or row[0].planned_at is not None or row[1].status != JobStatus.running:
+            await engine.dispose()
+            return
+
+        job_file, job = row
+        try:
+            page_results = _plan_file_pages(job, job_file)
+        except Exception as exc:
+            # An unreadable upload fails its file instead of holding the whole job open.
+            page_results = [
+                JobPageResult(
                     job_file_id=job_file.id,
                     page_index=0,
-                    status=PageStatus.missing,
-                    missing_in_set_a=not path_a.exists(),
-                    missing_in_set_b=not path_b.exists(),
+                    status=PageStatus.failed,
+                    error_message=str(exc),
                 )
-                page_results.append(page_result)
-                continue
+            ]
+        job_file.planned_at = datetime.utcnow()
+        session.add_all(page_results)
+        await session.commit()
 
-            with fitz.open(path_a) as doc_a, fitz.open(path_b) as doc_b:
-                count_a = doc_a.page_count
-                count_b = doc_b.page_count
-
-            max_pages = max(count_a, count_b)
-            for page_index in range(max_pages):
-                missing_a = page_index >= count_a
-                missing_b = page_index >= count_b
-                status = PageStatus.pending
-                if missing_a or missing_b:
-                    status = PageStatus.missing
-                page_result = JobPageResult(
-                    job_file_id=job_file.id,
-                    page_index=page_index,
-                    status=status,
-                    missing_in_set_a=missing_a,
-                    missing_in_set_b=missing_b,
-                )
-                page_results.append(page_result)
+        _enqueue_text_task(job, job_file)
+        await session.commit()
+        await _dispatch_pages(session)
+        await _try_complete_job(session, job.id)
+    await engine.dispose()
+
+
+async def _finish_uploads_async(job_id: str) -> None:
+    """Finalize a streaming job once its upload session closed: unmatched files are missing."""
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        job = await _get_job(session, job_uuid)
+        if not job or job.status != JobStatus.running or job.upload_open:
+            await engine.dispose()
+            return
 
+        # Paired files still unplanned have a plan_file task on its way.
+        unplanned = await JobFileRepository(session).list_unplanned_for_job(job.id)
+        unmatched = [job_file for job_file in unplanned if not (job_file.set_a_path and job_file.set_b_path)]
+        page_results: list[JobPageResult] = []
+        planned_at = datetime.utcnow()
+        for job_file in unmatched:
+            job_file.missing_in_set_a = job_file.set_a_path is None
+            job_file.missing_in_set_b = job_file.set_b_path is None
+            page_results.extend(_plan_file_pages(job, job_file))
+            job_file.planned_at = planned_at
         session.add_all(page_results)
         await session.commit()
 
-        job.status = JobStatus.running
+        for job_file in unmatched:
+            _enqueue_text_task(job, job_file)
         await session.commit()
-        await _enqueue_text_tasks(session, job.id)
-        await _enqueue_next_batch(session, job.id)
+        await _try_complete_job(session, job.id)
     await engine.dispose()
 
 
+def _plan_file_pages(job: Job, job_file: JobFile) -> list[JobPageResult]:
+    """Page rows for one file pair; also records the content hashes of both sides."""
+    if job_file.missing_in_set_a or job_file.missing_in_set_b:
+        return [
+            JobPageResult(
+                job_file_id=job_file.id,
+                page_index=0,
+                status=PageStatus.missing,
+                missing_in_set_a=job_file.missing_in_set_a,
+                missing_in_set_b=job_file.missing_in_set_b,
+            )
+        ]
+
+    path_a = _resolve_file_path(job.id, "setA", job_file.set_a_path)
+    path_b = _resolve_file_path(job.id, "setB", job_file.set_b_path)
+    if not path_a.exists() or not path_b.exists():
+        return [
+            JobPageResult(
+                job_file_id=job_file.id,
+                page_index=0,
+                status=PageStatus.missing,
+                missing_in_set_a=not path_a.exists(),
+                missing_in_set_b=not path_b.exists(),
+            )
+        ]
+
+    aligned: list[AlignedPair] | None = None
+    with fitz.open(path_a) as doc_a, fitz.open(path_b) as doc_b:
+        count_a = doc_a.page_count
+        count_b = doc_b.page_count
+        sizes_a = [_page_size(doc_a, index) for index in range(count_a)]
+        sizes_b = [_page_size(doc_b, index) for index in range(count_b)]
+        if count_a != count_b:
+            aligned = align_pages(fingerprint_document(doc_a), fingerprint_document(doc_b))
+    job_file.set_a_sha256 = _file_sha256(path_a)
+    job_file.set_b_sha256 = _file_sha256(path_b)
+
+    if aligned is not None:
+        page_results = _aligned_page_results(job_file, aligned)
+        for page_result in page_results:
+            _record_page_size(page_result, sizes_a, sizes_b)
+        return page_results
+
+    page_results = []
+    for page_index in range(max(count_a, count_b)):
+        missing_a = page_index >= count_a
+        missing_b = page_index >= count_b
+        status = PageStatus.pending
+        if missing_a or missing_b:
+            status = PageStatus.missing
+        page_result = JobPageResult(
+            job_file_id=job_file.id,
+            page_index=page_index,
+            status=status,
+            missing_in_set_a=missing_a,
+            missing_in_set_b=missing_b,
+        )
+        _record_page_size(page_result, sizes_a, sizes_b)
+        page_results.append(page_result)
+    return page_results
+
+
+def _aligned_page_results(job_file: JobFile, aligned: list[AlignedPair]) -> list[JobPageResult]:
+    """One row per aligned slot; identical pairs are settled here without a render."""
+    results = []
+    for slot, pair in enumerate(aligned):
+        missing_a = pair.index_a is None
+        missing_b = pair.index_b is None
+        if missing_a or missing_b:
+            status = PageStatus.missing
+        elif pair.identical:
+            status = PageStatus.done
+        else:
+            status = PageStatus.pending
+        results.append(
+            JobPageResult(
+                job_file_id=job_file.id,
+                page_index=slot,
+                page_index_a=pair.index_a,
+                page_index_b=pair.index_b,
+                status=status,
+                diff_score=0.0 if pair.identical else None,
+                missing_in_set_a=missing_a,
+                missing_in_set_b=missing_b,
+            )
+        )
+    return results
+
+
+def _page_size(doc: fitz.Document, page_index: int) -> tuple[float, float]:
+    # The crop box is read from the page dictionary without loading the page.
+    rect = doc.page_cropbox(page_index)
+    return rect.width, rect.height
+
+
+def _record_page_size(
+    page_result: JobPageResult, sizes_a: list[tuple[float, float]], sizes_b: list[tuple[float, float]]
+) -> None:
+    """Store the larger extent of the two sides; it decides the page's size class."""
+    sizes = []
+    if not page_result.missing_in_set_a and page_result.source_index_a < len(sizes_a):
+        sizes.append(sizes_a[page_result.source_index_a])
+    if not page_result.missing_in_set_b and page_result.source_index_b < len(sizes_b):
+        sizes.append(sizes_b[page_result.source_index_b])
+    if sizes:
+        page_result.width_pt = max(width for width, _ in sizes)
+        page_result.height_pt = max(height for _, height in sizes)
+
+
 async def _extract_text_async(job_file_id: str) -> None:
     try:
         job_file_uuid = uuid.UUID(job_file_id)
@@ -218,61 +453,335 @@ async def _compare_page_async(page_result_id: str) -> None:
             return
 
         page_result, job_file, job = row
-        if job.status == JobStatus.cancelled:
-            page_result.status = PageStatus.failed
-            page_result.error_message = "cancelled"
-            await session.commit()
+        if job.status == JobStatus.cancelled or page_result.status != PageStatus.pending:
+            # Cancellation already failed the open pages in bulk; nothing to do.
+            await engine.dispose()
             return
-        page_result.status = PageStatus.running
+        attempt = await JobPageResultRepository(session).claim(page_result.id, settings.page_lease_seconds)
         await session.commit()
+        if attempt is None:
+            # A redelivered message for a page another worker already claimed.
+            await engine.dispose()
+            return
+
+        await _compare_claimed_page(sessionmaker, session, page_result, job_file, job, attempt)
+    await engine.dispose()
 
-        if page_result.missing_in_set_a or page_result.missing_in_set_b:
-            page_result.status = PageStatus.missing
+
+async def _compare_claimed_page(
+    sessionmaker: async_sessionmaker,
+    session: AsyncSession,
+    page_result: JobPageResult,
+    job_file: JobFile,
+    job: Job,
+    attempt: int,
+) -> None:
+    """Compare a page this worker holds the lease on and commit the result."""
+    outcome = await _evaluate_claimed_page(sessionmaker, page_result, job_file, job, attempt)
+    await _record_outcomes(session, [outcome])
+    await session.commit()
+    await _dispatch_pages(session)
+    await _try_complete_job(session, job.id)
+
+
+async def _record_outcomes(session: AsyncSession, outcomes: list[PageOutcome]) -> set[uuid.UUID]:
+    """Write outcomes whose attempt still holds its page, and flag the files and jobs they found diffs in."""
+    written = await JobPageResultRepository(session).record_outcomes(outcomes)
+    differing = [outcome for outcome in outcomes if outcome.page_id in written and outcome.diff_score]
+    if differing:
+        await session.execute(
+            update(JobFile)
+            .where(JobFile.id.in_({outcome.job_file_id for outcome in differing}))
+            .where(JobFile.has_diffs.is_(False))
+            .values(has_diffs=True)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(Job)
+            .where(Job.id.in_({outcome.job_id for outcome in differing}))
+            .where(Job.has_diffs.is_(False))
+            .values(has_diffs=True)
+            .execution_options(synchronize_session=False)
+        )
+    return written
+
+
+async def _evaluate_claimed_page(
+    sessionmaker: async_sessionmaker,
+    page_result: JobPageResult,
+    job_file: JobFile,
+    job: Job,
+    attempt: int,
+) -> PageOutcome:
+    """Compare a leased page; the objects passed in are only read.
+
+    The compare cache is read and written in short sessions of its own, so
+    nothing stays locked while the page renders.
+    """
+    outcome = PageOutcome(
+        page_id=page_result.id,
+        created_at=page_result.created_at,
+        attempt=attempt,
+        job_id=job.id,
+        job_file_id=job_file.id,
+        status=PageStatus.failed,
+        finished_at=datetime.utcnow(),
+    )
+    if page_result.missing_in_set_a or page_result.missing_in_set_b:
+        return outcome._replace(status=PageStatus.missing)
+
+    heartbeat = asyncio.create_task(_renew_lease(sessionmaker, page_result.id, attempt))
+    try:
+        path_a = _resolve_file_path(job.id, "setA", job_file.set_a_path)
+        path_b = _resolve_file_path(job.id, "setB", job_file.set_b_path)
+        structural = None
+        if job.diff_mode == "vector":
+            structural = await asyncio.to_thread(
+                _diff_structure,
+                path_a,
+                page_result.source_index_a,
+                path_b,
+                page_result.source_index_b,
+                job.render_dpi,
+            )
+        # The cache holds raster results only; structural diffs are cheap enough to redo.
+        cache_key = _compare_cache_key(job, job_file, page_result) if structural is None else None
+        cached = None
+        if cache_key:
+            async with sessionmaker() as cache_session:
+                cached = await CompareCacheRepository(cache_session).get(cache_key)
+                if cached is not None and job.generate_overlays and cached.diff_score and not cached.boxes:
+                    # Stored by a quick scan, which skips region extraction.
+                    cached = None
+                if cached is not None:
+                    await CompareCacheRepository(cache_session).mark_hit(cached)
+                    await cache_session.commit()
+        if structural is not None:
+            outcome = outcome._replace(diff_method="vector")
+            incompatible = structural.incompatible
+            diff_score = structural.diff_score
+            width, height, boxes = structural.width, structural.height, structural.boxes
+        elif cached is not None:
+            outcome = outcome._replace(diff_method="raster", cache_hit=True)
+            incompatible = cached.incompatible_size
+            diff_score = cached.diff_score
+            width, height, boxes = cached.width, cached.height, [tuple(box) for box in cached.boxes]
+        else:
+            outcome = outcome._replace(diff_method="raster")
+            # Rendering runs off the event loop so the lease heartbeat keeps ticking.
+            image_a = await asyncio.to_thread(_render_page, path_a, page_result.source_index_a, job.render_dpi)
+            image_b = await asyncio.to_thread(_render_page, path_b, page_result.source_index_b, job.render_dpi)
+
+            incompatible = image_a.shape != image_b.shape
+            if incompatible:
+                diff_score, width, height, boxes = None, 0, 0, []
+            else:
+                magnitudes = await asyncio.to_thread(_diff_magnitudes, image_a, image_b)
+                diff_score, width, height, boxes = await asyncio.to_thread(
+                    _score_magnitudes,
+                    magnitudes,
+                    job.diff_threshold,
+                    job.open_iterations,
+                    job.close_iterations,
+                    with_regions=job.generate_overlays,
+                )
+                if settings.keep_diff_magnitudes:
+                    record = _encode_magnitudes(magnitudes)
+                    magnitude_pack = pack_path_for(_artifacts_dir(job.id), "magnitudes")
+                    outcome = outcome._replace(
+                        magnitude_path=str(magnitude_pack),
+                        magnitude_offset=append_record(magnitude_pack, record),
+                        magnitude_length=len(record),
+                    )
+            if cache_key:
+                async with sessionmaker() as cache_session:
+                    await CompareCacheRepository(cache_session).store(
+                        cache_key, diff_score, incompatible, width, height, boxes
+                    )
+                    await cache_session.commit()
+
+        if incompatible:
+            outcome = outcome._replace(status=PageStatus.incompatible_size, incompatible_size=True)
+        else:
+            if job.generate_overlays:
+                overlay_path, overlay_offset, overlay_length = _store_overlay(job.id, width, height, boxes)
+                outcome = outcome._replace(
+                    overlay_svg_path=overlay_path, overlay_offset=overlay_offset, overlay_length=overlay_length
+                )
+            outcome = outcome._replace(status=PageStatus.done, diff_score=diff_score)
+            if diff_score > 0 and job.incremental_report and job.generate_overlays:
+                _write_report_fragment(job, job_file, page_result, outcome)
+        return outcome._replace(finished_at=datetime.utcnow())
+    except Exception as exc:  # pragma: no cover - runtime safety
+        return outcome._replace(status=PageStatus.failed, error_message=str(exc), finished_at=datetime.utcnow())
+    finally:
+        heartbeat.cancel()
+
+
+def pull_pages(queues: list[str]) -> None:
+    """Run the DB work-queue loop in this process until SIGTERM or SIGINT."""
+    asyncio.run(_pull_pages_async(queues, settings.db_queue_batch_size))
+
+
+async def _pull_pages_async(queues: list[str], batch_size: int) -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = ResultBuffer(sessionmaker, settings.result_buffer_pages, settings.result_buffer_ms / 1000)
+    while not stopping.is_set():
+        async with sessionmaker() as session:
+            page_repo = JobPageResultRepository(session)
+            claimed = await page_repo.claim_batch(DB_QUEUE_TASK_ID, queues, batch_size, settings.page_lease_seconds)
             await session.commit()
-            await _enqueue_next_batch(session, job.id)
-            await _try_complete_job(session, job.id)
-            return
+            # Pages, files and jobs are read fresh for every batch, so a cancel is seen by the next one.
+            rows = await _load_claimed_pages(session, [page_id for page_id, _ in claimed])
+        if not claimed:
+            await buffer.flush()
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=settings.db_queue_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
 
-        try:
-            path_a = _resolve_file_path(job.id, "setA", job_file.set_a_path)
-            path_b = _resolve_file_path(job.id, "setB", job_file.set_b_path)
+        claimed_at = time.monotonic()
+        for page_id, attempt in claimed:
+            if stopping.is_set():
+                break
+            if time.monotonic() - claimed_at > settings.page_heartbeat_seconds:
+                # This page waited behind earlier ones; make sure it is still ours.
+                async with sessionmaker() as session:
+                    renewed = await JobPageResultRepository(session).renew_lease(
+                        page_id, attempt, settings.page_lease_seconds
+                    )
+                    await session.commit()
+                if not renewed:
+                    continue
+            row = rows.get(page_id)
+            if not row:
+                continue
+            page_result, job_file, job = row
+            if job.status == JobStatus.cancelled:
+                outcome = PageOutcome(
+                    page_id=page_result.id,
+                    created_at=page_result.created_at,
+                    attempt=attempt,
+                    job_id=job.id,
+                    job_file_id=job_file.id,
+                    status=PageStatus.failed,
+                    finished_at=datetime.utcnow(),
+                    error_message="Job cancelled",
+                )
+            else:
+                outcome = await _evaluate_claimed_page(sessionmaker, page_result, job_file, job, attempt)
+            buffer.add(outcome)
+            if buffer.due():
+                await buffer.flush()
+    await buffer.flush()
+    # Pages claimed but not started when stopping keep their lease and are
+    # requeued by the reaper once it expires.
+    await engine.dispose()
 
-            image_a = _render_page(path_a, page_result.page_index)
-            image_b = _render_page(path_b, page_result.page_index)
 
-            if image_a.shape != image_b.shape:
-                page_result.status = PageStatus.incompatible_size
-                page_result.incompatible_size = True
-                page_result.diff_score = None
+async def _load_claimed_pages(
+    session: AsyncSession, page_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, tuple[JobPageResult, JobFile, Job]]:
+    if not page_ids:
+        return {}
+    result = await session.execute(
+        select(JobPageResult, JobFile, Job)
+        .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+        .join(Job, JobFile.job_id == Job.id)
+        .where(JobPageResult.id.in_(page_ids))
+    )
+    return {page_result.id: (page_result, job_file, job) for page_result, job_file, job in result.all()}
+
+
+class ResultBuffer:
+    """Batches the writes that record finished pages in the DB work-queue loop.
+
+    Outcomes are plain values held in memory until RESULT_BUFFER_PAGES pages or
+    RESULT_BUFFER_MS have built up. They are then written in one short
+    transaction, followed by a single dispatch and one completion check per
+    affected job, in place of a commit, dispatch and check per page. No row is
+    locked while outcomes wait in the buffer.
+
+    Until the write a page stays ``running`` under its lease. If the process
+    dies or the write fails, nothing of the batch is written and the reaper
+    requeues those pages when their leases expire, so each result is either
+    written whole or recomputed. Overlay records already appended to pack
+    files for such pages are left unreferenced.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker, max_pages: int, max_age: float):
+        self._sessionmaker = sessionmaker
+        self._max_pages = max(1, max_pages)
+        self._max_age = max_age
+        self._outcomes: list[PageOutcome] = []
+        self._first_at = 0.0
+
+    def add(self, outcome: PageOutcome) -> None:
+        if not self._outcomes:
+            self._first_at = time.monotonic()
+        self._outcomes.append(outcome)
+
+    def due(self) -> bool:
+        return len(self._outcomes) >= self._max_pages or (
+            bool(self._outcomes) and time.monotonic() - self._first_at >= self._max_age
+        )
+
+    async def flush(self) -> None:
+        if not self._outcomes:
+            return
+        outcomes, self._outcomes = self._outcomes, []
+        async with self._sessionmaker() as session:
+            try:
+                written = await _record_outcomes(session, outcomes)
                 await session.commit()
-                await _enqueue_next_batch(session, job.id)
-                await _try_complete_job(session, job.id)
+            except Exception:  # pragma: no cover - leases expire and the reaper retries
+                logger.exception("Recording %d page outcomes failed; their leases will expire", len(outcomes))
+                await session.rollback()
                 return
+            await _dispatch_pages(session)
+            for job_id in {outcome.job_id for outcome in outcomes if outcome.page_id in written}:
+                await _try_complete_job(session, job_id)
 
-            diff_score, overlay_svg = _diff_and_overlay(image_a, image_b)
-            overlay_path = _overlay_path(job.id, job_file.id, page_result.page_index)
-            overlay_path.parent.mkdir(parents=True, exist_ok=True)
-            overlay_path.write_text(overlay_svg, encoding="utf-8")
 
-            page_result.diff_score = diff_score
-            page_result.overlay_svg_path = str(overlay_path)
-            page_result.status = PageStatus.done
-            if diff_score > 0:
-                job_file.has_diffs = True
-                job.has_diffs = True
-            await session.commit()
-            await _enqueue_next_batch(session, job.id)
-            await _try_complete_job(session, job.id)
-        except Exception as exc:  # pragma: no cover - runtime safety
-            page_result.status = PageStatus.failed
-            page_result.error_message = str(exc)
-            await session.commit()
-            await _enqueue_next_batch(session, job.id)
-            await _try_complete_job(session, job.id)
+async def _renew_lease(sessionmaker: async_sessionmaker, page_id: uuid.UUID, attempt: int) -> None:
+    """Extend the page's lease until cancelled; stops if the reaper took the page away."""
+    while True:
+        await asyncio.sleep(settings.page_heartbeat_seconds)
+        try:
+            async with sessionmaker() as session:
+                renewed = await JobPageResultRepository(session).renew_lease(
+                    page_id, attempt, settings.page_lease_seconds
+                )
+                await session.commit()
+        except Exception:  # pragma: no cover - try again on the next beat
+            continue
+        if not renewed:
+            return
+
+
+async def _reap_page_leases_async() -> None:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        requeued, failed, job_ids = await JobPageResultRepository(session).reap_expired_leases(
+            datetime.utcnow(), settings.page_max_attempts
+        )
+        await session.commit()
+        if requeued:
+            await _dispatch_pages(session)
+        for job_id in job_ids:
+            await _try_complete_job(session, job_id)
     await engine.dispose()
 
 
-async def _enqueue_pages_async(job_id: str) -> None:
+async def _rescore_job_async(job_id: str, threshold: int, open_iterations: int, close_iterations: int) -> None:
     try:
         job_uuid = uuid.UUID(job_id)
     except ValueError:
@@ -280,7 +789,67 @@ async def _enqueue_pages_async(job_id: str) -> None:
     engine = create_async_engine(settings.database_url, poolclass=NullPool)
     sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     async with sessionmaker() as session:
-        await _enqueue_next_batch(session, job_uuid)
+        job = await _get_job(session, job_uuid)
+        if not job or job.status == JobStatus.running:
+            await engine.dispose()
+            return
+
+        # Only the stored magnitude maps are read; nothing is rendered. A page
+        # compared without a map (cache hit, structural diff, or
+        # KEEP_DIFF_MAGNITUDES off) would keep its old score while the job
+        # reported the new settings, so such jobs are left alone; the API
+        # refuses them up front.
+        page_repo = JobPageResultRepository(session)
+        if await page_repo.count_unrescorable_for_job(str(job.id)):
+            await engine.dispose()
+            return
+        artifacts_dir = _artifacts_dir(job.id)
+        rows = await page_repo.list_rescorable_for_job(str(job.id))
+        # Every overlay is rewritten into a pack of its own, so the packs the
+        # previous overlays live in can be deleted afterwards instead of
+        # growing with each rescore.
+        old_packs = {page.overlay_svg_path for page, _ in rows if page.overlay_offset is not None}
+        overlay_pack = pack_path_for(artifacts_dir, f"overlays-{uuid.uuid4().hex[:12]}")
+        for index, (page_result, job_file) in enumerate(rows, start=1):
+            record = read_record(
+                Path(page_result.magnitude_path), page_result.magnitude_offset, page_result.magnitude_length
+            )
+            diff_score, width, height, boxes = _score_magnitudes(
+                _decode_magnitudes(record),
+                threshold,
+                open_iterations,
+                close_iterations,
+                with_regions=job.generate_overlays,
+            )
+            page_result.diff_score = diff_score
+            if job.generate_overlays:
+                (
+                    page_result.overlay_svg_path,
+                    page_result.overlay_offset,
+                    page_result.overlay_length,
+                ) = _store_overlay(job.id, width, height, boxes, overlay_pack)
+            fragment_path_for(artifacts_dir, str(job_file.id), page_result.page_index).unlink(missing_ok=True)
+            if index % RESCORE_COMMIT_EVERY == 0:
+                await session.commit()
+
+        job.diff_threshold = threshold
+        job.open_iterations = open_iterations
+        job.close_iterations = close_iterations
+        await _refresh_has_diffs(session, job)
+        await session.commit()
+
+        in_use = await page_repo.overlay_packs_in_use(str(job.id), old_packs) if old_packs else set()
+        for path in old_packs - in_use:
+            Path(path).unlink(missing_ok=True)
+    await engine.dispose()
+
+
+async def _enqueue_pages_async(job_id: str) -> None:
+    # Dispatch covers every running job; job_id only records who asked.
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        await _dispatch_pages(session)
     await engine.dispose()
 
 
@@ -295,31 +864,119 @@ async def _cleanup_retention_async() -> None:
         file_cutoff = now - timedelta(hours=file_retention_hours)
         job_cutoff = now - timedelta(days=job_retention_days)
 
+        jobs_dir = Path(settings.data_dir) / "jobs"
         result = await session.execute(
             select(Job.id, Job.status).where(Job.created_at < file_cutoff)
         )
-        for job_id, status in result.all():
-            if status == JobStatus.running:
-                continue
-            job_dir = Path(settings.data_dir) / "jobs" / str(job_id)
-            shutil.rmtree(job_dir, ignore_errors=True)
+        await remove_trees(
+            (jobs_dir / str(job_id) for job_id, status in result.all() if status != JobStatus.running),
+            settings.reclaim_concurrency,
+        )
 
-        result = await session.execute(select(Job).where(Job.created_at < job_cutoff))
-        jobs = list(result.scalars().all())
         page_repo = JobPageResultRepository(session)
         file_repo = JobFileRepository(session)
+
+        # Whole partitions older than the cutoff are detached and dropped; only
+        # partitions still holding pages of running jobs fall back to row deletes.
+        for partition in await page_repo.list_partitions_before(job_cutoff):
+            if await page_repo.partition_has_live_rows(partition, job_cutoff):
+                await page_repo.delete_expired_in_partition(partition, job_cutoff)
+            else:
+                await page_repo.drop_partition(partition)
+            await session.commit()
+        # Expired pages can still sit in the partition holding the cutoff, in later
+        # ones (jobs planned after their creation day) or in the default partition.
+        await page_repo.delete_expired_since(datetime.combine(job_cutoff.date(), datetime.min.time()), job_cutoff)
+        await session.commit()
+        # Partitions are created here, ahead of time, rather than on the insert
+        # paths; one transaction per day keeps the parent's lock short.
+        for offset in range(PARTITION_DAYS_AHEAD + 1):
+            await page_repo.ensure_partition(now.date() + timedelta(days=offset))
+            await session.commit()
+        await CompareCacheRepository(session).delete_unused_since(job_cutoff)
+        await session.commit()
+
+        result = await session.execute(select(Job).where(Job.created_at < job_cutoff))
+        jobs = list(result.scalars().all())
+        expired_ids: list[str] = []
         for job in jobs:
             if job.status == JobStatus.running:
                 continue
-            await page_repo.delete_for_job(job.id)
             await file_repo.delete_for_job(job.id)
             await session.execute(delete(Job).where(Job.id == job.id))
-            job_dir = Path(settings.data_dir) / "jobs" / str(job.id)
-            shutil.rmtree(job_dir, ignore_errors=True)
+            expired_ids.append(str(job.id))
 
         await session.commit()
+        await remove_trees((jobs_dir / job_id for job_id in expired_ids), settings.reclaim_concurrency)
+        await _sweep_orphaned_dirs(session)
+    await engine.dispose()
+
+
+async def _reclaim_storage_async(job_ids: list[str], report_ids: list[str]) -> None:
+    data_dir = Path(settings.data_dir)
+    await remove_trees(
+        [data_dir / "jobs" / job_id for job_id in job_ids]
+        + [data_dir / "reports" / report_id for report_id in report_ids],
+        settings.reclaim_concurrency,
+    )
+
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        job_repo = JobRepository(session)
+        tombstoned = await job_repo.list_tombstoned_ids(settings.reclaim_batch_size)
+        if tombstoned:
+            result = await session.execute(select(Report.id).where(Report.source_job_id.in_(tombstoned)))
+            report_dirs = [data_dir / "reports" / str(report_id) for report_id in result.scalars().all()]
+            # Directories go first: if the worker dies midway the tombstone is still
+            # there and the next run retries the batch.
+            await remove_trees(
+                [data_dir / "jobs" / job_id for job_id in tombstoned] + report_dirs,
+                settings.reclaim_concurrency,
+            )
+            await JobPageResultRepository(session).delete_for_jobs(tombstoned)
+            await JobFileRepository(session).delete_for_jobs(tombstoned)
+            await job_repo.delete_many(tombstoned)
+            await session.commit()
+        if len(tombstoned) < settings.reclaim_batch_size:
+            # Users deleted by an admin go once the batches above have removed all their jobs.
+            await UserRepository(session).delete_tombstoned()
+            await session.commit()
     await engine.dispose()
 
+    if len(tombstoned) >= settings.reclaim_batch_size:
+        celery_app.send_task("reclaim_storage")
+
+
+async def _sweep_orphaned_dirs(session: AsyncSession) -> None:
+    """Remove job and report directories that no longer have a database row."""
+    data_dir = Path(settings.data_dir)
+    grace_cutoff = datetime.utcnow().timestamp() - settings.orphan_grace_hours * 3600
+    for kind, model in (("jobs", Job), ("reports", Report)):
+        base = data_dir / kind
+        if not base.exists():
+            continue
+        candidates: list[str] = []
+        with os.scandir(base) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    uuid.UUID(entry.name)
+                    if entry.stat(follow_symlinks=False).st_mtime > grace_cutoff:
+                        continue
+                except (ValueError, OSError):
+                    continue
+                candidates.append(entry.name)
+
+        orphans: list[str] = []
+        for start in range(0, len(candidates), 1000):
+            chunk = candidates[start:start + 1000]
+            result = await session.execute(select(model.id).where(model.id.in_(chunk)))
+            existing = {str(item) for item in result.scalars().all()}
+            orphans.extend(name for name in chunk if name not in existing)
+        await remove_trees((base / name for name in orphans), settings.reclaim_concurrency)
+
 
 async def _get_job(session: AsyncSession, job_id: uuid.UUID) -> Job | None:
     result = await session.execute(select(Job).where(Job.id == job_id))
@@ -336,7 +993,7 @@ async def _get_job_files(session: AsyncSession, job_id: str) -> list[JobFile]:
     return list(result.scalars().all())
 
 
-async def _try_complete_job(session: AsyncSession, job_id: str) -> None:
+async def _try_complete_job(session: AsyncSession, job_id: uuid.UUID) -> None:
     pending = await session.execute(
         select(JobPageResult)
         .join(JobFile, JobPageResult.job_file_id == JobFile.id)
@@ -346,106 +1003,277 @@ async def _try_complete_job(session: AsyncSession, job_id: str) -> None:
     if pending.scalars().first() is None:
         result = await session.execute(select(Job).where(Job.id == job_id))
         job = result.scalar_one_or_none()
+        # A streaming job is not done while files can still land or wait to be planned.
+        if job and job.upload_open:
+            return
+        unplanned = await session.execute(
+            select(JobFile.id).where(JobFile.job_id == job_id).where(JobFile.planned_at.is_(None)).limit(1)
+        )
+        if unplanned.first() is not None:
+            return
         if job and job.status != JobStatus.cancelled:
-            file_repo = JobFileRepository(session)
-            await file_repo.update_has_diffs_for_job(job.id)
-            diff_any = await session.execute(
-                select(JobPageResult)
-                .join(JobFile, JobPageResult.job_file_id == JobFile.id)
-                .where(JobFile.job_id == job.id)
-                .where(JobPageResult.diff_score.is_not(None))
-                .where(JobPageResult.diff_score > 0)
-                .limit(1)
-            )
-            job.has_diffs = diff_any.scalar_one_or_none() is not None
+            await _refresh_has_diffs(session, job)
             job.status = JobStatus.completed
             await session.commit()
 
 
-async def _enqueue_next_batch(session: AsyncSession, job_id: uuid.UUID) -> None:
-    result = await session.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    if not job or job.status == JobStatus.cancelled:
-        return
-
-    in_flight_result = await session.execute(
-        select(func.count())
-        .select_from(JobPageResult)
+async def _refresh_has_diffs(session: AsyncSession, job: Job) -> None:
+    file_repo = JobFileRepository(session)
+    await file_repo.update_has_diffs_for_job(job.id)
+    diff_any = await session.execute(
+        select(JobPageResult)
         .join(JobFile, JobPageResult.job_file_id == JobFile.id)
-        .where(JobFile.job_id == job_id)
-        .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.running]))
-        .where(JobPageResult.task_id.is_not(None))
+        .where(JobFile.job_id == job.id)
+        .where(JobPageResult.diff_score.is_not(None))
+        .where(JobPageResult.diff_score > 0)
+        .limit(1)
     )
-    in_flight = int(in_flight_result.scalar_one() or 0)
-    available_slots = max(0, PAGE_BATCH_SIZE - in_flight)
-    if available_slots == 0:
-        return
+    job.has_diffs = diff_any.scalar_one_or_none() is not None
+
+
+async def _dispatch_pages(session: AsyncSession) -> None:
+    """Top up in-flight page tasks across all running jobs by fair share.
+
+    Called whenever a job starts or a page finishes. The advisory lock makes
+    dispatch single-file so two workers never hand out the same free slots; it
+    is released by the commit at the end.
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(DISPATCH_LOCK_KEY)))
+    capacity = (await _dispatch_window(session)).capacity
+    running = await session.execute(
+        select(Job.id, Job.user_id, User.role, Job.page_order, Job.lazy_compare, Job.render_dpi)
+        .join(User, Job.user_id == User.id)
+        .where(Job.status == JobStatus.running)
+        .order_by(Job.created_at, Job.id)
+    )
+    jobs = running.all()
+    counts = await _open_page_counts(session, [job_id for job_id, *_ in jobs])
+    active: list[ActiveJob] = []
+    page_orders: dict[uuid.UUID, str] = {}
+    render_dpis: dict[uuid.UUID, int] = {}
+    for job_id, user_id, role, page_order, lazy, render_dpi in jobs:
+        page_orders[job_id] = page_order
+        render_dpis[job_id] = render_dpi
+        in_flight, waiting, requested = counts.get(job_id, (0, 0, 0))
+        # Demand beyond the total capacity never changes the split.
+        pending, idle_pending = min(waiting, capacity), 0
+        if lazy:
+            pending, idle_pending = min(requested, capacity), min(waiting - requested, capacity)
+        active.append(ActiveJob(job_id, user_id, role.value, in_flight, pending, idle_pending))
+
+    grants = fair_share_grants(capacity, active, settings.fair_share_role_weights)
+    # A message nobody picks up within this time is presumed lost and resent by the reaper.
+    queue_lease = datetime.utcnow() + timedelta(seconds=settings.page_queue_lease_seconds)
+    for job_id, slots in grants.items():
+        pending_result = await session.execute(
+            select(JobPageResult)
+            .join(JobFile, JobPageResult.job_file_id == JobFile.id)
+            .where(JobFile.job_id == job_id)
+            .where(JobPageResult.status == PageStatus.pending)
+            .where(JobPageResult.task_id.is_(None))
+            .order_by(*_dispatch_order(page_orders[job_id]))
+            .limit(slots)
+        )
+        for page in pending_result.scalars().all():
+            queue = PAGE_QUEUES[
+                size_class_for(
+                    page.width_pt,
+                    page.height_pt,
+                    render_dpis[job_id],
+                    settings.size_class_large_megapixels,
+                    settings.size_class_huge_megapixels,
+                )
+            ]
+            if settings.page_dispatch_backend == "db":
+                # Workers pull these rows themselves (app.worker.db_queue); no broker message.
+                page.task_id = DB_QUEUE_TASK_ID
+            else:
+                page.task_id = celery_app.send_task("compare_page", args=[str(page.id)], queue=queue).id
+            page.dispatch_queue = queue
+            page.lease_expires_at = queue_lease
+    await session.commit()
 
-    pending_result = await session.execute(
-        select(JobPageResult)
+
+_window_cache: tuple[float, DispatchWindow] | None = None
+
+
+async def _dispatch_window(session: AsyncSession) -> DispatchWindow:
+    """The adaptive in-flight cap, re-measured at most every DISPATCH_REFRESH_SECONDS per process."""
+    global _window_cache
+    now = time.monotonic()
+    if _window_cache is not None and now - _window_cache[0] < settings.dispatch_refresh_seconds:
+        return _window_cache[1]
+    window = await measure_dispatch_window(JobPageResultRepository(session))
+    _window_cache = (now, window)
+    return window
+
+
+async def _open_page_counts(
+    session: AsyncSession, job_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, tuple[int, int, int]]:
+    """(in flight, waiting, waiting in viewed files) per job, in one grouped query."""
+    if not job_ids:
+        return {}
+    waiting = (JobPageResult.status == PageStatus.pending) & JobPageResult.task_id.is_(None)
+    result = await session.execute(
+        select(
+            JobFile.job_id,
+            func.count().filter(JobPageResult.task_id.is_not(None)),
+            func.count().filter(waiting),
+            func.count().filter(waiting & JobFile.viewed_at.is_not(None)),
+        )
         .join(JobFile, JobPageResult.job_file_id == JobFile.id)
-        .where(JobFile.job_id == job_id)
-        .where(JobPageResult.status == PageStatus.pending)
-        .where(JobPageResult.task_id.is_(None))
-        .order_by(JobPageResult.created_at, JobPageResult.id)
-        .limit(available_slots)
+        .where(JobFile.job_id.in_(job_ids))
+        .where(JobPageResult.status.in_([PageStatus.pending, PageStatus.running]))
+        .group_by(JobFile.job_id)
+    )
+    return {
+        job_id: (int(in_flight), int(waiting_count), int(requested))
+        for job_id, in_flight, waiting_count, requested in result.all()
+    }
+
+
+def _dispatch_order(page_order: str) -> tuple:
+    """ORDER BY for a job's pending pages.
+
+    Files opened in the viewer come first, most recently opened first. After
+    that ``preview`` sends the first page of every file, then pages of files
+    already known to differ, then the rest breadth-first by page index, so every
+    file in a long job shows a result early. ``sequential`` finishes files in turn.
+    """
+    viewed = JobFile.viewed_at.desc().nulls_last()
+    if page_order == "sequential":
+        return viewed, JobPageResult.created_at, JobPageResult.id
+    return (
+        viewed,
+        (JobPageResult.page_index > 0),
+        JobFile.has_diffs.desc(),
+        JobPageResult.page_index,
+        JobFile.created_at,
+        JobPageResult.id,
     )
-    pages = list(pending_result.scalars().all())
-    if not pages:
-        return
-
-    for page in pages:
-        async_result = celery_app.send_task("compare_page", args=[str(page.id)])
-        page.task_id = async_result.id
-    await session.commit()
 
 
-async def _enqueue_text_tasks(session: AsyncSession, job_id: uuid.UUID) -> None:
-    result = await session.execute(select(JobFile).where(JobFile.job_id == job_id))
+async def _enqueue_text_tasks(session: AsyncSession, job: Job) -> None:
+    result = await session.execute(select(JobFile).where(JobFile.job_id == job.id))
     files = list(result.scalars().all())
     for job_file in files:
-        if job_file.missing_in_set_a and job_file.missing_in_set_b:
-            job_file.text_status = TextStatus.missing
-            continue
-        celery_app.send_task("extract_text", args=[str(job_file.id)])
+        _enqueue_text_task(job, job_file)
     await session.commit()
 
 
+def _enqueue_text_task(job: Job, job_file: JobFile) -> None:
+    if job_file.missing_in_set_a and job_file.missing_in_set_b:
+        job_file.text_status = TextStatus.missing
+        return
+    if not job.extract_text:
+        job_file.text_status = TextStatus.skipped
+        return
+    celery_app.send_task("extract_text", args=[str(job_file.id)])
+
+
 def _resolve_file_path(job_id: str, set_name: str, rel_path: str | None) -> Path:
     if not rel_path:
         return Path(settings.data_dir) / "missing"
     return Path(settings.data_dir) / "jobs" / str(job_id) / set_name / rel_path
 
 
-def _render_page(pdf_path: Path, page_index: int) -> np.ndarray:
+def _render_page(pdf_path: Path, page_index: int, dpi: int) -> np.ndarray:
     with fitz.open(pdf_path) as doc:
         page = doc.load_page(page_index)
-        scale = settings.render_dpi / 72.0
+        scale = dpi / 72.0
         matrix = fitz.Matrix(scale, scale)
         pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csRGB)
         img = np.frombuffer(pix.samples, dtype=np.uint8)
         return img.reshape(pix.height, pix.width, 3)
 
 
-def _diff_and_overlay(image_a: np.ndarray, image_b: np.ndarray) -> tuple[float, str]:
+def _diff_structure(
+    path_a: Path, page_index_a: int, path_b: Path, page_index_b: int, dpi: int
+) -> StructuralDiff | None:
+    """Structural diff of the two pages, or None when the raster diff should run instead."""
+    try:
+        with fitz.open(path_a) as doc_a, fitz.open(path_b) as doc_b:
+            return diff_page_structure(doc_a.load_page(page_index_a), doc_b.load_page(page_index_b), dpi)
+    except Exception:
+        # Damaged content streams or fonts PyMuPDF cannot parse, or a bug in the
+        # structural path; the raster diff is always a valid fallback.
+        logger.exception(
+            "Structural diff failed for %s page %d vs %s page %d", path_a, page_index_a, path_b, page_index_b
+        )
+        return None
+
+
+def _diff_magnitudes(image_a: np.ndarray, image_b: np.ndarray) -> np.ndarray:
     diff = cv2.absdiff(image_a, image_b)
-    gray = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-    _, mask = cv2.threshold(gray, settings.diff_threshold, 255, cv2.THRESH_BINARY)
+    return cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
+
+
+def _score_magnitudes(
+    magnitudes: np.ndarray,
+    threshold: int,
+    open_iterations: int,
+    close_iterations: int,
+    with_regions: bool = True,
+) -> tuple[float, int, int, list[tuple[int, int, int, int]]]:
+    _, mask = cv2.threshold(magnitudes, threshold, 255, cv2.THRESH_BINARY)
 
     kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+    if open_iterations:
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=open_iterations)
+    if close_iterations:
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=close_iterations)
 
     changed = int(np.count_nonzero(mask))
     total = mask.shape[0] * mask.shape[1]
     diff_score = (changed / total) * 100.0 if total else 0.0
 
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    boxes = [cv2.boundingRect(cnt) for cnt in contours]
+    boxes = []
+    if with_regions and changed:
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = [cv2.boundingRect(cnt) for cnt in contours]
 
     height, width = mask.shape
-    svg = _build_overlay_svg(width, height, boxes)
-    return diff_score, svg
+    return diff_score, width, height, boxes
+
+
+def _encode_magnitudes(magnitudes: np.ndarray) -> bytes:
+    """Pack a grayscale magnitude map as ``<height><width>`` plus zlib data.
+
+    Unchanged pixels are zero, so the map deflates to a small fraction of the raw
+    raster while keeping full resolution for exact rescoring.
+    """
+    height, width = magnitudes.shape
+    return struct.pack("<II", height, width) + zlib.compress(np.ascontiguousarray(magnitudes).tobytes(), 6)
+
+
+def _decode_magnitudes(record: bytes) -> np.ndarray:
+    height, width = struct.unpack_from("<II", record)
+    data = zlib.decompress(record[8:])
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+
+
+def _compare_cache_key(job: Job, job_file: JobFile, page_result: JobPageResult) -> CompareCacheKey | None:
+    if not job_file.set_a_sha256 or not job_file.set_b_sha256:
+        return None
+    if page_result.source_index_a != page_result.source_index_b:
+        # The cache is keyed by a single page index; aligned pairs are not cached.
+        return None
+    page_index = page_result.source_index_a
+    return CompareCacheKey(
+        hash_a=job_file.set_a_sha256,
+        hash_b=job_file.set_b_sha256,
+        page_index=page_index,
+        render_dpi=job.render_dpi,
+        diff_threshold=job.diff_threshold,
+        open_iterations=job.open_iterations,
+        close_iterations=job.close_iterations,
+    )
+
+
+def _file_sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
 
 
 def _build_overlay_svg(width: int, height: int, boxes: Iterable[tuple[int, int, int, int]]) -> str:
@@ -462,8 +1290,52 @@ def _build_overlay_svg(width: int, height: int, boxes: Iterable[tuple[int, int,
     )
 
 
-def _overlay_path(job_id: str, job_file_id: str, page_index: int) -> Path:
-    return Path(settings.data_dir) / "jobs" / str(job_id) / "artifacts" / str(job_file_id) / f"page_{page_index}.svg"
+def _write_report_fragment(job: Job, job_file: JobFile, page_result: JobPageResult, outcome: PageOutcome) -> None:
+    """Pre-render this page's report page so generate_report only has to copy it."""
+    header = ReportHeader(
+        display_id=str(job.id),
+        set_a_label=job.set_a_label or "setA",
+        set_b_label=job.set_b_label or "setB",
+        created="",
+        status="",
+    )
+    fragment_path = fragment_path_for(_artifacts_dir(job.id), str(job_file.id), page_result.page_index)
+    try:
+        fragment_path.parent.mkdir(parents=True, exist_ok=True)
+        build_page_fragment(
+            fragment_path,
+            header,
+            ReportPage(
+                page_result.page_index,
+                outcome.diff_score,
+                Path(outcome.overlay_svg_path),
+                overlay_offset=outcome.overlay_offset,
+                overlay_length=outcome.overlay_length,
+                source_index_a=page_result.page_index_a,
+                source_index_b=page_result.page_index_b,
+            ),
+            _resolve_file_path(job.id, "setA", job_file.set_a_path),
+            _resolve_file_path(job.id, "setB", job_file.set_b_path),
+        )
+    except Exception:  # pragma: no cover - the report falls back to rendering the page
+        fragment_path.unlink(missing_ok=True)
+
+
+def _store_overlay(
+    job_id: uuid.UUID,
+    width: int,
+    height: int,
+    boxes: Iterable[tuple[int, int, int, int]],
+    pack_path: Path | None = None,
+) -> tuple[str, int, int]:
+    """Append the overlay SVG to a pack file, this process's by default; returns (pack path, offset, length)."""
+    overlay = _build_overlay_svg(width, height, boxes).encode("utf-8")
+    pack_path = pack_path or pack_path_for(_artifacts_dir(job_id), "overlays")
+    return str(pack_path), append_record(pack_path, overlay), len(overlay)
+
+
+def _artifacts_dir(job_id: str) -> Path:
+    return Path(settings.data_dir) / "jobs" / str(job_id) / "artifacts"
 
 
 async def _extract_text_from_pdf(pdf_path: Path) -> str:
@@ -477,7 +1349,7 @@ async def _extract_text_from_pdf(pdf_path: Path) -> str:
 
 
 async def _emit_report_event(payload: dict) -> None:
-    await asyncio.to_thread(publish_report_event, payload, settings.celery_broker_url)
+    publish_report_event(payload)
 
 
 async def _generate_report_async(report_id: str) -> None:
@@ -503,17 +1375,11 @@ async def _generate_report_async(report_id: str) -> None:
         report.status = ReportStatus.running
         report.progress = 0
         report.error = None
+        report.shards_total = 0
+        report.shards_done = 0
+        await ReportRepository(session).reset_shards(report.id)
         await session.commit()
-
-        await _emit_report_event(
-            {
-                "report_id": str(report.id),
-                "source_job_id": str(report.source_job_id),
-                "user_id": str(report.user_id),
-                "status": report.status.value,
-                "progress": report.progress,
-            }
-        )
+        await _emit_report_event(_report_event_payload(report))
 
         job_repo = JobRepository(session)
         file_repo = JobFileRepository(session)
@@ -521,63 +1387,178 @@ async def _generate_report_async(report_id: str) -> None:
         service = JobService(session, job_repo, file_repo, page_repo)
 
         try:
-            visual_filename = f"diff-report-{job.id}.pdf"
-            text_filename = f"text-diff-{job.id}.patch"
-            bundle_filename = f"pdfdiff-reports-{job.id}.zip"
-
-            reports_dir = Path(settings.data_dir) / "reports" / str(report.id)
+            reports_dir = _report_dir(report.id)
             reports_dir.mkdir(parents=True, exist_ok=True)
-            visual_path = reports_dir / visual_filename
-            text_path = reports_dir / text_filename
-            bundle_path = reports_dir / bundle_filename
-
-            await service.generate_report_file(job, visual_path)
-            await service.generate_text_report_file(job, text_path)
-
-            with zipfile.ZipFile(bundle_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                zf.write(visual_path, arcname=visual_filename)
-                zf.write(text_path, arcname=text_filename)
-
-            report.report_type = ReportType.both
-            report.output_path = str(bundle_path)
-            report.output_filename = bundle_filename
-            report.visual_path = str(visual_path)
-            report.visual_filename = visual_filename
-            report.text_path = str(text_path)
-            report.text_filename = text_filename
-            report.bundle_path = str(bundle_path)
-            report.bundle_filename = bundle_filename
-            report.status = ReportStatus.done
-            report.progress = 100
-            report.error = None
-            await session.commit()
+            names = _report_filenames(job.id)
+
+            header, entries = await service.collect_report_entries(job)
+            shards = plan_shards(entries, settings.report_shard_pages)
+            await service.generate_text_report_file(job, reports_dir / names["text"])
 
-            await _emit_report_event(
-                {
-                    "report_id": str(report.id),
-                    "source_job_id": str(report.source_job_id),
-                    "user_id": str(report.user_id),
-                    "status": report.status.value,
-                    "progress": report.progress,
-                    "visual_filename": report.visual_filename,
-                    "text_filename": report.text_filename,
-                    "bundle_filename": report.bundle_filename,
+            if len(shards) <= 1:
+                build_visual_report(reports_dir / names["visual"], header, entries)
+                await _finish_report(session, report, reports_dir, names)
+            else:
+                # Fan out: each shard renders its sections on the reports queue and the
+                # last one to finish triggers merge_report (see _render_report_shard_async).
+                shards_dir = reports_dir / "shards"
+                shards_dir.mkdir(parents=True, exist_ok=True)
+                manifest = {
+                    "header": asdict(header),
+                    "entries": [entry_to_dict(entry) for entry in entries],
+                    "shards": [[entry_to_dict(entry) for entry in shard] for shard in shards],
                 }
-            )
+                (shards_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+                report.shards_total = len(shards)
+                await session.commit()
+                for index in range(len(shards)):
+                    celery_app.send_task("render_report_shard", args=[str(report.id), index])
         except Exception as exc:  # pragma: no cover - runtime safety
-            report.status = ReportStatus.failed
-            report.progress = 0
-            report.error = str(exc)
+            await _fail_report(session, report, exc)
+    await engine.dispose()
+
+
+async def _render_report_shard_async(report_id: str, shard_index: int) -> None:
+    try:
+        report_uuid = uuid.UUID(report_id)
+    except ValueError:
+        return
+
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        report = await session.get(Report, report_uuid)
+        if not report or report.status != ReportStatus.running:
+            await engine.dispose()
+            return
+        try:
+            shards_dir = _report_dir(report.id) / "shards"
+            manifest = json.loads((shards_dir / "manifest.json").read_text(encoding="utf-8"))
+            header = ReportHeader(**manifest["header"])
+            entries = [entry_from_dict(item) for item in manifest["shards"][shard_index]]
+            build_sections(shards_dir / f"shard_{shard_index:05d}.pdf", header, entries)
+
+            recorded, done, total, report.progress = await ReportRepository(session).record_shard_done(
+                report.id, shard_index
+            )
             await session.commit()
+            await _emit_report_event(_report_event_payload(report))
+            # A redelivered shard never re-triggers the merge; a merge that was lost
+            # after the last shard committed is resent by reap_stale_reports.
+            if recorded and done >= total:
+                celery_app.send_task("merge_report", args=[str(report.id)])
+        except Exception as exc:  # pragma: no cover - runtime safety
+            await _fail_report(session, report, exc)
+    await engine.dispose()
 
-            await _emit_report_event(
-                {
-                    "report_id": str(report.id),
-                    "source_job_id": str(report.source_job_id),
-                    "user_id": str(report.user_id),
-                    "status": report.status.value,
-                    "progress": report.progress,
-                    "error": report.error,
-                }
+
+async def _reap_stale_reports_async() -> None:
+    """Settle reports left running past ``report_stale_minutes`` without progress."""
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.report_stale_minutes)
+        for report in await ReportRepository(session).list_stale_running(cutoff):
+            if report.shards_total and report.shards_done >= report.shards_total:
+                # Every shard landed but the merge never ran; the touch restarts the timeout.
+                report.updated_at = datetime.utcnow()
+                await session.commit()
+                celery_app.send_task("merge_report", args=[str(report.id)])
+            else:
+                await _fail_report(session, report, TimeoutError("Report rendering timed out"))
+    await engine.dispose()
+
+
+async def _merge_report_async(report_id: str) -> None:
+    try:
+        report_uuid = uuid.UUID(report_id)
+    except ValueError:
+        return
+
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        report = await session.get(Report, report_uuid)
+        if not report or report.status != ReportStatus.running:
+            await engine.dispose()
+            return
+        try:
+            reports_dir = _report_dir(report.id)
+            shards_dir = reports_dir / "shards"
+            names = _report_filenames(report.source_job_id)
+            manifest = json.loads((shards_dir / "manifest.json").read_text(encoding="utf-8"))
+            assemble_report(
+                reports_dir / names["visual"],
+                ReportHeader(**manifest["header"]),
+                [entry_from_dict(item) for item in manifest["entries"]],
+                [shards_dir / f"shard_{index:05d}.pdf" for index in range(len(manifest["shards"]))],
             )
+            await _finish_report(session, report, reports_dir, names)
+            await remove_trees([shards_dir], 1)
+        except Exception as exc:  # pragma: no cover - runtime safety
+            await _fail_report(session, report, exc)
     await engine.dispose()
+
+
+def _report_dir(report_id: uuid.UUID) -> Path:
+    return Path(settings.data_dir) / "reports" / str(report_id)
+
+
+def _report_filenames(job_id: uuid.UUID) -> dict[str, str]:
+    return {
+        "visual": f"diff-report-{job_id}.pdf",
+        "text": f"text-diff-{job_id}.patch",
+        "bundle": f"pdfdiff-reports-{job_id}.zip",
+    }
+
+
+def _report_event_payload(report: Report, **extra) -> dict:
+    payload = {
+        "report_id": str(report.id),
+        "source_job_id": str(report.source_job_id),
+        "user_id": str(report.user_id),
+        "status": report.status.value,
+        "progress": report.progress,
+    }
+    payload.update(extra)
+    return payload
+
+
+async def _finish_report(session: AsyncSession, report: Report, reports_dir: Path, names: dict[str, str]) -> None:
+    visual_path = reports_dir / names["visual"]
+    text_path = reports_dir / names["text"]
+    bundle_path = reports_dir / names["bundle"]
+    with zipfile.ZipFile(bundle_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.write(visual_path, arcname=names["visual"])
+        zf.write(text_path, arcname=names["text"])
+
+    report.report_type = ReportType.both
+    report.output_path = str(bundle_path)
+    report.output_filename = names["bundle"]
+    report.visual_path = str(visual_path)
+    report.visual_filename = names["visual"]
+    report.text_path = str(text_path)
+    report.text_filename = names["text"]
+    report.bundle_path = str(bundle_path)
+    report.bundle_filename = names["bundle"]
+    report.status = ReportStatus.done
+    report.progress = 100
+    report.error = None
+    await session.commit()
+
+    await _emit_report_event(
+        _report_event_payload(
+            report,
+            visual_filename=report.visual_filename,
+            text_filename=report.text_filename,
+            bundle_filename=report.bundle_filename,
+        )
+    )
+
+
+async def _fail_report(session: AsyncSession, report: Report, exc: Exception) -> None:
+    report.status = ReportStatus.failed
+    report.progress = 0
+    report.error = str(exc)
+    await session.commit()
+    await _emit_report_event(_report_event_payload(report, error=report.error))
@@ -0,0 +1,40 @@
+"""Shared fixtures. Tests that need Postgres run against TEST_DATABASE_URL and are skipped without it."""
+
+import os
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def migrated_database_url() -> str:
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    config = Config(str(API_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(API_DIR / "alembic"))
+    # alembic/env.py reads the URL from DATABASE_URL.
+    previous = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = url
+    try:
+        command.upgrade(config, "head")
+    finally:
+        if previous is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = previous
+    return url
+
+
+@pytest.fixture
+def database_url(migrated_database_url: str, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> str:
+    """A migrated database, with the worker's settings pointed at it and at a scratch data dir."""
+    monkeypatch.setattr(settings, "database_url", migrated_database_url)
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    return migrated_database_url
@@ -0,0 +1,54 @@
+import fitz
+
+from app.features.jobs.alignment import align_pages, fingerprint_document
+
+
+def _text_pages(*texts: str) -> fitz.Document:
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    return doc
+
+
+def _form_wrapped(source: fitz.Document, *indices: int) -> fitz.Document:
+    """Each page draws one source page through a form XObject, like show_pdf_page output."""
+    doc = fitz.open()
+    for index in indices:
+        page = doc.new_page()
+        page.show_pdf_page(page.rect, source, index)
+    return doc
+
+
+def test_form_wrapped_pages_differing_only_inside_the_form_are_not_identical():
+    source_a = _text_pages("Invoice 2024-001 total amount 1,000")
+    source_b = _text_pages("Invoice 2024-001 total amount 1,000")
+    source_b[0].draw_rect(fitz.Rect(72, 100, 300, 140), color=(1, 0, 0))
+    doc_a = _form_wrapped(source_a, 0)
+    doc_b = _form_wrapped(source_b, 0)
+
+    aligned = align_pages(fingerprint_document(doc_a), fingerprint_document(doc_b))
+
+    assert [(pair.index_a, pair.index_b, pair.identical) for pair in aligned] == [(0, 0, False)]
+
+
+def test_replaced_form_wrapped_page_is_not_identical():
+    source_a = _text_pages("Invoice 2024-001 total amount 1,000")
+    source_b = _text_pages("Invoice 2024-001 total amount 9,999")
+    doc_a = _form_wrapped(source_a, 0)
+    doc_b = _form_wrapped(source_b, 0)
+
+    aligned = align_pages(fingerprint_document(doc_a), fingerprint_document(doc_b))
+
+    assert [(pair.index_a, pair.index_b, pair.identical) for pair in aligned] == [(0, 0, False)]
+
+
+def test_identical_form_wrapped_pages_match_across_files():
+    source = _text_pages("Invoice 2024-001 total amount 1,000")
+    doc_a = _form_wrapped(source, 0)
+    doc_b = _text_pages("Cover sheet that only the second file has")
+    doc_b.insert_pdf(_form_wrapped(source, 0))
+
+    aligned = align_pages(fingerprint_document(doc_a), fingerprint_document(doc_b))
+
+    assert [(pair.index_a, pair.index_b, pair.identical) for pair in aligned] == [(None, 0, False), (0, 1, True)]
@@ -0,0 +1,136 @@
+import heapq
+import random
+from collections import deque
+from dataclasses import dataclass
+
+from app.features.jobs.scheduler import ActiveJob, fair_share_grants
+
+ROLE_WEIGHTS = {"user": 1.0, "admin": 2.0}
+PER_JOB_BATCH = 50
+
+
+@dataclass
+class SimJob:
+    job_id: int
+    user_id: str
+    role: str
+    arrival: float
+    pages: int
+    service: list[float]
+    pending: int = 0
+    in_flight: int = 0
+    done: int = 0
+    finished_at: float | None = None
+
+
+def _workload(seed: int = 7) -> list[SimJob]:
+    """Two bulk jobs that could fill the queue on their own, plus a trickle of small ones."""
+    rng = random.Random(seed)
+    specs = [("bulk-0", "user", 0.0, 3000), ("bulk-1", "user", 0.0, 3000)]
+    for index in range(60):
+        arrival = 15.0 * (index + 1) + rng.uniform(0, 7.5)
+        specs.append((f"small-{index % 10}", "admin" if index % 10 == 0 else "user", arrival, rng.randint(1, 10)))
+    return [
+        SimJob(job_id, user_id, role, arrival, pages, [rng.lognormvariate(0, 0.4) for _ in range(pages)])
+        for job_id, (user_id, role, arrival, pages) in enumerate(specs)
+    ]
+
+
+def _simulate(policy: str, workers: int = 16, capacity: int = 64) -> list[SimJob]:
+    """Replay the workload against ``workers`` reading one FIFO queue (see scripts/simulate-fair-share.py)."""
+    jobs = _workload()
+    queue: deque[tuple[SimJob, int]] = deque()
+    events = [(job.arrival, job.job_id, "arrive", job.job_id) for job in jobs]
+    heapq.heapify(events)
+    sequence = len(events)
+    idle = workers
+    while events:
+        now, _, kind, job_id = heapq.heappop(events)
+        job = jobs[job_id]
+        if kind == "arrive":
+            job.pending = job.pages
+        else:
+            idle += 1
+            job.in_flight -= 1
+            job.done += 1
+            if job.done == job.pages:
+                job.finished_at = now
+
+        running = [job for job in jobs if job.arrival <= now and job.finished_at is None]
+        if policy == "per-job":
+            grants = {job.job_id: min(job.pending, PER_JOB_BATCH - job.in_flight) for job in running}
+        else:
+            active = [ActiveJob(job.job_id, job.user_id, job.role, job.in_flight, job.pending) for job in running]
+            grants = fair_share_grants(capacity, active, ROLE_WEIGHTS)
+        for granted_id, slots in grants.items():
+            granted = jobs[granted_id]
+            for _ in range(max(0, slots)):
+                queue.append((granted, granted.pages - granted.pending))
+                granted.pending -= 1
+                granted.in_flight += 1
+
+        while idle and queue:
+            started, page = queue.popleft()
+            idle -= 1
+            heapq.heappush(events, (now + started.service[page], sequence, "finish", started.job_id))
+            sequence += 1
+    return jobs
+
+
+def _p95(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[round(0.95 * (len(ordered) - 1))]
+
+
+def test_a_new_job_gets_the_first_slot_a_saturating_job_frees():
+    bulk = ActiveJob("bulk", "bulk-user", "user", in_flight=64, pending=20000)
+    small = ActiveJob("small", "small-user", "user", in_flight=0, pending=5)
+
+    assert fair_share_grants(64, [bulk, small], ROLE_WEIGHTS) == {}
+    drained = ActiveJob("bulk", "bulk-user", "user", in_flight=63, pending=20000)
+    assert fair_share_grants(64, [drained, small], ROLE_WEIGHTS) == {"small": 1}
+
+
+def test_small_jobs_are_not_starved_behind_bulk_jobs():
+    jobs = _simulate("fair-share")
+
+    assert all(job.finished_at is not None for job in jobs)
+    bulk_makespan = max(job.finished_at for job in jobs if job.user_id.startswith("bulk-"))
+    for job in jobs:
+        if job.user_id.startswith("small-"):
+            # Seconds, while the bulk backlog takes minutes to drain.
+            assert job.finished_at - job.arrival < min(10.0, bulk_makespan / 10), job
+
+
+def test_role_weights_split_capacity_between_users():
+    user = ActiveJob("user-job", "alice", "user", in_flight=0, pending=1000)
+    admin = ActiveJob("admin-job", "bob", "admin", in_flight=0, pending=1000)
+
+    assert fair_share_grants(30, [user, admin], ROLE_WEIGHTS) == {"user-job": 10, "admin-job": 20}
+
+
+def test_a_users_share_is_split_across_their_jobs_not_multiplied():
+    first = ActiveJob("first", "alice", "user", in_flight=0, pending=1000)
+    second = ActiveJob("second", "alice", "user", in_flight=0, pending=1000)
+    other = ActiveJob("other", "bob", "user", in_flight=0, pending=1000)
+
+    grants = fair_share_grants(30, [first, second, other], ROLE_WEIGHTS)
+
+    assert grants["other"] == 15
+    assert grants["first"] + grants["second"] == 15
+
+
+def test_unused_share_goes_to_the_other_users():
+    bulk = ActiveJob("bulk", "bulk-user", "user", in_flight=0, pending=20000)
+    small = ActiveJob("small", "small-user", "user", in_flight=0, pending=5)
+
+    assert fair_share_grants(64, [bulk, small], ROLE_WEIGHTS) == {"bulk": 59, "small": 5}
+
+
+def test_fair_share_beats_per_job_batches_on_small_job_p95_turnaround():
+    turnaround = {}
+    for policy in ("per-job", "fair-share"):
+        jobs = _simulate(policy)
+        turnaround[policy] = _p95([job.finished_at - job.arrival for job in jobs if job.user_id.startswith("small-")])
+
+    assert turnaround["fair-share"] < turnaround["per-job"]
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import signal
+import uuid
+from datetime import datetime, timedelta
+
+import fitz
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.features.auth.models import User
+from app.features.jobs.models import Job, JobFile, JobPageResult, JobStatus, PageStatus
+from app.features.jobs.repository import JobPageResultRepository, PageOutcome
+from app.features.jobs.scheduler import PAGE_QUEUES
+from app.worker.tasks import _dispatch_pages, _pull_pages_async
+
+
+async def _create_job(session: AsyncSession, pages: int, **job_fields) -> tuple[User, Job, JobFile, list[JobPageResult]]:
+    user = User(email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    session.add(user)
+    await session.flush()
+    job = Job(user_id=user.id, status=JobStatus.running, **job_fields)
+    session.add(job)
+    await session.flush()
+    job_file = JobFile(
+        job_id=job.id, relative_path="a.pdf", set_a_path="a.pdf", set_b_path="a.pdf", planned_at=datetime.utcnow()
+    )
+    session.add(job_file)
+    await session.flush()
+    page_results = [JobPageResult(job_file_id=job_file.id, page_index=index) for index in range(pages)]
+    session.add_all(page_results)
+    await session.commit()
+    return user, job, job_file, page_results
+
+
+def _outcome(page: JobPageResult, job: Job, job_file: JobFile, attempt: int, **fields) -> PageOutcome:
+    return PageOutcome(
+        page_id=page.id,
+        created_at=page.created_at,
+        attempt=attempt,
+        job_id=job.id,
+        job_file_id=job_file.id,
+        finished_at=datetime.utcnow(),
+        **fields,
+    )
+
+
+def test_record_outcomes_writes_current_attempts_and_drops_stale_ones(database_url):
+    async def scenario():
+        engine = create_async_engine(database_url, poolclass=NullPool)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessionmaker() as session:
+            user, job, job_file, (done, failed, stale) = await _create_job(session, 3)
+            try:
+                lease = datetime.utcnow() + timedelta(minutes=2)
+                for page in (done, failed, stale):
+                    page.status = PageStatus.running
+                    page.attempts = 1
+                    page.lease_expires_at = lease
+                # The reaper requeued this page and a second attempt claimed it.
+                stale.attempts = 2
+                await session.commit()
+
+                outcomes = [
+                    _outcome(
+                        done,
+                        job,
+                        job_file,
+                        1,
+                        status=PageStatus.done,
+                        diff_score=0.25,
+                        diff_method="raster",
+                        overlay_svg_path="/data/overlays.pack",
+                        overlay_offset=1024,
+                        overlay_length=300,
+                    ),
+                    _outcome(failed, job, job_file, 1, status=PageStatus.failed, error_message="render failed"),
+                    _outcome(stale, job, job_file, 1, status=PageStatus.done, diff_score=0.0),
+                ]
+                written = await JobPageResultRepository(session).record_outcomes(outcomes)
+                await session.commit()
+                assert written == {done.id, failed.id}
+
+                result = await session.execute(
+                    select(JobPageResult).where(JobPageResult.job_file_id == job_file.id).execution_options(
+                        populate_existing=True
+                    )
+                )
+                rows = {page.id: page for page in result.scalars().all()}
+                assert rows[done.id].status == PageStatus.done
+                assert rows[done.id].diff_score == 0.25
+                assert rows[done.id].overlay_offset == 1024
+                assert rows[done.id].magnitude_offset is None
+                assert rows[done.id].lease_expires_at is None
+                assert rows[failed.id].status == PageStatus.failed
+                assert rows[failed.id].error_message == "render failed"
+                assert rows[failed.id].diff_score is None
+                assert rows[stale.id].status == PageStatus.running
+                assert rows[stale.id].lease_expires_at is not None
+            finally:
+                await session.execute(delete(User).where(User.id == user.id))
+                await session.commit()
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def _write_pdf(path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+def test_db_queue_pull_and_flush_records_pages_and_completes_the_job(database_url, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "page_dispatch_backend", "db")
+    monkeypatch.setattr(settings, "db_queue_poll_seconds", 0.05)
+
+    async def scenario():
+        engine = create_async_engine(database_url, poolclass=NullPool)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessionmaker() as session:
+            user, job, job_file, pages = await _create_job(session, 2, generate_overlays=False)
+            try:
+                jobs_dir = tmp_path / "jobs" / str(job.id)
+                _write_pdf(jobs_dir / "setA" / "a.pdf", "Invoice total 1,000")
+                _write_pdf(jobs_dir / "setB" / "a.pdf", "Invoice total 9,000")
+                pages[1].page_index_a = pages[1].page_index_b = 0
+                await session.commit()
+                await _dispatch_pages(session)
+
+                async def stop_when_completed():
+                    for _ in range(300):
+                        async with sessionmaker() as probe:
+                            status = await probe.scalar(select(Job.status).where(Job.id == job.id))
+                        if status == JobStatus.completed:
+                            break
+                        await asyncio.sleep(0.1)
+                    os.kill(os.getpid(), signal.SIGTERM)
+
+                watcher = asyncio.create_task(stop_when_completed())
+                await _pull_pages_async([PAGE_QUEUES["standard"]], 8)
+                await watcher
+
+                result = await session.execute(
+                    select(JobPageResult)
+                    .where(JobPageResult.job_file_id == job_file.id)
+                    .order_by(JobPageResult.page_index)
+                    .execution_options(populate_existing=True)
+                )
+                recorded = result.scalars().all()
+                assert [page.status for page in recorded] == [PageStatus.done, PageStatus.done]
+                assert all(page.diff_score and page.diff_score > 0 for page in recorded)
+                assert all(page.lease_expires_at is None for page in recorded)
+                await session.refresh(job)
+                assert job.status == JobStatus.completed
+                assert job.has_diffs
+            finally:
+                await session.execute(delete(User).where(User.id == user.id))
+                await session.commit()
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+import fitz
+
+from app.features.jobs.vector_diff import diff_page_structure
+
+
+def _page(**text_style) -> fitz.Document:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Total due", fontsize=12)
+    page.insert_text((72, 100), "1,000 EUR", **{"fontsize": 12, **text_style})
+    return doc
+
+
+def test_identical_pages_have_no_structural_changes():
+    result = diff_page_structure(_page()[0], _page()[0], dpi=72)
+
+    assert result is not None
+    assert result.boxes == []
+    assert result.diff_score == 0.0
+
+
+def test_font_size_and_colour_changes_are_structural_changes():
+    for style in ({"fontname": "helv", "color": (1, 0, 0)}, {"fontsize": 14}, {"fontname": "cour"}):
+        result = diff_page_structure(_page()[0], _page(**style)[0], dpi=72)
+
+        assert result is not None
+        assert len(result.boxes) == 1, style
+        x, y, _, h = result.boxes[0]
+        assert x <= 72 and y < 100 < y + h, style
+        assert result.diff_score > 0, style
@@ -168,6 +168,13 @@ def main():
     )
     print(f"  ✓ Updated k8s/base/worker.yaml")
 
+    update_file(
+        root / "k8s" / "base" / "worker-large.yaml",
+        r'(?P<prefix>[^\s"\']*/)?pdfdiff-turbo-worker:\d+\.\d+\.\d+',
+        f'\\g<prefix>pdfdiff-turbo-worker:{new_version}'
+    )
+    print(f"  ✓ Updated k8s/base/worker-large.yaml")
+
     update_file(
         root / "k8s" / "base" / "beat.yaml",
         r'(?P<prefix>[^\s"\']*/)?pdfdiff-turbo-beat:\d+\.\d+\.\d+',
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Deterministic simulation of page dispatch policies.
+
+Replays a seeded workload (a few very large jobs plus a steady trickle of small
+ones from other users) against a pool of workers reading one FIFO queue, and
+reports small-job turnaround for:
+
+* ``per-job``: the previous behaviour, every running job keeps up to 50 page
+  tasks queued or running on its own;
+* ``fair-share``: ``app.features.jobs.scheduler`` with a global in-flight cap.
+
+Exits non-zero if fair share does not improve small-job p95 turnaround, so it
+can be run as a check after changing the scheduler. ``api/tests/test_fair_share.py``
+asserts the same on a smaller workload as part of the test suite.
+
+Usage:
+    python ./scripts/simulate-fair-share.py --workers 16 --capacity 64 --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import pathlib
+import random
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+
+ROOT_DIR = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "api"))
+
+from app.features.jobs.scheduler import ActiveJob, fair_share_grants  # noqa: E402
+
+PER_JOB_BATCH = 50
+ROLE_WEIGHTS = {"user": 1.0, "admin": 2.0}
+
+
+@dataclass
+class SimJob:
+    job_id: int
+    user_id: str
+    role: str
+    arrival: float
+    pages: int
+    pending: int = 0
+    in_flight: int = 0
+    done: int = 0
+    finished_at: float | None = None
+    service: list[float] = field(default_factory=list)
+
+
+def build_workload(args: argparse.Namespace) -> list[SimJob]:
+    rng = random.Random(args.seed)
+    jobs: list[SimJob] = []
+    for index in range(args.large_jobs):
+        jobs.append(SimJob(len(jobs), f"bulk-{index}", "user", 0.0, args.large_pages))
+    for index in range(args.small_jobs):
+        arrival = args.small_every * (index + 1) + rng.uniform(0, args.small_every / 2)
+        role = "admin" if index % 10 == 0 else "user"
+        jobs.append(SimJob(len(jobs), f"small-{index % args.small_users}", role, arrival, rng.randint(1, args.small_pages)))
+    for job in jobs:
+        # Page render + diff time in seconds; same draws for every policy.
+        job.service = [rng.lognormvariate(0, 0.4) for _ in range(job.pages)]
+    return jobs
+
+
+def simulate(jobs: list[SimJob], policy: str, workers: int, capacity: int) -> list[SimJob]:
+    jobs = [SimJob(j.job_id, j.user_id, j.role, j.arrival, j.pages, service=j.service) for j in jobs]
+    queue: deque[tuple[SimJob, int]] = deque()
+    events: list[tuple[float, int, str, int]] = []
+    sequence = 0
+    for job in jobs:
+        heapq.heappush(events, (job.arrival, sequence, "arrive", job.job_id))
+        sequence += 1
+    idle = workers
+    now = 0.0
+
+    def dispatch() -> None:
+        running = [job for job in jobs if job.arrival <= now and job.finished_at is None]
+        if policy == "per-job":
+            grants = {job.job_id: min(job.pending, PER_JOB_BATCH - job.in_flight) for job in running}
+        else:
+            active = [ActiveJob(job.job_id, job.user_id, job.role, job.in_flight, job.pending) for job in running]
+            grants = fair_share_grants(capacity, active, ROLE_WEIGHTS)
+        for job_id, slots in grants.items():
+            job = jobs[job_id]
+            for _ in range(max(0, slots)):
+                queue.append((job, job.pages - job.pending))
+                job.pending -= 1
+                job.in_flight += 1
+
+    def start_work() -> None:
+        nonlocal idle, sequence
+        while idle and queue:
+            job, page = queue.popleft()
+            idle -= 1
+            heapq.heappush(events, (now + job.service[page], sequence, "finish", job.job_id))
+            sequence += 1
+
+    while events:
+        now, _, kind, job_id = heapq.heappop(events)
+        job = jobs[job_id]
+        if kind == "arrive":
+            job.pending = job.pages
+        else:
+            idle += 1
+            job.in_flight -= 1
+            job.done += 1
+            if job.done == job.pages:
+                job.finished_at = now
+        dispatch()
+        start_work()
+    return jobs
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--capacity", type=int, default=64)
+    parser.add_argument("--large-jobs", type=int, default=3)
+    parser.add_argument("--large-pages", type=int, default=20000)
+    parser.add_argument("--small-jobs", type=int, default=200)
+    parser.add_argument("--small-pages", type=int, default=10)
+    parser.add_argument("--small-users", type=int, default=20)
+    parser.add_argument("--small-every", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workload = build_workload(args)
+    p95 = {}
+    print(f"{'policy':<12} {'small p50':>10} {'small p95':>10} {'small p99':>10} {'large makespan':>15}")
+    for policy in ("per-job", "fair-share"):
+        result = simulate(workload, policy, args.workers, args.capacity)
+        small = [job.finished_at - job.arrival for job in result if job.user_id.startswith("small-")]
+        large = max(job.finished_at for job in result if job.user_id.startswith("bulk-"))
+        p95[policy] = percentile(small, 95)
+        print(
+            f"{policy:<12} {percentile(small, 50):>10.1f} {p95[policy]:>10.1f} "
+            f"{percentile(small, 99):>10.1f} {large:>15.1f}"
+        )
+    return 0 if p95["fair-share"] < p95["per-job"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -127,6 +127,12 @@ def main():
         f'\\g<prefix>pdfdiff-turbo-worker:{new_version}',
         "k8s/base/worker.yaml image tag"
     )
+    update_file(
+        root / "k8s" / "base" / "worker-large.yaml",
+        r'(?P<prefix>[^\s"\']*/)?pdfdiff-turbo-worker:\d+\.\d+\.\d+',
+        f'\\g<prefix>pdfdiff-turbo-worker:{new_version}',
+        "k8s/base/worker-large.yaml image tag"
+    )
     update_file(
         root / "k8s" / "base" / "beat.yaml",
         r'(?P<prefix>[^\s"\']*/)?pdfdiff-turbo-beat:\d+\.\d+\.\d+',
@@ -165,6 +171,12 @@ def main():
         f'pdfdiff-turbo-worker:{new_version}',
         "k8s/base/worker.yaml image tag"
     )
+    update_file(
+        root / "k8s" / "base" / "worker-large.yaml",
+        r'pdfdiff-turbo-worker:\d+\.\d+\.\d+',
+        f'pdfdiff-turbo-worker:{new_version}',
+        "k8s/base/worker-large.yaml image tag"
+    )
     update_file(
         root / "k8s" / "base" / "flower.yaml",
         r'pdfdiff-turbo-flower:\d+\.\d+\.\d+',
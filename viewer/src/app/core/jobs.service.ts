@@ -27,6 +27,8 @@ export interface JobSummary {
 export interface JobPage {
   id: string;
   page_index: number;
+  page_index_a?: number | null;
+  page_index_b?: number | null;
   status: string;
   diff_score: number | null;
   overlay_svg_path: string | null;
@@ -191,10 +193,11 @@ export class JobsService {
     return this.http.post(`${this.baseUrl}/jobs/${jobId}/upload-zip`, form);
   }
 
-  startJob(jobId: string, setALabel?: string | null, setBLabel?: string | null) {
+  startJob(jobId: string, setALabel?: string | null, setBLabel?: string | null, incrementalReport = false) {
     const params: string[] = [];
     if (setALabel) params.push(`setA=${encodeURIComponent(setALabel)}`);
     if (setBLabel) params.push(`setB=${encodeURIComponent(setBLabel)}`);
+    if (incrementalReport) params.push('incrementalReport=true');
     const qs = params.length ? `?${params.join('&')}` : '';
     return this.http.post(`${this.baseUrl}/jobs/${jobId}/start${qs}`, {});
   }
@@ -263,6 +266,10 @@ export class JobsService {
     return this.http.get<JobPage[]>(`${this.baseUrl}/jobs/${jobId}/files/${fileId}/pages`);
   }
 
+  markFileViewed(jobId: string, fileId: string) {
+    return this.http.post(`${this.baseUrl}/jobs/${jobId}/files/${fileId}/view`, {});
+  }
+
   getOverlay(jobId: string, fileId: string, pageId: string) {
     return this.http.get(`${this.baseUrl}/jobs/${jobId}/files/${fileId}/pages/${pageId}/overlay`, { responseType: 'text' });
   }
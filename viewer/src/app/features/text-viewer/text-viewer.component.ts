@@ -190,7 +190,7 @@ export class TextViewerComponent implements OnInit, AfterViewInit, OnDestroy {
     const status = (file.status || (file.missing_in_set_a || file.missing_in_set_b ? 'missing' : 'ready')).toLowerCase();
     if (status === 'running' || status === 'pending') return 'badge warn';
     if (status === 'failed' || status === 'incompatible') return 'badge danger';
-    if (status === 'missing') return 'badge warn';
+    if (status === 'missing' || status === 'unmatched') return 'badge warn';
     if (status === 'completed') return 'badge success';
     return 'badge neutral';
   }
@@ -262,6 +262,8 @@ export class ViewerComponent implements OnInit, OnDestroy {
     this.currentPage = 0;
     this.totalPages = 0;
     this.resetPdfs();
+    // Pulls this file's pages to the front of a running job; best effort.
+    this.jobs.markFileViewed(this.jobId, this.fileId).subscribe({ error: () => undefined });
     this.jobs.listPages(this.jobId, this.fileId).subscribe({
       next: pages => {
         this.pages = pages.sort((a, b) => a.page_index - b.page_index);
@@ -287,7 +289,7 @@ export class ViewerComponent implements OnInit, OnDestroy {
     const status = (file.status || (file.missing_in_set_a || file.missing_in_set_b ? 'missing' : 'ready')).toLowerCase();
     if (status === 'running' || status === 'pending') return 'badge warn';
     if (status === 'failed' || status === 'incompatible') return 'badge danger';
-    if (status === 'missing') return 'badge warn';
+    if (status === 'missing' || status === 'unmatched') return 'badge warn';
     if (status === 'completed') return 'badge success';
     return 'badge neutral';
   }
@@ -342,13 +344,13 @@ export class ViewerComponent implements OnInit, OnDestroy {
       if (page.missing_in_set_a) {
         this.clearCanvas(this.canvasA.nativeElement);
       } else {
-        await this.renderPdfPage(this.pdfA, this.currentPage + 1, this.canvasA.nativeElement);
+        await this.renderPdfPage(this.pdfA, (page.page_index_a ?? page.page_index) + 1, this.canvasA.nativeElement);
       }
 
       if (page.missing_in_set_b) {
         this.clearCanvas(this.canvasB.nativeElement);
       } else {
-        await this.renderPdfPage(this.pdfB, this.currentPage + 1, this.canvasB.nativeElement);
+        await this.renderPdfPage(this.pdfB, (page.page_index_b ?? page.page_index) + 1, this.canvasB.nativeElement);
       }
 
       this.overlayWidth = this.canvasA.nativeElement.clientWidth || this.canvasA.nativeElement.width;